@@ -0,0 +1,87 @@
+"""
+Stateless JWT authentication.
+"""
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from auth.blocklist import arevoked_at, revoked_at
+
+
+class LazyTokenUser(TokenUser):
+    """
+    User built from the signed token claims.
+    The full User model is only loaded the first time a non-claim attribute is read.
+    """
+
+    @cached_property
+    def id(self):
+        """Return the user id claim as a primary key value, e.g. a UUID."""
+        return get_user_model()._meta.pk.to_python(self.token[jwt_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def is_active(self):
+        return self.token.get("is_active", True)
+
+    @cached_property
+    def user(self):
+        """Load the full User model for this token."""
+        model = get_user_model()
+        return model.objects.get(**{jwt_settings.USER_ID_FIELD: self.id})
+
+    def __getattr__(self, attr):
+        """Serve custom claims from the token and anything else from the User model."""
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        if attr in self.token:
+            return self.token[attr]
+        return getattr(self.user, attr)
+
+
+def resolve_user(user):
+    """Return the User model behind a request user."""
+    return user.user if isinstance(user, LazyTokenUser) else user
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Authenticate JWTs without querying the User table.
+    Deactivated users and revoked tokens are caught by the cached blocklist.
+    """
+
+    def get_user(self, validated_token):
+        """Return a lazy token user unless the user or token was revoked."""
+        user = self.get_active_user(validated_token)
+        self.check_revocation(validated_token, revoked_at(user.id))
+        return user
+
+    async def aauthenticate(self, request):
+        """Async variant of authenticate, reading the blocklist without blocking the event loop."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        user = self.get_active_user(validated_token)
+        self.check_revocation(validated_token, await arevoked_at(user.id))
+        return user, validated_token
+
+    def get_active_user(self, validated_token):
+        """Return the lazy token user, unless the token says it is inactive."""
+        user = super().get_user(validated_token)
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+    @staticmethod
+    def check_revocation(validated_token, revoked):
+        """Reject a token authenticated before the user's tokens were last revoked."""
+        authenticated_at = validated_token.get("auth_time", validated_token.get("iat", 0))
+        if revoked is not None and authenticated_at <= revoked:
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
@@ -0,0 +1,55 @@
+"""
+Authentication backend that hashes passwords on the bounded hashing pool.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password
+from rest_framework.request import Request
+
+from auth.hashing import (
+    HashingPoolFull,
+    hashing_pool,
+    must_update,
+    reject_unknown_user,
+    verify_password,
+)
+
+
+class PooledModelBackend(ModelBackend):
+    """
+    ModelBackend whose hash verification runs on the hashing pool.
+    Hashes made with an outdated hasher are replaced on successful login.
+    A saturated pool fails the login: DRF views answer it with a 429,
+    other callers such as the admin login form see invalid credentials.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        """Authenticate a user by natural key and password."""
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            return self.authenticate_pooled(UserModel, username, password)
+        except HashingPoolFull:
+            if isinstance(request, Request):
+                raise
+            return None
+
+    def authenticate_pooled(self, UserModel, username, password):
+        """Authenticate on the hashing pool; raises HashingPoolFull if it is saturated."""
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            reject_unknown_user(username, password)
+            return None
+
+        if not verify_password(password, user.password):
+            return None
+        if must_update(user.password):
+            user.password = hashing_pool().run(make_password, password)
+            user.save(update_fields=["password"])
+        if self.user_can_authenticate(user):
+            return user
+        return None
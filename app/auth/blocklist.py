@@ -0,0 +1,39 @@
+"""
+Cached blocklist of users whose tokens must no longer be accepted.
+
+Stateless authentication never reads the user row, so deactivations and
+forced logouts are recorded here as a "revoked at" timestamp per user.
+Tokens authenticated before that moment are rejected until they expire.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+
+def blocklist_cache():
+    """Return the cache backend holding the blocklist."""
+    return caches[settings.TOKEN_BLOCKLIST["ALIAS"]]
+
+
+def blocklist_key(user_id):
+    return f"auth:revoked:{user_id}"
+
+
+def revoke_user_tokens(user_id):
+    """Reject every token issued to a user up to now."""
+    lifetime = max(jwt_settings.ACCESS_TOKEN_LIFETIME, jwt_settings.REFRESH_TOKEN_LIFETIME)
+    blocklist_cache().set(
+        blocklist_key(user_id), int(time.time()), timeout=int(lifetime.total_seconds())
+    )
+
+
+def revoked_at(user_id):
+    """Return when a user's tokens were last revoked, or None."""
+    return blocklist_cache().get(blocklist_key(user_id))
+
+
+async def arevoked_at(user_id):
+    """Async variant of revoked_at."""
+    return await blocklist_cache().aget(blocklist_key(user_id))
@@ -0,0 +1,157 @@
+"""
+Password hash verification off the request thread.
+
+Hashers are CPU bound and release the GIL, so a fixed pool of worker threads
+caps how many run at once. Requests beyond the pool plus its queue are turned
+away immediately instead of piling up behind the CPUs. Checked credentials
+are remembered for a few seconds so client retry storms do not re-hash;
+attempts on unknown users are remembered the same way, so response times do
+not tell which accounts exist.
+"""
+import asyncio
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    check_password,
+    get_hasher,
+    identify_hasher,
+    make_password,
+)
+from django.core.cache import caches
+from rest_framework.exceptions import Throttled
+
+
+DEFAULTS = {
+    "WORKERS": os.cpu_count() or 1,
+    "QUEUE_SIZE": 64,
+    "CACHE_ALIAS": "default",
+    "CACHE_TTL": 30,
+}
+
+
+def hashing_setting(name):
+    """Return a PASSWORD_HASHING setting, falling back to the default."""
+    return getattr(settings, "PASSWORD_HASHING", {}).get(name, DEFAULTS[name])
+
+
+class HashingPoolFull(Throttled):
+    default_detail = "Too many logins in progress, try again shortly."
+
+
+class HashingPool:
+    """Bounded thread pool for password hashing with backpressure."""
+
+    def __init__(self, workers, queue_size):
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hasher"
+        )
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def submit(self, fn, *args):
+        """Schedule fn on the pool, or raise HashingPoolFull if it is saturated."""
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolFull(wait=1)
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn, *args):
+        """Run fn on the pool and wait for its result."""
+        return self.submit(fn, *args).result()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_pool_pid = None
+
+
+def hashing_pool():
+    """Return this process's hashing pool, creating it on first use."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = HashingPool(hashing_setting("WORKERS"), hashing_setting("QUEUE_SIZE"))
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def credential_key(encoded, password):
+    """Return the cache key of a password checked against a stored hash."""
+    digest = hmac.new(
+        settings.SECRET_KEY.encode(),
+        f"{encoded}\0{password}".encode(),
+        hashlib.sha256,
+    ).hexdigest()
+    return f"auth:credential:{digest}"
+
+
+def verify_password(password, encoded):
+    """Check a password against a stored hash on the pool, with a short-lived cache."""
+    cache = caches[hashing_setting("CACHE_ALIAS")]
+    key = credential_key(encoded, password)
+    verified = cache.get(key)
+    if verified is None:
+        verified = hashing_pool().run(check_password, password, encoded)
+        cache.set(key, verified, timeout=hashing_setting("CACHE_TTL"))
+    return verified
+
+
+async def averify_password(password, encoded):
+    """Async variant of verify_password that awaits the pool and the cache from the event loop."""
+    cache = caches[hashing_setting("CACHE_ALIAS")]
+    key = credential_key(encoded, password)
+    verified = await cache.aget(key)
+    if verified is None:
+        future = hashing_pool().submit(check_password, password, encoded)
+        verified = await asyncio.wrap_future(future)
+        await cache.aset(key, verified, timeout=hashing_setting("CACHE_TTL"))
+    return verified
+
+
+def unknown_user_key(username, password):
+    """Return the cache key of a password tried for a user that does not exist."""
+    return credential_key(f"unknown\0{username}", password)
+
+
+def reject_unknown_user(username, password):
+    """Take as long as verify_password would, for a user that does not exist."""
+    cache = caches[hashing_setting("CACHE_ALIAS")]
+    key = unknown_user_key(username, password)
+    if cache.get(key) is None:
+        hashing_pool().run(make_password, password)
+        cache.set(key, False, timeout=hashing_setting("CACHE_TTL"))
+    return False
+
+
+async def areject_unknown_user(username, password):
+    """Async variant of reject_unknown_user."""
+    cache = caches[hashing_setting("CACHE_ALIAS")]
+    key = unknown_user_key(username, password)
+    if await cache.aget(key) is None:
+        await amake_password(password)
+        await cache.aset(key, False, timeout=hashing_setting("CACHE_TTL"))
+    return False
+
+
+async def amake_password(password):
+    """Hash a password on the pool without blocking the event loop."""
+    return await asyncio.wrap_future(hashing_pool().submit(make_password, password))
+
+
+def must_update(encoded):
+    """Check if a stored hash was made with an outdated hasher or parameters."""
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    preferred = get_hasher("default")
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
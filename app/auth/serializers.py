@@ -0,0 +1,21 @@
+"""
+Serializers for the token API.
+"""
+import time
+
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Issue token pairs carrying the claims stateless authentication needs."""
+
+    @classmethod
+    def get_token(cls, user):
+        """Add the user's identity and status claims to the token."""
+        token = super().get_token(user)
+        token["username"] = user.username
+        token["is_staff"] = user.is_staff
+        token["is_superuser"] = user.is_superuser
+        token["is_active"] = user.is_active
+        token["auth_time"] = int(time.time())
+        return token
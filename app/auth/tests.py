@@ -0,0 +1,185 @@
+"""
+Tests for token issuance and stateless JWT authentication.
+"""
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import authenticate, get_user_model
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.contrib.auth.hashers import make_password
+from django.http import HttpRequest
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from auth.blocklist import blocklist_cache, blocklist_key
+from auth.hashing import HashingPool
+from core.constants.mock_data import john_doe
+from core.throttling import get_store
+
+TOKEN_URL = reverse("token_obtain_pair")
+REFRESH_URL = reverse("token_refresh")
+ME_URL = reverse("user:me")
+FOLLOW_URL = reverse("user:follow")
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    """Tests for authenticating with token claims only."""
+
+    def setUp(self):
+        """Create a user and obtain a token pair for them."""
+        get_store().clear()
+        self.user = get_user_model().objects.create_user(**john_doe)
+        self.client = APIClient()
+        res = self.client.post(
+            TOKEN_URL, {"email": john_doe["email"], "password": john_doe["password"]}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.tokens = res.data
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+
+    def test_authenticated_request_skips_user_query(self):
+        """Test a cached profile is served without touching the database."""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], self.user.email)
+
+    def test_update_loads_full_user(self):
+        """Test views that need the full user still get it."""
+        res = self.client.patch(ME_URL, {"first_name": "Updated"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "Updated")
+
+    def test_token_user_id_matches_user_pk(self):
+        """Test token users compare equal to their id, e.g. when following oneself."""
+        other = get_user_model().objects.create_user(
+            email="other@example.com", username="other", password="testpass123"
+        )
+        payload = {"users": [str(other.id), str(self.user.id)]}
+
+        res = self.client.post(FOLLOW_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_changed_claims_revoke_tokens(self):
+        """Test tokens stop working once the staff status they carry changes."""
+        self.client.patch(ME_URL, {"first_name": "Updated"})
+        self.assertEqual(self.client.get(ME_URL).status_code, status.HTTP_200_OK)
+
+        self.user.is_staff = True
+        self.user.save()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        """Test tokens of deactivated users stop working."""
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revocation_reaches_other_processes(self):
+        """Test revocations go to a cache other worker processes read, not process memory."""
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertNotIsInstance(blocklist_cache(), LocMemCache)
+        other_process = caches.create_connection(settings.TOKEN_BLOCKLIST["ALIAS"])
+        self.assertIsNotNone(other_process.get(blocklist_key(self.user.pk)))
+
+    def test_refreshed_token_of_deactivated_user_is_rejected(self):
+        """Test access tokens refreshed after deactivation stay revoked."""
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.post(REFRESH_URL, {"refresh": self.tokens["refresh"]})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {res.data['access']}")
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PooledLoginTests(TestCase):
+    """Tests for password verification on the hashing pool."""
+
+    def setUp(self):
+        get_store().clear()
+        self.user = get_user_model().objects.create_user(**john_doe)
+        self.credentials = {"email": john_doe["email"], "password": john_doe["password"]}
+        self.client = APIClient()
+
+    def test_outdated_hash_is_upgraded_on_login(self):
+        """Test logging in rehashes passwords stored with an old hasher."""
+        legacy = make_password(john_doe["password"], hasher="pbkdf2_sha256")
+        get_user_model().objects.filter(pk=self.user.pk).update(password=legacy)
+
+        res = self.client.post(TOKEN_URL, self.credentials)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("argon2"))
+        self.assertTrue(self.user.check_password(john_doe["password"]))
+
+    def test_retried_login_skips_hashing(self):
+        """Test a retried login is answered from the verified-credential cache."""
+        self.client.post(TOKEN_URL, self.credentials)
+
+        with patch("auth.hashing.check_password") as patched_check:
+            res = self.client.post(TOKEN_URL, self.credentials)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        patched_check.assert_not_called()
+
+    def test_retried_unknown_user_skips_hashing(self):
+        """Test retries for unknown users are cached like those of known ones."""
+        payload = {"email": "nobody@example.com", "password": "testpass123"}
+        self.client.post(TOKEN_URL, payload)
+
+        with patch("auth.hashing.make_password") as patched_make:
+            res = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        patched_make.assert_not_called()
+
+    def test_saturated_pool_fails_login_outside_drf(self):
+        """Test a saturated pool fails plain logins, e.g. the admin's, without erroring."""
+        pool = HashingPool(workers=1, queue_size=0)
+        pool._slots.acquire()
+
+        with patch("auth.hashing.hashing_pool", return_value=pool):
+            user = authenticate(
+                HttpRequest(), username=john_doe["email"], password="testpass-other"
+            )
+
+        self.assertIsNone(user)
+
+    def test_wrong_password_is_rejected(self):
+        """Test a wrong password does not authenticate."""
+        payload = {**self.credentials, "password": "wrong-password"}
+
+        res = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_saturated_pool_applies_backpressure(self):
+        """Test logins are rejected with 429 when the pool is full."""
+        pool = HashingPool(workers=1, queue_size=0)
+        pool._slots.acquire()
+
+        with patch("auth.hashing.hashing_pool", return_value=pool):
+            res = self.client.post(TOKEN_URL, self.credentials)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res)
@@ -1,10 +1,13 @@
 from django.urls import path
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
+
+from auth.views import (
+    ThrottledTokenObtainPairView,
+    ThrottledTokenRefreshView,
+    obtain_token_pair,
 )
 
 urlpatterns = [
-    path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
-    path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("api/token/", ThrottledTokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path("api/token/refresh/", ThrottledTokenRefreshView.as_view(), name="token_refresh"),
+    path("api/async/token/", obtain_token_pair, name="async_token_obtain_pair"),
 ]
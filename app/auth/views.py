@@ -0,0 +1,87 @@
+"""
+Views for the token API: throttled simplejwt views and an async-native one.
+"""
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.utils.translation import gettext as _
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+
+from auth.hashing import (
+    HashingPoolFull,
+    amake_password,
+    areject_unknown_user,
+    averify_password,
+    must_update,
+)
+from auth.serializers import ClaimsTokenObtainPairSerializer
+from core.aio import (
+    aget,
+    asave,
+    async_api_view,
+    error_response,
+    parse_json,
+    throttled_response,
+)
+from core.throttling import CredentialThrottle, IPThrottle, acheck_rates
+
+
+class ThrottledTokenObtainPairView(TokenObtainPairView):
+    """TokenObtainPairView limited per client IP and per email tried."""
+
+    throttle_classes = [IPThrottle, CredentialThrottle]
+    throttle_scope = "login"
+
+
+class ThrottledTokenRefreshView(TokenRefreshView):
+    """TokenRefreshView limited per client IP."""
+
+    throttle_classes = [IPThrottle]
+    throttle_scope = "token_refresh"
+
+
+async def acheck_credentials(email, password):
+    """
+    Return the user with an email and whether the password is theirs
+    ((None, False) for unknown emails). Raises HashingPoolFull if the pool is saturated.
+    """
+    UserModel = get_user_model()
+    try:
+        user = await aget(UserModel._default_manager, **{UserModel.USERNAME_FIELD: email})
+    except UserModel.DoesNotExist:
+        return None, await areject_unknown_user(email, password)
+    verified = await averify_password(password, user.password)
+    if verified and must_update(user.password):
+        user.password = await amake_password(password)
+        await asave(user, update_fields=["password"])
+    return user, verified
+
+
+@async_api_view("POST")
+async def obtain_token_pair(request):
+    """Exchange an email and password for a refresh/access token pair."""
+    data = parse_json(request)
+    if data is None:
+        return error_response(_("Malformed request body."), 400)
+    errors = {
+        field: [_("This field is required.")]
+        for field in ("email", "password")
+        if not isinstance(data.get(field), str) or not data[field]
+    }
+    if errors:
+        return JsonResponse(errors, status=400)
+    wait = await acheck_rates(request, "login", data["email"])
+    if wait:
+        return throttled_response(wait)
+
+    try:
+        user, verified = await acheck_credentials(data["email"], data["password"])
+    except HashingPoolFull as exc:
+        return error_response(exc.detail, exc.status_code, headers={"Retry-After": "1"})
+
+    if not verified or not user.is_active:
+        return error_response(
+            _("No active account found with the given credentials"), 401
+        )
+
+    refresh = ClaimsTokenObtainPairSerializer.get_token(user)
+    return JsonResponse({"refresh": str(refresh), "access": str(refresh.access_token)})
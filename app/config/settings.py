@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -31,6 +32,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.QueryCountMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -40,6 +42,11 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+QUERY_COUNT = {
+    "REPEAT_THRESHOLD": 5,
+    "HEADERS": DEBUG,
+}
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -72,6 +79,66 @@ DATABASES = {
 }
 
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Entries every worker process must see, like token revocations. Files are shared
+    # by the processes of one host; point it at memcached/redis across hosts.
+    "shared": {
+        "BACKEND": os.environ.get(
+            "SHARED_CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"
+        ),
+        "LOCATION": os.environ.get(
+            "SHARED_CACHE_LOCATION", os.path.join(tempfile.gettempdir(), "app-shared-cache")
+        ),
+    },
+    # Serialized user profiles, kept per process; their version stamps are shared
+    # (see PROFILE_CACHE). Point it at memcached/redis to share the entries too.
+    "profiles": {
+        "BACKEND": os.environ.get(
+            "PROFILE_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("PROFILE_CACHE_LOCATION", "profiles"),
+        "TIMEOUT": 300,
+        # locmem evicts the least recently used entries past MAX_ENTRIES.
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+PROFILE_CACHE = {
+    "ALIAS": "profiles",
+    # Must be shared between processes, or edits only invalidate one worker's entries.
+    "STAMP_ALIAS": "shared",
+    # Bump when the profile serializer changes shape.
+    "VERSION": 1,
+}
+
+
+# The first hasher is used for new passwords; older hashes are upgraded on login.
+_PASSWORD_HASHERS = {
+    "argon2": "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "bcrypt": "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+}
+PASSWORD_HASHER = os.environ.get("PASSWORD_HASHER", "argon2")
+
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    hasher for name, hasher in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+] + ["django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher"]
+
+AUTHENTICATION_BACKENDS = ["auth.backends.PooledModelBackend"]
+
+PASSWORD_HASHING = {
+    # Hashes verified at once; defaults to the number of CPUs.
+    "WORKERS": int(os.environ.get("PASSWORD_HASHING_WORKERS", os.cpu_count() or 1)),
+    # Logins waiting for a worker before new ones are rejected with 429.
+    "QUEUE_SIZE": 64,
+    # Seconds a verified (hash, password) pair is remembered.
+    "CACHE_TTL": 30,
+}
+
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -105,6 +172,17 @@ MEDIA_URL = "/static/media/"
 MEDIA_ROOT = "/vol/web/media"
 STATIC_ROOT = "/vol/web/static"
 
+# Uploads are stored once under their content digest; see core.storage.
+DEFAULT_FILE_STORAGE = "core.storage.ContentAddressedStorage"
+
+IMAGE_PIPELINE = {
+    # "process", "thread" or "inline" (render synchronously, for tests and scripts).
+    "EXECUTOR": os.environ.get("IMAGE_PIPELINE_EXECUTOR", "process"),
+    "WORKERS": 2,
+    "FORMAT": "WEBP",
+    "QUALITY": 80,
+}
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "user.User"
@@ -112,10 +190,78 @@ AUTH_USER_MODEL = "user.User"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # Swap for "rest_framework_simplejwt.authentication.JWTAuthentication" to load
+        # the user row on every request instead of trusting the token claims.
+        "auth.authentication.StatelessJWTAuthentication",
     ],
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.KeysetPagination",
+    "PAGE_SIZE": 50,
+    # Proxies in front of the app that append to X-Forwarded-For; with 0 the client
+    # IP is REMOTE_ADDR, so clients cannot pick their throttle bucket with the header.
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", 0)),
+    # "<throttle_scope>.<kind>" rates for the token bucket throttles in core.throttling.
+    "DEFAULT_THROTTLE_RATES": {
+        "signup.ip": "30/hour",
+        "login.ip": "60/min",
+        "login.credential": "10/min",
+        "token_refresh.ip": "120/min",
+        "follow.user": "120/hour",
+    },
+}
+
+SIMPLE_JWT = {
+    "TOKEN_OBTAIN_SERIALIZER": "auth.serializers.ClaimsTokenObtainPairSerializer",
+    "TOKEN_USER_CLASS": "auth.authentication.LazyTokenUser",
+}
+
+TOKEN_BLOCKLIST = {
+    # Must be shared between processes, or revocations only reach one worker.
+    "ALIAS": "shared",
+}
+
+THROTTLING = {
+    # Swap for "core.throttling.CacheWindowStore" to share limits between processes.
+    "STORE": "core.throttling.LocalBucketStore",
 }
 
 SPECTACULAR_SETTINGS = {
     "COMPONENT_SPLIT_REQUEST": True,
 }
+
+TIMELINE = {
+    "STORE": "post.timeline.DatabaseTimelineStore",
+    # Authors above this many followers are merged in on read instead of fanned out.
+    "CELEBRITY_THRESHOLD": 10000,
+}
+
+COUNTERS = {
+    # Buffered view and reaction increments are written out this often per process.
+    "FLUSH_SECONDS": 5,
+    # Rows each post's count per reaction type is spread over.
+    "SHARDS": 8,
+}
+
+TAGS = {
+    # Popularity counts tag uses of this window, halving in weight every HALF_LIFE_HOURS.
+    "WINDOW_DAYS": 7,
+    "HALF_LIFE_HOURS": 24,
+    # Tags ranked by the rank_tags command.
+    "TRENDING": 50,
+}
+
+COMMENTS = {
+    # Replies loaded under a page of top-level comments; the rest are linked.
+    "MAX_DEPTH": 5,
+    "MAX_REPLIES": 200,
+}
+
+AUTOCOMPLETE = {
+    # Most followed users held in each process's prefix index.
+    "MAX_ENTRIES": 200000,
+    "REFRESH_SECONDS": 600,
+}
+
+RECOMMENDATIONS = {
+    # Suggestions stored per user by the recommend_follows command.
+    "TOP_N": 50,
+}
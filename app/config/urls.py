@@ -17,6 +17,7 @@ urlpatterns = [
         name="api-docs",
     ),
     path("api/user/", include("user.urls")),
+    path("api/post/", include("post.urls")),
     path("", include("auth.urls")),
 ]
 
@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Build the autocomplete index in the background now, not on the first lookup,
+# and write buffered counters out on a timer rather than on request threads.
+from post.counters import flusher  # noqa: E402
+from user.autocomplete import user_autocomplete  # noqa: E402
+
+user_autocomplete.start()
+flusher.start()
@@ -0,0 +1,68 @@
+"""
+Helpers for async-native views.
+
+Django 4.1+ ships async queryset methods (``aget``, ``acreate``, ...) and 4.2
+adds ``Model.asave``. These helpers use them when available and fall back to
+running the single ORM call through ``sync_to_async`` on older versions, so
+only the query itself, never the whole request, leaves the event loop.
+"""
+import functools
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotAllowed, JsonResponse
+from rest_framework.exceptions import Throttled
+
+
+async def aget(queryset, **kwargs):
+    """Async equivalent of queryset.get()."""
+    if hasattr(queryset, "aget"):
+        return await queryset.aget(**kwargs)
+    return await sync_to_async(queryset.get)(**kwargs)
+
+
+async def asave(instance, **kwargs):
+    """Async equivalent of instance.save()."""
+    if hasattr(instance, "asave"):
+        return await instance.asave(**kwargs)
+    return await sync_to_async(instance.save)(**kwargs)
+
+
+def async_api_view(*methods):
+    """
+    Turn an async function into a JSON API view accepting the given methods.
+    The view is CSRF exempt, like DRF views, since it does not use sessions.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            return await view(request, *args, **kwargs)
+
+        wrapper.csrf_exempt = True
+        return wrapper
+
+    return decorator
+
+
+def parse_json(request):
+    """Return the JSON object in the request body, or None if it is not one."""
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def error_response(detail, status, **kwargs):
+    """Return a DRF-style error response."""
+    return JsonResponse({"detail": detail}, status=status, **kwargs)
+
+
+def throttled_response(wait):
+    """Return the 429 response DRF sends when a throttle refuses a request."""
+    exc = Throttled(wait)
+    return error_response(exc.detail, exc.status_code, headers={"Retry-After": str(math.ceil(wait))})
@@ -0,0 +1,244 @@
+"""
+Benchmarks of the user and auth API.
+
+The benchmark seeds users and follow edges scaled up from the mock data
+generators, then drives each scenario through Django's test client from a
+pool of threads, one client and database connection per thread. Requests
+run in process, so the figures measure the application and database
+without network noise, and every request's queries can be counted. The
+report is JSON; ``compare`` flags scenarios that got slower or run more
+queries than a stored baseline.
+"""
+import itertools
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from auth.serializers import ClaimsTokenObtainPairSerializer
+from core.constants.mock_data import mock_user
+from core.queries import record_queries
+from user.models import UserFollow
+from user.transfer import UserImporter
+
+
+BENCH_PASSWORD = "bench-password"
+
+# Seeded users are "<first>.<last>.bench<n>".
+BENCH_USERNAME = r"\.bench[0-9]+$"
+
+# Seeded users a run signs requests as; each gets a token pair up front.
+SAMPLE_SIZE = 1000
+
+PERCENTILES = (50, 95, 99)
+
+
+def seed(users, follows, batch_size=1000, stdout=None):
+    """
+    Create the missing seeded users, then add random follow edges among them
+    until there are at least ``follows``. Returns (users, follows) created.
+    """
+    User = get_user_model()
+    existing = User.objects.filter(username__regex=BENCH_USERNAME).count()
+    encoded = make_password(BENCH_PASSWORD)
+    records = (
+        {**mock_user(salt=f"bench{number}"), "password": encoded}
+        for number in range(existing, users)
+    )
+    importer = UserImporter(batch_size=batch_size)
+    importer.run(records)
+
+    ids = list(User.objects.filter(username__regex=BENCH_USERNAME).values_list("id", flat=True))
+    bench_follows = UserFollow.objects.filter(follower_id__in=ids)
+    before = total = bench_follows.count()
+    # Stop short of the target if the seeded users cannot form that many edges.
+    target = min(follows, len(ids) * (len(ids) - 1))
+    while total < target:
+        edges = {tuple(random.sample(ids, 2)) for _ in range(min(target - total, batch_size))}
+        UserFollow.objects.bulk_create(
+            [UserFollow(follower_id=a, following_id=b) for a, b in edges],
+            ignore_conflicts=True,
+        )
+        total = bench_follows.count()
+    if total > before:
+        # bulk_create skips the signals that keep the counters current.
+        call_command("recount_follows", stdout=stdout)
+    return importer.created, total - before
+
+
+def percentile(ordered, pct):
+    """Return the nearest-rank percentile of a sorted list."""
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[rank - 1]
+
+
+def scenario_create(benchmark, client, rng):
+    """Sign up a new user."""
+    payload = mock_user(salt=f"{benchmark.run_id}{next(benchmark.counter)}")
+    return client.post(reverse("user:create"), payload)
+
+
+def scenario_me(benchmark, client, rng):
+    """Fetch the profile of a signed-in user."""
+    user = rng.choice(benchmark.users)
+    return client.get(reverse("user:me"), HTTP_AUTHORIZATION=f"Bearer {user['access']}")
+
+
+def scenario_token(benchmark, client, rng):
+    """Log in with email and password."""
+    user = rng.choice(benchmark.users)
+    payload = {"email": user["email"], "password": BENCH_PASSWORD}
+    return client.post(reverse("token_obtain_pair"), payload)
+
+
+def scenario_token_refresh(benchmark, client, rng):
+    """Exchange a refresh token for an access token."""
+    user = rng.choice(benchmark.users)
+    return client.post(reverse("token_refresh"), {"refresh": user["refresh"]})
+
+
+def scenario_followers(benchmark, client, rng):
+    """List the followers of a user."""
+    user = rng.choice(benchmark.users)
+    return client.get(reverse("user:followers", args=[user["slug"]]))
+
+
+def scenario_following(benchmark, client, rng):
+    """List the users a user follows."""
+    user = rng.choice(benchmark.users)
+    return client.get(reverse("user:following", args=[user["slug"]]))
+
+
+SCENARIOS = {
+    "create": scenario_create,
+    "me": scenario_me,
+    "token": scenario_token,
+    "token_refresh": scenario_token_refresh,
+    "followers": scenario_followers,
+    "following": scenario_following,
+}
+
+
+class Benchmark:
+    """Runs scenarios against the seeded users and collects their figures."""
+
+    def __init__(self, requests=200, concurrency=8, random_seed=None):
+        self.requests = requests
+        self.concurrency = concurrency
+        self.random = random.Random(random_seed)
+        self.run_id = uuid.uuid4().hex[:8]
+        self.counter = itertools.count()
+        self.users = []
+
+    def load_users(self):
+        """Sign a sample of the seeded users in, outside of the timed requests."""
+        users = get_user_model().objects.filter(username__regex=BENCH_USERNAME).order_by("?")
+        for user in users[:SAMPLE_SIZE]:
+            refresh = ClaimsTokenObtainPairSerializer.get_token(user)
+            self.users.append(
+                {
+                    "email": user.email,
+                    "slug": user.slug,
+                    "refresh": str(refresh),
+                    "access": str(refresh.access_token),
+                }
+            )
+        return self.users
+
+    def run(self, names):
+        """Run the named scenarios one after another; returns the report."""
+        if not self.users and not self.load_users():
+            raise ValueError("No seeded users: run the benchmark with seeding first.")
+        # The client's host must be allowed, and throttles would cut the run short.
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}},
+        ):
+            scenarios = {name: self.run_scenario(SCENARIOS[name]) for name in names}
+        return {
+            "meta": {
+                "requests": self.requests,
+                "concurrency": self.concurrency,
+                "users": get_user_model().objects.count(),
+                "follows": UserFollow.objects.count(),
+                "database": connections["default"].vendor,
+            },
+            "scenarios": scenarios,
+        }
+
+    def run_scenario(self, scenario):
+        """Send the scenario's requests from the thread pool and summarize them."""
+        size, extra = divmod(self.requests, self.concurrency)
+        shares = [size + (index < extra) for index in range(self.concurrency)]
+        shares = [share for share in shares if share]
+        seeds = [self.random.random() for _ in shares]
+        start = time.perf_counter()
+        if len(shares) == 1:
+            samples = self.send(scenario, shares[0], seeds[0])
+        else:
+            with ThreadPoolExecutor(max_workers=len(shares)) as pool:
+                batches = pool.map(self.send_in_thread, itertools.repeat(scenario), shares, seeds)
+                samples = [sample for batch in batches for sample in batch]
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency for latency, _, _ in samples)
+        return {
+            "requests": len(samples),
+            "errors": sum(status >= 400 for _, _, status in samples),
+            "throughput": round(len(samples) / elapsed, 2) if elapsed else None,
+            **{
+                f"p{pct}_ms": round(percentile(latencies, pct) * 1000, 3)
+                for pct in PERCENTILES
+            },
+            "queries_per_request": round(sum(q for _, q, _ in samples) / len(samples), 2),
+        }
+
+    def send(self, scenario, count, seed):
+        """Send count requests with one client; returns (seconds, queries, status) tuples."""
+        client, rng = Client(), random.Random(seed)
+        samples = []
+        for _ in range(count):
+            with record_queries() as recorder:
+                start = time.perf_counter()
+                response = scenario(self, client, rng)
+                latency = time.perf_counter() - start
+            samples.append((latency, recorder.count, response.status_code))
+        return samples
+
+    def send_in_thread(self, scenario, count, seed):
+        """Send requests from a pool thread, closing its connections after."""
+        try:
+            return self.send(scenario, count, seed)
+        finally:
+            connections.close_all()
+
+
+def compare(report, baseline, tolerance=0.1):
+    """
+    Return the regressions of a report against a baseline report: scenarios
+    whose throughput fell, or whose p95/p99 latency or queries per request
+    rose, by more than the tolerance.
+    """
+    regressions = []
+    for name, result in report["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        if result["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {result['throughput']}/s, was {base['throughput']}/s"
+            )
+        for metric in ("p95_ms", "p99_ms", "queries_per_request"):
+            if result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {result[metric]}, was {base[metric]}")
+    return regressions
@@ -66,3 +66,56 @@ tags = [
     "Git",
     "IDE",
 ]
+
+words = [
+    "the",
+    "a",
+    "of",
+    "and",
+    "to",
+    "in",
+    "with",
+    "for",
+    "on",
+    "how",
+    "why",
+    "when",
+    "building",
+    "scaling",
+    "testing",
+    "debugging",
+    "writing",
+    "reading",
+    "learning",
+    "shipping",
+    "fast",
+    "simple",
+    "modern",
+    "practical",
+    "better",
+    "small",
+    "large",
+    "distributed",
+    "async",
+    "clean",
+    "api",
+    "database",
+    "query",
+    "index",
+    "cache",
+    "server",
+    "client",
+    "model",
+    "view",
+    "test",
+    "service",
+    "project",
+    "code",
+    "data",
+    "team",
+    "bug",
+    "feature",
+    "release",
+    "performance",
+    "design",
+]
@@ -0,0 +1,367 @@
+"""
+Synthetic datasets shaped like production, for reproducing scaling problems.
+
+Everything is drawn from NumPy generators seeded with (seed, stream), so a
+seed always yields the same rows and each kind of row has its own stream:
+generating posts does not change the users. Rows are built in batches of
+model instances and loaded with ``COPY`` on PostgreSQL, batched raw
+inserts elsewhere; signals do not fire, so denormalized counters and the search
+index are refreshed once the load is done.
+
+Follow targets and post authors are drawn with Zipf-like popularity over a
+random order of the users, so follower and post counts per user follow a
+power law with exponent ``exponent`` (a few users have most followers,
+most have a handful), while the number of users each one follows is
+Poisson around the mean. Tags are drawn the same way over the tags, and
+published posts get Poisson numbers of comments and reactions, plus the
+timeline entries ``fan_out`` would have written.
+
+Posts and comments are numbered before loading (see ``next_id``), since a
+comment's path holds its id; sequences are moved past them afterwards.
+"""
+import io
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connections, router, transaction
+from django.db.models import JSONField, Max
+
+from core.constants.constants import first_names, last_names, words
+from post.models import MAX_COMMENT_DEPTH, Comment, Post, Reaction, TimelineEntry, path_segment
+from user.models import UserFollow
+
+
+# Row timestamps fall in the SPAN before this, so a seed always gives the same rows.
+REFERENCE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+SPAN = timedelta(days=3 * 365)
+
+PASSWORD = "generated-password"
+
+STREAMS = {"users": 1, "follows": 2, "posts": 3, "tags": 4, "comments": 5, "reactions": 6}
+
+# Share of comments that reply to an earlier comment on the post.
+REPLY_SHARE = 0.6
+
+
+def copy_value(value):
+    """Format a database value for COPY's text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    text = str(value)
+    for char, escaped in (("\\", "\\\\"), ("\t", "\\t"), ("\n", "\\n"), ("\r", "\\r")):
+        text = text.replace(char, escaped)
+    return text
+
+
+def load(model, instances):
+    """
+    Insert a batch of unsaved instances in one transaction, with COPY on PostgreSQL.
+    Values are stored as set, like fixtures: auto_now fields keep generated times.
+    """
+    if not instances:
+        return
+    connection = connections[router.db_for_write(model)]
+    fields = model._meta.concrete_fields
+    if instances[0].pk is None:
+        # Let the database number the rows.
+        fields = [field for field in fields if field is not model._meta.auto_field]
+    with transaction.atomic(using=connection.alias):
+        if connection.vendor != "postgresql":
+            size = connection.ops.bulk_batch_size(fields, instances) or len(instances)
+            for start in range(0, len(instances), size):
+                model._base_manager._insert(
+                    instances[start:start + size], fields=fields, using=connection.alias, raw=True
+                )
+            return
+        buffer = io.StringIO()
+        for instance in instances:
+            values = []
+            for field in fields:
+                value = getattr(instance, field.attname)
+                if isinstance(field, JSONField):
+                    value = json.dumps(value, cls=field.encoder)
+                else:
+                    value = field.get_db_prep_save(value, connection)
+                values.append(copy_value(value))
+            buffer.write("\t".join(values) + "\n")
+        buffer.seek(0)
+        qn = connection.ops.quote_name
+        columns = ", ".join(qn(field.column) for field in fields)
+        with connection.cursor() as cursor:
+            cursor.cursor.copy_expert(
+                f"COPY {qn(model._meta.db_table)} ({columns}) FROM STDIN", buffer
+            )
+
+
+def next_id(model):
+    """Return the id after the largest one in the model's table."""
+    return (model._base_manager.aggregate(last=Max("pk"))["last"] or 0) + 1
+
+
+def reset_sequences(*models):
+    """Move the id sequences past rows loaded with their ids, like loaddata does."""
+    connection = connections[router.db_for_write(models[0])]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+class DataGenerator:
+    """Deterministic generator of users, follows, posts and their activity, in batches."""
+
+    def __init__(self, seed=0, batch_size=10000, exponent=2.1):
+        self.seed = seed
+        self.batch_size = batch_size
+        self.exponent = exponent
+
+    def rng(self, stream, *key):
+        return np.random.default_rng([self.seed, STREAMS[stream], *key])
+
+    def timestamps(self, rng, count):
+        """Return count datetimes spread over the SPAN before REFERENCE_TIME."""
+        seconds = rng.uniform(0, SPAN.total_seconds(), count)
+        return [REFERENCE_TIME - timedelta(seconds=float(value)) for value in seconds]
+
+    def popularity(self, rng, count):
+        """
+        Return cumulative draw probabilities over count items: the item of
+        rank r is drawn in proportion to r ** -(1 / (exponent - 1)), which gives
+        draw counts a power-law tail of the given exponent.
+        """
+        weights = np.arange(1, count + 1, dtype=np.float64) ** (-1 / (self.exponent - 1))
+        cumulative = np.cumsum(weights[rng.permutation(count)])
+        return cumulative / cumulative[-1]
+
+    def users(self, count, start=0):
+        """Yield batches of unsaved users numbered start to start + count - 1."""
+        User = get_user_model()
+        password = make_password(PASSWORD)
+        for offset in range(start, start + count, self.batch_size):
+            rng = self.rng("users", offset)
+            size = min(self.batch_size, start + count - offset)
+            firsts = rng.integers(len(first_names), size=size)
+            lasts = rng.integers(len(last_names), size=size)
+            ids = rng.bytes(16 * size)
+            joined = self.timestamps(rng, size)
+            batch = []
+            for index in range(size):
+                first, last = first_names[firsts[index]], last_names[lasts[index]]
+                number = offset + index
+                batch.append(
+                    User(
+                        id=uuid.UUID(bytes=ids[16 * index:16 * index + 16], version=4),
+                        username=f"{first.lower()}.{last.lower()}.{number}",
+                        slug=f"{first.lower()}-{last.lower()}-{number}",
+                        email=f"{first.lower()}.{last.lower()}.{number}@example.com",
+                        first_name=first,
+                        last_name=last,
+                        password=password,
+                        date_joined=joined[index],
+                    )
+                )
+            yield batch
+
+    def follows(self, user_ids, mean_degree):
+        """Yield batches of unsaved follows among the given users, without duplicates."""
+        count = len(user_ids)
+        if count < 2:
+            return
+        cumulative = self.popularity(self.rng("follows"), count)
+        for offset in range(0, count, self.batch_size):
+            rng = self.rng("follows", offset + 1)
+            sources = np.arange(offset, min(offset + self.batch_size, count))
+            degrees = np.minimum(rng.poisson(mean_degree, len(sources)), count - 1)
+            followers = np.repeat(sources, degrees)
+            following = np.searchsorted(cumulative, rng.random(len(followers)), side="right")
+            following = np.minimum(following, count - 1)
+            # A follower appears in one batch only, so deduplicating per batch is enough.
+            pairs = np.unique(followers.astype(np.int64) * count + following)
+            followers, following = np.divmod(pairs, count)
+            keep = followers != following
+            created = self.timestamps(rng, int(keep.sum()))
+            yield [
+                UserFollow(
+                    follower_id=user_ids[follower],
+                    following_id=user_ids[target],
+                    created_at=created[index],
+                )
+                for index, (follower, target) in enumerate(
+                    zip(followers[keep], following[keep])
+                )
+            ]
+
+    def posts(self, user_ids, count, start=0, first_id=1):
+        """
+        Yield count unsaved posts in batches, by authors drawn with power-law
+        popularity, with ids from first_id. Slugs end with the seed, the run's
+        start and the post's number in the run, so runs with disjoint starts combine.
+        """
+        if not user_ids:
+            return
+        cumulative = self.popularity(self.rng("posts"), len(user_ids))
+        slug_length = Post._meta.get_field("slug").max_length
+        for offset in range(0, count, self.batch_size):
+            rng = self.rng("posts", start, offset + 1)
+            size = min(self.batch_size, count - offset)
+            authors = np.searchsorted(cumulative, rng.random(size), side="right")
+            authors = np.minimum(authors, len(user_ids) - 1)
+            title_lengths = rng.integers(3, 9, size=size)
+            content_lengths = rng.poisson(150, size=size) + 20
+            published = rng.random(size) < 0.9
+            created = self.timestamps(rng, size)
+            batch = []
+            for index in range(size):
+                title = " ".join(
+                    words[word] for word in rng.integers(len(words), size=title_lengths[index])
+                ).capitalize()
+                content = " ".join(
+                    words[word] for word in rng.integers(len(words), size=content_lengths[index])
+                )
+                tail = f"-{self.seed}-{start}-{offset + index}"
+                batch.append(
+                    Post(
+                        id=first_id + offset + index,
+                        title=title,
+                        excerpt=" ".join(content.split()[:30]),
+                        content=content.capitalize() + ".",
+                        author_id=user_ids[authors[index]],
+                        slug=title.lower().replace(" ", "-")[: slug_length - len(tail)] + tail,
+                        is_published=bool(published[index]),
+                        published_at=created[index] if published[index] else None,
+                        created_at=created[index],
+                        updated_at=created[index],
+                    )
+                )
+            yield batch
+
+    def tag_names(self, count):
+        """Return count tag names, made of words."""
+        return [
+            words[index % len(words)] + (str(index // len(words)) if index >= len(words) else "")
+            for index in range(count)
+        ]
+
+    def post_tags(self, posts, tag_ids, mean_tags, start=0, number=0):
+        """
+        Return Post-Tag rows for a batch of posts, with tags drawn by power-law
+        popularity. Batches are keyed like posts: the run's start and the
+        number of the batch's first post.
+        """
+        if not tag_ids:
+            return []
+        cumulative = self.popularity(self.rng("tags"), len(tag_ids))
+        rng = self.rng("tags", start, number + 1)
+        counts = rng.poisson(mean_tags, len(posts))
+        rows = []
+        for post, count in zip(posts, counts):
+            drawn = np.searchsorted(cumulative, rng.random(count), side="right")
+            rows.extend(
+                Post.tags.through(post_id=post.pk, tag_id=tag_ids[tag])
+                for tag in np.unique(np.minimum(drawn, len(tag_ids) - 1))
+            )
+        return rows
+
+    def activity_times(self, rng, post, count):
+        """Return count sorted datetimes between a post's publication and REFERENCE_TIME."""
+        span = (REFERENCE_TIME - post.published_at).total_seconds()
+        seconds = np.sort(rng.uniform(0, span, count))
+        return [post.published_at + timedelta(seconds=float(value)) for value in seconds]
+
+    def comments(self, posts, user_ids, mean_comments, first_id=1, start=0, number=0):
+        """
+        Return threaded comments on the published posts of a batch, with ids
+        from first_id. A share of them reply to an earlier comment of the post.
+        """
+        rng = self.rng("comments", start, number + 1)
+        counts = rng.poisson(mean_comments, len(posts))
+        batch = []
+        for post, count in zip(posts, counts):
+            if not post.is_published or not count:
+                continue
+            created = self.activity_times(rng, post, count)
+            authors = rng.integers(len(user_ids), size=count)
+            lengths = rng.poisson(25, size=count) + 3
+            replies = rng.random(count) < REPLY_SHARE
+            parents = rng.random(count)
+            thread = []
+            for index in range(count):
+                parent = thread[int(parents[index] * index)] if index and replies[index] else None
+                if parent is not None and parent.depth >= MAX_COMMENT_DEPTH:
+                    parent = None
+                comment_id = first_id + len(batch)
+                comment = Comment(
+                    id=comment_id,
+                    content=" ".join(
+                        words[word] for word in rng.integers(len(words), size=lengths[index])
+                    ).capitalize() + ".",
+                    author_id=user_ids[authors[index]],
+                    post_id=post.pk,
+                    parent_id=parent.pk if parent else None,
+                    path=(parent.path if parent else "") + path_segment(comment_id),
+                    depth=parent.depth + 1 if parent else 0,
+                    created_at=created[index],
+                    updated_at=created[index],
+                )
+                thread.append(comment)
+                batch.append(comment)
+        return batch
+
+    def reactions(self, posts, user_ids, type_ids, mean_reactions, start=0, number=0):
+        """
+        Return reactions to the published posts of a batch, one per user and
+        post, with types drawn by power-law popularity.
+        """
+        if not type_ids:
+            return []
+        cumulative = self.popularity(self.rng("reactions"), len(type_ids))
+        rng = self.rng("reactions", start, number + 1)
+        counts = np.minimum(rng.poisson(mean_reactions, len(posts)), len(user_ids))
+        batch = []
+        for post, count in zip(posts, counts):
+            if not post.is_published or not count:
+                continue
+            users = rng.choice(len(user_ids), size=count, replace=False)
+            types = np.searchsorted(cumulative, rng.random(count), side="right")
+            types = np.minimum(types, len(type_ids) - 1)
+            created = self.activity_times(rng, post, count)
+            batch.extend(
+                Reaction(
+                    user_id=user_ids[user],
+                    post_id=post.pk,
+                    reaction_type_id=type_ids[reaction_type],
+                    created_at=created[index],
+                )
+                for index, (user, reaction_type) in enumerate(zip(users, types))
+            )
+        return batch
+
+    def timeline_entries(self, posts, followers, threshold):
+        """
+        Return the timeline entries fan_out writes for the published posts of a
+        batch: the author's, and their followers' unless they have threshold or more.
+        """
+        entries = []
+        for post in posts:
+            if not post.is_published:
+                continue
+            owners = followers.get(post.author_id, [])
+            if len(owners) >= threshold:
+                owners = []
+            entries.extend(
+                TimelineEntry(
+                    owner_id=owner_id,
+                    post_id=post.pk,
+                    author_id=post.author_id,
+                    published_at=post.published_at,
+                )
+                for owner_id in [post.author_id, *owners]
+            )
+        return entries
@@ -0,0 +1,122 @@
+"""
+Migration operations that adapt to the database backend.
+"""
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db.migrations.operations import AddIndex
+from django.db.migrations.operations.base import Operation
+
+from core.search import TOKENIZERS, fts_table
+
+
+class AddIndexConcurrentlyIfSupported(AddIndexConcurrently):
+    """
+    Build the index with CREATE INDEX CONCURRENTLY on PostgreSQL, so writes to
+    the table are not blocked, and fall back to a plain AddIndex elsewhere.
+    Migrations using it must set ``atomic = False``.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        return AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        return AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class CreateSearchIndex(Operation):
+    """
+    Create the full-text index of a model: a GIN index on its search_vector
+    column on PostgreSQL, or an FTS5 table over the given fields on SQLite.
+    The index lives outside the model state, like any raw SQL.
+    """
+
+    reduces_to_sql = True
+    reversible = True
+
+    def __init__(self, model_name, fields, config="simple"):
+        self.model_name = model_name
+        self.fields = fields
+        self.config = config
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        table = model._meta.db_table
+        qn = schema_editor.quote_name
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.execute(
+                f"CREATE INDEX {qn(table + '_search_idx')} ON {qn(table)} "
+                f"USING gin ({qn('search_vector')})"
+            )
+        elif schema_editor.connection.vendor == "sqlite":
+            columns = ", ".join(qn(model._meta.get_field(field).column) for field in self.fields)
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE {qn(fts_table(table))} USING fts5("
+                f"object_id UNINDEXED, {columns}, tokenize='{TOKENIZERS[self.config]}')"
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        table = model._meta.db_table
+        qn = schema_editor.quote_name
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.execute(f"DROP INDEX IF EXISTS {qn(table + '_search_idx')}")
+        elif schema_editor.connection.vendor == "sqlite":
+            schema_editor.execute(f"DROP TABLE IF EXISTS {qn(fts_table(table))}")
+
+    def describe(self):
+        return f"Create full-text search index on {self.model_name}"
+
+    def deconstruct(self):
+        kwargs = {"model_name": self.model_name, "fields": self.fields, "config": self.config}
+        return self.__class__.__qualname__, [], kwargs
+
+
+class CreateTrigramIndexIfSupported(Operation):
+    """
+    Create a trigram GIN index on a field for fuzzy and prefix matching.
+    PostgreSQL only (it also enables pg_trgm); a no-op elsewhere.
+    """
+
+    reduces_to_sql = True
+    reversible = True
+
+    def __init__(self, model_name, field):
+        self.model_name = model_name
+        self.field = field
+
+    def index_name(self, model):
+        return f"{model._meta.db_table}_{self.field}_trgm"
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        model = to_state.apps.get_model(app_label, self.model_name)
+        qn = schema_editor.quote_name
+        column = model._meta.get_field(self.field).column
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            f"CREATE INDEX {qn(self.index_name(model))} ON {qn(model._meta.db_table)} "
+            f"USING gin ({qn(column)} gin_trgm_ops)"
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        model = from_state.apps.get_model(app_label, self.model_name)
+        schema_editor.execute(f"DROP INDEX IF EXISTS {schema_editor.quote_name(self.index_name(model))}")
+
+    def describe(self):
+        return f"Create trigram index on {self.model_name}.{self.field}"
+
+    def deconstruct(self):
+        kwargs = {"model_name": self.model_name, "field": self.field}
+        return self.__class__.__qualname__, [], kwargs
@@ -0,0 +1,78 @@
+"""
+Django command to benchmark the user and auth API.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import SCENARIOS, Benchmark, compare, seed
+
+
+class Command(BaseCommand):
+    """Django command to measure throughput, latency and queries per request."""
+
+    help = (
+        "Seed benchmark users and follows, drive the user/auth endpoints with "
+        "concurrent clients and report the results as JSON. Writes to the "
+        "configured database: never run it against production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000, help="Seeded users.")
+        parser.add_argument("--follows", type=int, default=10000, help="Seeded follow edges.")
+        parser.add_argument("--no-seed", action="store_true", help="Reuse the seeded data as is.")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per scenario.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Client threads.")
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            choices=sorted(SCENARIOS),
+            help="Scenario to run; repeat for several. Defaults to all of them.",
+        )
+        parser.add_argument("--random-seed", type=int)
+        parser.add_argument("--output", help="File to write the report to, instead of stdout.")
+        parser.add_argument("--baseline", help="Report to compare against.")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.1,
+            help="Relative change against the baseline reported as a regression.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+        if not options["no_seed"]:
+            users, follows = seed(options["users"], options["follows"], stdout=self.stderr)
+            self.stderr.write(f"Seeded {users} users and {follows} follows.")
+
+        benchmark = Benchmark(
+            requests=options["requests"],
+            concurrency=options["concurrency"],
+            random_seed=options["random_seed"],
+        )
+        try:
+            report = benchmark.run(options["scenario"] or list(SCENARIOS))
+        except ValueError as error:
+            raise CommandError(error)
+
+        if options["baseline"]:
+            try:
+                with open(options["baseline"]) as stream:
+                    baseline = json.load(stream)
+            except (OSError, ValueError) as error:
+                raise CommandError(f"Cannot read the baseline: {error}")
+            report["regressions"] = compare(report, baseline, options["tolerance"])
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as stream:
+                stream.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+        if report.get("regressions"):
+            raise CommandError(
+                "Regressions against the baseline:\n" + "\n".join(report["regressions"])
+            )
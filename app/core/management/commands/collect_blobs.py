@@ -0,0 +1,53 @@
+"""
+Django command to delete content-addressed blobs nothing references.
+"""
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Blob
+
+
+class Command(BaseCommand):
+    """Django command to collect unreferenced blobs."""
+
+    help = "Delete stored blobs that no model field has referenced for a while."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Keep unreferenced blobs stored more recently than this.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only report what would be deleted."
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        cutoff = timezone.now() - timedelta(hours=options["grace_hours"])
+        orphans = Blob.objects.filter(refs=0, stored_at__lt=cutoff)
+        if options["dry_run"]:
+            count = orphans.count()
+            self.stdout.write(f"{count} blobs would be collected.")
+            return
+
+        collected = 0
+        ids = list(orphans.values_list("id", flat=True))
+        batch_size = options["batch_size"]
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            with transaction.atomic():
+                # Re-check under a row lock: an upload or owner may have claimed the blob.
+                blobs = list(orphans.select_for_update().filter(id__in=batch))
+                for blob in blobs:
+                    default_storage.delete(blob.name)
+                Blob.objects.filter(id__in=[blob.id for blob in blobs]).delete()
+            collected += len(blobs)
+
+        self.stdout.write(self.style.SUCCESS(f"Collected {collected} blobs."))
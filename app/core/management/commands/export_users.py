@@ -0,0 +1,31 @@
+"""
+Django command to stream every user to an NDJSON or CSV file.
+"""
+from django.core.management.base import BaseCommand
+
+from user.transfer import FORMATS, detect_format, export_users
+
+
+class Command(BaseCommand):
+    """Django command to export users in constant memory."""
+
+    help = "Export users as NDJSON or CSV, to a file or standard output."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", help="File to write; standard output if omitted.")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument(
+            "--with-password-hashes",
+            action="store_true",
+            help="Include encoded password hashes, for import into another instance.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        path = options["path"]
+        file_format = detect_format(path or "", options["format"])
+        if path is None:
+            export_users(self.stdout, file_format, options["with_password_hashes"])
+            return
+        with open(path, "w", newline="", encoding="utf-8") as stream:
+            export_users(stream, file_format, options["with_password_hashes"])
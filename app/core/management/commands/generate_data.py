@@ -0,0 +1,149 @@
+"""
+Django command to load a synthetic dataset shaped like production.
+"""
+from collections import Counter, defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from core.datagen import DataGenerator, load, next_id, reset_sequences
+from post.models import Comment, Post, Reaction, ReactionType, Tag, TimelineEntry
+from post.tags import add_usage
+from post.timeline import DatabaseTimelineStore, get_store, timeline_setting
+from user.models import UserFollow
+
+
+# Created when the database has no reaction types yet.
+REACTION_TYPES = [("like", "👍"), ("love", "❤️"), ("laugh", "😂"), ("wow", "😮"), ("sad", "😢")]
+
+
+class Command(BaseCommand):
+    """Django command to generate users, follows, posts and their activity from a seed."""
+
+    help = (
+        "Generate a deterministic dataset: users, power-law follow edges, posts with "
+        "tags, comments and reactions, and the timelines they were published to. "
+        "Users are numbered from --start, so runs with disjoint ranges can be combined."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument("--start", type=int, default=0, help="Number of the first user.")
+        parser.add_argument(
+            "--follows-per-user", type=float, default=20, help="Mean users each user follows."
+        )
+        parser.add_argument("--posts", type=int, default=0, help="Posts to generate.")
+        parser.add_argument(
+            "--tags", type=int, default=100, help="Tags to draw from, shared across runs."
+        )
+        parser.add_argument("--tags-per-post", type=float, default=2, help="Mean tags per post.")
+        parser.add_argument(
+            "--comments-per-post", type=float, default=3, help="Mean comments per published post."
+        )
+        parser.add_argument(
+            "--reactions-per-post",
+            type=float,
+            default=5,
+            help="Mean reactions per published post.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--exponent",
+            type=float,
+            default=2.1,
+            help="Power-law exponent of the follower and post counts per user.",
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument(
+            "--skip-search-index",
+            action="store_true",
+            help="Do not rebuild the search indexes after loading.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if options["exponent"] <= 1:
+            raise CommandError("--exponent must be greater than 1.")
+        generator = DataGenerator(
+            seed=options["seed"], batch_size=options["batch_size"], exponent=options["exponent"]
+        )
+
+        user_ids = []
+        for batch in generator.users(options["users"], options["start"]):
+            load(get_user_model(), batch)
+            user_ids.extend(user.pk for user in batch)
+        self.stdout.write(f"Loaded {len(user_ids)} users.")
+
+        # Followers of each author, to fill the timelines posts are published to.
+        followers = defaultdict(list)
+        follows = 0
+        for batch in generator.follows(user_ids, options["follows_per_user"]):
+            load(UserFollow, batch)
+            follows += len(batch)
+            if options["posts"]:
+                for follow in batch:
+                    followers[follow.following_id].append(follow.follower_id)
+        self.stdout.write(f"Loaded {follows} follows.")
+
+        if options["posts"]:
+            self.load_posts(generator, user_ids, followers, options)
+
+        # Loading skips the signals that maintain counters and search vectors.
+        call_command("recount_follows", stdout=self.stdout)
+        if options["posts"]:
+            call_command("recount_reactions", stdout=self.stdout)
+        if not options["skip_search_index"]:
+            call_command("rebuild_search_index", stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS("Dataset generated."))
+
+    def load_posts(self, generator, user_ids, followers, options):
+        """Load posts by the given users, with their tags, comments, reactions and timelines."""
+        names = generator.tag_names(options["tags"])
+        Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+        tag_ids = dict(Tag.objects.filter(name__in=names).values_list("name", "pk"))
+        tag_ids = [tag_ids[name] for name in names]
+        if not ReactionType.objects.exists():
+            ReactionType.objects.bulk_create(
+                [ReactionType(label=label, emoji=emoji) for label, emoji in REACTION_TYPES]
+            )
+        type_ids = list(ReactionType.objects.order_by("pk").values_list("pk", flat=True))
+
+        store = get_store()
+        threshold = timeline_setting("CELEBRITY_THRESHOLD")
+        post_id, comment_id = next_id(Post), next_id(Comment)
+        loaded = Counter()
+        for batch in generator.posts(
+            user_ids, options["posts"], start=options["start"], first_id=post_id
+        ):
+            load(Post, batch)
+            key = {"start": options["start"], "number": loaded["posts"]}
+            loaded["posts"] += len(batch)
+
+            rows = generator.post_tags(batch, tag_ids, options["tags_per_post"], **key)
+            load(Post.tags.through, rows)
+            add_usage(Counter(row.tag_id for row in rows))
+
+            comments = generator.comments(
+                batch, user_ids, options["comments_per_post"], first_id=comment_id, **key
+            )
+            load(Comment, comments)
+            comment_id += len(comments)
+            loaded["comments"] += len(comments)
+
+            reactions = generator.reactions(
+                batch, user_ids, type_ids, options["reactions_per_post"], **key
+            )
+            load(Reaction, reactions)
+            loaded["reactions"] += len(reactions)
+
+            entries = generator.timeline_entries(batch, followers, threshold)
+            if isinstance(store, DatabaseTimelineStore):
+                load(TimelineEntry, entries)
+            else:
+                for entry in entries:
+                    store.push([entry.owner_id], (entry.published_at, entry.post_id, entry.author_id))
+            loaded["timeline entries"] += len(entries)
+        reset_sequences(Post, Comment)
+        for kind in ("posts", "comments", "reactions", "timeline entries"):
+            self.stdout.write(f"Loaded {loaded[kind]} {kind}.")
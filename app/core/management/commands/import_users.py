@@ -0,0 +1,54 @@
+"""
+Django command to bulk import users from an NDJSON or CSV file.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from user.transfer import FORMATS, UserImporter, detect_format, read_records
+
+
+class Command(BaseCommand):
+    """Django command to stream users into the database in batches."""
+
+    help = (
+        "Import users from NDJSON or CSV. Passwords must be encoded hashes "
+        "unless --hash-passwords is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to read.")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--checkpoint",
+            help="File recording committed records; a rerun resumes after them.",
+        )
+        parser.add_argument(
+            "--hash-passwords",
+            action="store_true",
+            help="Treat passwords as raw and hash them on a thread pool.",
+        )
+        parser.add_argument("--workers", type=int, help="Hashing threads.")
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        importer = UserImporter(
+            batch_size=options["batch_size"],
+            hash_passwords=options["hash_passwords"],
+            workers=options["workers"],
+            checkpoint=options["checkpoint"],
+        )
+        file_format = detect_format(options["path"], options["format"])
+        try:
+            with open(options["path"], newline="", encoding="utf-8") as stream:
+                processed = importer.run(read_records(stream, file_format))
+        except OSError as error:
+            raise CommandError(error)
+
+        for number, error in importer.errors:
+            self.stderr.write(f"Record {number}: {error}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {processed} records: {importer.created} users created, "
+                f"{importer.skipped} already existed, {len(importer.errors)} invalid."
+            )
+        )
@@ -0,0 +1,17 @@
+"""
+Django command to recompute tag popularity and the trending ranking.
+"""
+from django.core.management.base import BaseCommand
+
+from post.tags import compute_popularity
+
+
+class Command(BaseCommand):
+    """Django command to refresh decaying tag popularity, meant to run periodically."""
+
+    help = "Recompute tag popularity over the recent window and rank the trending tags."
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        ranked = compute_popularity()
+        self.stdout.write(self.style.SUCCESS(f"Ranked {len(ranked)} trending tags."))
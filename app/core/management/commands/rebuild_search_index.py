@@ -0,0 +1,27 @@
+"""
+Django command to rebuild the full-text search indexes.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.search import INDEXES
+
+
+class Command(BaseCommand):
+    """Django command to reindex every row of the searchable models."""
+
+    help = "Rebuild the search index of the given models (app_label.Model), or of all."
+
+    def add_arguments(self, parser):
+        parser.add_argument("models", nargs="*")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        labels = options["models"] or sorted(INDEXES)
+        unknown = set(labels) - set(INDEXES)
+        if unknown:
+            raise CommandError(f"No search index for {', '.join(sorted(unknown))}.")
+
+        for label in labels:
+            count = INDEXES[label].rebuild(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Reindexed {count} rows of {label}."))
@@ -0,0 +1,39 @@
+"""
+Django command to recompute the denormalized follow counters.
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from user.models import UserFollow
+
+
+def count_subquery(field):
+    """Count follow rows whose given field points at the outer user."""
+    rows = (
+        UserFollow.objects.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(total=Count("*"))
+        .values("total")
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+class Command(BaseCommand):
+    """Django command to fix drifted follower/following counters."""
+
+    help = "Recompute followers_count and following_count for users that drifted."
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        followers = count_subquery("following")
+        following = count_subquery("follower")
+        updated = (
+            get_user_model()
+            .objects.filter(~Q(followers_count=followers) | ~Q(following_count=following))
+            .update(followers_count=followers, following_count=following)
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"Recounted follows for {updated} users."))
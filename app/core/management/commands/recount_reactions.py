@@ -0,0 +1,44 @@
+"""
+Django command to rebuild the reaction counters from the reaction rows.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from post.models import PostReactionCount, Reaction
+
+
+class Command(BaseCommand):
+    """Django command to fix drifted reaction counts."""
+
+    help = (
+        "Recompute every post's reaction counts from the Reaction rows. Increments "
+        "flushed while it runs may be lost, so run it when traffic is quiet."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        totals = (
+            Reaction.objects.order_by()
+            .values("post_id", "reaction_type_id")
+            .annotate(total=Count("*"))
+        )
+        with transaction.atomic():
+            PostReactionCount.objects.all().delete()
+            created = PostReactionCount.objects.bulk_create(
+                (
+                    PostReactionCount(
+                        post_id=row["post_id"],
+                        reaction_type_id=row["reaction_type_id"],
+                        shard=0,
+                        count=row["total"],
+                    )
+                    for row in totals.iterator()
+                ),
+                batch_size=options["batch_size"],
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Recounted {len(created)} reaction counts."))
@@ -0,0 +1,79 @@
+"""
+Middleware reporting SQL query counts, DB time and N+1 patterns per request.
+"""
+import asyncio
+import json
+import logging
+
+from django.conf import settings
+
+from core.queries import record_context_queries, record_queries
+
+
+logger = logging.getLogger("core.queries")
+
+DEFAULTS = {
+    # Flag requests that run the same statement shape more than this many times.
+    "REPEAT_THRESHOLD": 5,
+    # Expose the numbers to clients in a Server-Timing header.
+    "HEADERS": False,
+}
+
+
+def query_count_setting(name):
+    """Return a QUERY_COUNT setting, falling back to the default."""
+    return getattr(settings, "QUERY_COUNT", {}).get(name, DEFAULTS[name])
+
+
+class QueryCountMiddleware:
+    """
+    Count SQL queries and DB time for each request and flag repeated statements.
+    Under ASGI the chain is async and views run their queries on other threads
+    through sync_to_async; those are counted through the request's context.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        self.report(request, response, recorder)
+        return response
+
+    async def __acall__(self, request):
+        with record_context_queries() as recorder:
+            response = await self.get_response(request)
+        self.report(request, response, recorder)
+        return response
+
+    def report(self, request, response, recorder):
+        """Add the Server-Timing header and log the request's numbers."""
+        repeated = recorder.repeated(query_count_setting("REPEAT_THRESHOLD"))
+        duration_ms = recorder.duration * 1000
+        if query_count_setting("HEADERS"):
+            timing = f'db;dur={duration_ms:.2f};desc="{recorder.count} queries"'
+            if repeated:
+                timing += f', db-repeated;desc="{len(repeated)} repeated statements"'
+            response["Server-Timing"] = timing
+
+        level = logging.WARNING if repeated else logging.DEBUG
+        if not logger.isEnabledFor(level):
+            return
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": recorder.count,
+            "db_ms": round(duration_ms, 2),
+            "repeated": [{"sql": sql, "count": n} for sql, n in repeated.items()],
+        }
+        logger.log(level, json.dumps(record), extra={"query_stats": record})
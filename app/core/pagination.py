@@ -0,0 +1,195 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+"""
+import base64
+import binascii
+import datetime
+import json
+import uuid
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_value(value):
+    """Turn a key value into something JSON can carry."""
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginate by seeking past the last row seen instead of using OFFSET.
+
+    Views declare an ``ordering`` of unique-together, indexed columns (the last
+    one must be unique, usually ``id``). Each page is a single range scan on
+    that ordering, so deep pages cost the same as the first one.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-id",)
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return one page of the queryset after the requested cursor."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(getattr(view, "ordering", None) or self.ordering)
+        position, reverse = self.decode_cursor(request)
+        if position is not None:
+            position = self.parse_position(queryset, position)
+
+        ordering = [self.flip(field) for field in self.ordering] if reverse else self.ordering
+        if position is not None:
+            queryset = queryset.filter(self.seek(ordering, position))
+        results = list(queryset.order_by(*ordering)[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = has_more if reverse else position is not None
+        self.first_key = self.key(results[0]) if results else None
+        self.last_key = self.key(results[-1]) if results else None
+        if not results and position is not None:
+            # Nothing left on this side: keep the cursor so the client can turn back.
+            self.first_key = self.last_key = [encode_value(value) for value in position]
+        return results
+
+    def get_page_size(self, request):
+        """Return the page size, honouring the page_size query parameter."""
+        page_size = api_settings.PAGE_SIZE or self.max_page_size
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return page_size
+        return min(max(requested, 1), self.max_page_size)
+
+    @staticmethod
+    def flip(field):
+        """Invert the direction of an ordering field."""
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def seek(ordering, position):
+        """Build the lexicographic 'comes after position' filter for the ordering."""
+        condition = Q()
+        for index, field in enumerate(ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            step = Q(**{f"{name}__{lookup}": position[index]})
+            for previous, value in zip(ordering[:index], position):
+                step &= Q(**{previous.lstrip("-"): value})
+            condition |= step
+        return condition
+
+    def key(self, instance):
+        """Return the position of an instance in the ordering."""
+        return [encode_value(getattr(instance, field.lstrip("-"))) for field in self.ordering]
+
+    def decode_cursor(self, request):
+        """Return the position and direction encoded in the request's cursor."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            position, reverse = payload["p"], bool(payload.get("r"))
+        except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def parse_position(self, queryset, position):
+        """Convert the values of a decoded position to the types of the ordering fields."""
+        parsed = []
+        for field, value in zip(self.ordering, position):
+            try:
+                value = self.ordering_field(queryset, field.lstrip("-")).to_python(value)
+            except (ValidationError, TypeError, ValueError, AttributeError):
+                value = None
+            if value is None:
+                raise NotFound(self.invalid_cursor_message)
+            parsed.append(value)
+        return parsed
+
+    @staticmethod
+    def ordering_field(queryset, name):
+        """Return the model field or annotation output field behind an ordering name."""
+        try:
+            return queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return queryset.query.annotations[name].output_field
+
+    def encode_cursor(self, position, reverse):
+        """Return the URL of the page on one side of the position."""
+        payload = {"p": position}
+        if reverse:
+            payload["r"] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(payload).encode("ascii"))
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded.decode("ascii")
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.last_key, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.first_key, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
@@ -0,0 +1,97 @@
+"""
+SQL accounting shared by the query count middleware and the test helpers.
+"""
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+IN_LISTS = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)")
+WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """Reduce a statement to its shape: literals, IN lists and spacing normalized."""
+    sql = LITERALS.sub("?", sql)
+    sql = IN_LISTS.sub("(...)", sql)
+    return WHITESPACE.sub(" ", sql).strip()
+
+
+class QueryRecorder:
+    """Database execute wrapper that counts, times and fingerprints statements."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        # Async requests may run queries on several threads at once.
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                self.duration += duration
+                self.count += 1
+                self.shapes[fingerprint(sql)] += 1
+
+    def repeated(self, threshold):
+        """Return the statement shapes that ran more than threshold times."""
+        return {shape: n for shape, n in self.shapes.items() if n > threshold}
+
+
+@contextmanager
+def record_queries():
+    """Record the queries run on every database connection of this thread."""
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield recorder
+
+
+# The recorder of the current context; sync_to_async threads inherit it.
+_context_recorder = ContextVar("query_recorder", default=None)
+
+
+def record_in_context(execute, sql, params, many, context):
+    """Execute wrapper passing statements to the current context's recorder, if any."""
+    recorder = _context_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_context_recording(connection, **kwargs):
+    """Add the context recording wrapper to a connection, once."""
+    if record_in_context not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_in_context)
+
+
+connection_created.connect(install_context_recording, dispatch_uid="core.queries")
+
+
+@contextmanager
+def record_context_queries():
+    """
+    Record the queries run in this context on any thread, e.g. by an async
+    view's sync_to_async calls, which use other threads' connections.
+    """
+    for connection in connections.all():
+        install_context_recording(connection)
+    recorder = QueryRecorder()
+    token = _context_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _context_recorder.reset(token)
@@ -0,0 +1,192 @@
+"""
+Full-text search over model fields.
+
+On PostgreSQL each indexed model stores a weighted ``tsvector`` in its
+``search_vector`` column, kept current by signals and served by a GIN
+index and queried with prefix tsqueries; an optional trigram index makes
+one field (usernames) match on typos through the ``%`` operator. Other
+backends fall back to an SQLite FTS5 table per model. Both paths return
+the same queryset, annotated with an integer ``rank`` so results can be
+keyset-paginated on ("-rank", "-id").
+"""
+import re
+
+from django.contrib.postgres.lookups import TrigramSimilar
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db import connections, router
+from django.db.models import ExpressionWrapper, F, FloatField, IntegerField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Greatest
+from django.db.models.signals import post_delete, post_save
+
+
+# Ranks are floats; scaling them to integers keeps keyset cursors exact.
+RANK_SCALE = 1000000
+
+# Default PostgreSQL weights of the A-D labels, reused for FTS5's bm25().
+WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2, "D": 0.1}
+
+# FTS5 tokenizers matching the PostgreSQL text search configurations.
+TOKENIZERS = {
+    "simple": "unicode61 remove_diacritics 2",
+    "english": "porter unicode61 remove_diacritics 2",
+}
+
+INDEXES = {}
+
+
+def fts_table(db_table):
+    """Return the name of the FTS5 table shadowing a model table."""
+    return f"{db_table}_fts"
+
+
+def words(text):
+    """Return the words of user input; they hold no query syntax characters."""
+    return re.findall(r"\w+", text)
+
+
+def fts_query(text):
+    """Turn user input into an FTS5 query matching every word as a prefix."""
+    return " ".join(f'"{word}"*' for word in words(text))
+
+
+def prefix_tsquery(text):
+    """Turn user input into a raw tsquery matching every word as a prefix."""
+    return " & ".join(f"'{word}':*" for word in words(text))
+
+
+class SearchIndex:
+    """Weighted full-text index over some fields of a model."""
+
+    def __init__(self, model, weights, config="simple", trigram_field=None):
+        self.model = model
+        self.weights = weights
+        self.config = config
+        self.trigram_field = trigram_field
+        INDEXES[model._meta.label] = self
+
+    def connection(self):
+        return connections[router.db_for_write(self.model)]
+
+    def uses_postgres(self):
+        """Check if the model lives on PostgreSQL, rather than the FTS5 fallback."""
+        return self.connection().vendor == "postgresql"
+
+    def vector(self):
+        """Return the weighted search vector expression of a row."""
+        vectors = [
+            SearchVector(field, weight=weight, config=self.config)
+            for field, weight in self.weights.items()
+        ]
+        combined = vectors[0]
+        for vector in vectors[1:]:
+            combined = combined + vector
+        return combined
+
+    def update(self, pks):
+        """Reindex the rows with the given primary keys."""
+        pks = list(pks)
+        if not pks:
+            return
+        if self.uses_postgres():
+            self.model._base_manager.filter(pk__in=pks).update(search_vector=self.vector())
+            return
+        self.remove(pks)
+        meta = self.model._meta
+        connection = self.connection()
+        qn = connection.ops.quote_name
+        columns = ", ".join(qn(meta.get_field(field).column) for field in self.weights)
+        placeholders = ", ".join(["%s"] * len(pks))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {qn(fts_table(meta.db_table))} (object_id, {columns}) "
+                f"SELECT {qn(meta.pk.column)}, {columns} FROM {qn(meta.db_table)} "
+                f"WHERE {qn(meta.pk.column)} IN ({placeholders})",
+                self.prepare_pks(pks),
+            )
+
+    def remove(self, pks):
+        """Drop the rows with the given primary keys from the FTS5 table."""
+        if self.uses_postgres():
+            return
+        connection = self.connection()
+        qn = connection.ops.quote_name
+        placeholders = ", ".join(["%s"] * len(pks))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {qn(fts_table(self.model._meta.db_table))} "
+                f"WHERE object_id IN ({placeholders})",
+                self.prepare_pks(pks),
+            )
+
+    def prepare_pks(self, pks):
+        """Return primary keys as the database stores them."""
+        pk = self.model._meta.pk
+        return [pk.get_db_prep_value(pk.to_python(value), self.connection()) for value in pks]
+
+    def rebuild(self, batch_size=1000):
+        """Reindex every row, one batch at a time; returns the number of rows."""
+        pks = self.model._base_manager.order_by("pk").values_list("pk", flat=True)
+        batch, total = [], 0
+        for pk in pks.iterator(chunk_size=batch_size):
+            batch.append(pk)
+            if len(batch) == batch_size:
+                self.update(batch)
+                total, batch = total + len(batch), []
+        self.update(batch)
+        return total + len(batch)
+
+    def search(self, text, queryset=None):
+        """Return the rows matching text, annotated with an integer rank."""
+        queryset = self.model._default_manager.all() if queryset is None else queryset
+        if not fts_query(text):
+            return queryset.annotate(rank=Value(0, output_field=IntegerField())).none()
+        if self.uses_postgres():
+            return self._search_postgres(text, queryset)
+        return self._search_fts(text, queryset)
+
+    def _search_postgres(self, text, queryset):
+        query = SearchQuery(prefix_tsquery(text), config=self.config, search_type="raw")
+        rank = SearchRank(F("search_vector"), query)
+        matches = Q(search_vector=query)
+        if self.trigram_field:
+            rank = Greatest(rank, TrigramSimilarity(self.trigram_field, text))
+            # % (at least pg_trgm.similarity_threshold, 0.3 by default) uses the trigram index.
+            matches |= Q(TrigramSimilar(F(self.trigram_field), Value(text)))
+        scaled = ExpressionWrapper(rank * Value(RANK_SCALE), output_field=FloatField())
+        return queryset.annotate(rank=Cast(scaled, IntegerField())).filter(matches)
+
+    def _search_fts(self, text, queryset):
+        match = fts_query(text)
+        meta = self.model._meta
+        qn = self.connection().ops.quote_name
+        table = qn(fts_table(meta.db_table))
+        weights = ", ".join(str(WEIGHTS[weight]) for weight in self.weights.values())
+        rank = RawSQL(
+            f"SELECT CAST(-bm25({table}, 0, {weights}) * {RANK_SCALE} AS INTEGER) "
+            f"FROM {table} WHERE {table} MATCH %s "
+            f"AND object_id = {qn(meta.db_table)}.{qn(meta.pk.column)}",
+            [match],
+            output_field=IntegerField(),
+        )
+        matched = RawSQL(f"SELECT object_id FROM {table} WHERE {table} MATCH %s", [match])
+        return queryset.filter(pk__in=matched).annotate(rank=rank)
+
+    def track(self):
+        """Reindex rows when they are saved and drop them when they are deleted."""
+        uid = f"search:{self.model._meta.label}"
+
+        def reindex(sender, instance, update_fields=None, **kwargs):
+            if update_fields is None or set(update_fields) & set(self.weights):
+                self.update([instance.pk])
+
+        def drop(sender, instance, **kwargs):
+            self.remove([instance.pk])
+
+        post_save.connect(reindex, sender=self.model, weak=False, dispatch_uid=uid)
+        post_delete.connect(drop, sender=self.model, weak=False, dispatch_uid=uid)
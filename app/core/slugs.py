@@ -0,0 +1,165 @@
+"""
+Unique slug allocation.
+
+django-autoslug finds a free slug by probing the table once per candidate
+(``john``, ``john-2``, ``john-3``, ...) on every save. Here the highest
+taken suffix of a base slug is read in one indexed prefix query, batches
+of new rows share a single query for their bases, and a slug taken by a
+concurrent insert is caught by the unique constraint and allocated again.
+"""
+import re
+from collections import Counter, defaultdict
+
+from autoslug import AutoSlugField
+from autoslug.utils import crop_slug
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Q, Value, When
+from django.db.models.functions import Length
+
+
+# Inserts retried after losing a slug to a concurrent insert.
+SLUG_RETRIES = 3
+
+# Longest suffix looked for under a shortened base; a base would need a billion rivals.
+MAX_SUFFIX_DIGITS = 9
+
+
+class UniqueSlugField(AutoSlugField):
+    """AutoSlugField that allocates with next_slug and keeps slugs already set."""
+
+    def pre_save(self, instance, add):
+        slug = getattr(instance, self.attname)
+        if slug and not self.always_update:
+            # Uniqueness is enforced by the constraint; see UniqueSlugMixin.
+            return slug
+        if self.unique_with:
+            return super().pre_save(instance, add)
+        slug = next_slug(self, instance)
+        setattr(instance, self.attname, slug)
+        return slug
+
+
+class UniqueSlugMixin:
+    """Model mixin retrying an insert whose slug was taken by a concurrent one."""
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        fields = [field for field in self._meta.fields if isinstance(field, UniqueSlugField)]
+        for attempt in range(SLUG_RETRIES):
+            try:
+                with transaction.atomic(using=kwargs.get("using")):
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                taken = [field for field in fields if slug_taken(field, self)]
+                if not taken or attempt == SLUG_RETRIES - 1:
+                    raise
+                for field in taken:
+                    setattr(self, field.attname, "")
+
+
+def base_slug(field, value):
+    """Return the slug a field derives from a value, before making it unique."""
+    slug = field.slugify(value or "") or field.model._meta.model_name
+    return field.slugify(crop_slug(field, slug))
+
+
+def candidate(field, base, index):
+    """Return the index-th candidate for a base slug (base, base-2, base-3, ...)."""
+    if index == 1:
+        return base
+    tail = f"{field.index_sep}{index}"
+    return f"{base[: field.max_length - len(tail)]}{tail}"
+
+
+def slug_taken(field, instance):
+    """Check if another row already holds an instance's slug."""
+    rivals = field.model._default_manager.filter(**{field.name: getattr(instance, field.attname)})
+    if instance.pk is not None:
+        rivals = rivals.exclude(pk=instance.pk)
+    return rivals.exists()
+
+
+def suffix_stems(field, base):
+    """
+    Return (stem, digits) for each stem suffixes of a base slug follow. Long
+    bases are cut short to fit their suffix (see candidate), so suffixes of
+    more digits follow shorter stems; digits is None for the uncut base.
+    """
+    room = field.max_length - len(base) - len(field.index_sep)
+    stems = [(base, None)] if room > 0 else []
+    for digits in range(max(room, 0) + 1, MAX_SUFFIX_DIGITS + 1):
+        stem = base[: field.max_length - len(field.index_sep) - digits]
+        if stem:
+            stems.append((stem, digits))
+    return stems
+
+
+def highest_suffix(field, base, exclude_pk=None):
+    """
+    Return the highest suffix taken for a base slug: 0 if the base is free,
+    1 if only the base itself is taken. One query of prefix range scans on
+    the slug index.
+    """
+    name, sep = field.name, field.index_sep
+    condition, lengths = Q(**{name: base}), []
+    for stem, digits in suffix_stems(field, base):
+        pattern = "[0-9]+" if digits is None else f"[0-9]{{{digits}}}"
+        suffixed = Q(
+            **{
+                f"{name}__startswith": f"{stem}{sep}",
+                f"{name}__regex": rf"^{re.escape(stem + sep)}{pattern}$",
+            }
+        )
+        condition |= suffixed
+        if digits is not None:
+            lengths.append(When(suffixed, then=Value(digits)))
+    rivals = field.model._default_manager.filter(condition)
+    if exclude_pk is not None:
+        rivals = rivals.exclude(pk=exclude_pk)
+    # Longer suffixes are larger; suffixes of equal length sort as digits.
+    digits = Case(*lengths, default=Length(name) - len(base) - len(sep))
+    top = (
+        rivals.order_by(digits.desc(), f"-{name}")
+        .values_list(name, flat=True)
+        .first()
+    )
+    if top is None:
+        return 0
+    return 1 if top == base else int(top.rsplit(sep, 1)[1])
+
+
+def next_slug(field, instance):
+    """Return the next free slug for an instance in one query."""
+    base = base_slug(field, getattr(instance, field.populate_from))
+    return candidate(field, base, highest_suffix(field, base, instance.pk) + 1)
+
+
+def allocate_slugs(instances, field_name):
+    """
+    Assign a free, distinct slug to each unsaved instance, for bulk_create.
+    One query finds the bases already taken, plus one per base that is taken
+    or repeated in the batch.
+    """
+    if not instances:
+        return
+    field = instances[0]._meta.get_field(field_name)
+    bases = [base_slug(field, getattr(instance, field.populate_from)) for instance in instances]
+    taken = set(
+        field.model._default_manager.filter(**{f"{field.name}__in": set(bases)}).values_list(
+            field.name, flat=True
+        )
+    )
+
+    counts = Counter(bases)
+    suffixes = defaultdict(int)
+    for base in taken | {base for base, count in counts.items() if count > 1}:
+        suffixes[base] = highest_suffix(field, base)
+    allocated = set()
+    for instance, base in zip(instances, bases):
+        slug = None
+        while slug is None or slug in allocated:
+            suffixes[base] += 1
+            slug = candidate(field, base, suffixes[base])
+        allocated.add(slug)
+        setattr(instance, field.attname, slug)
@@ -0,0 +1,106 @@
+"""
+Content-addressed media storage.
+
+Uploads are hashed while they are streamed to disk and stored once under
+their SHA-256 digest. The same file uploaded twice shares one blob, and a
+blob's URL never changes its content, so it can be cached indefinitely.
+Model fields that point at blobs are reference-counted by ``track_blobs``;
+``collect_blobs`` deletes the blobs nothing references any more.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from core.models import Blob
+
+
+BLOB_PREFIX = "blobs"
+
+
+def blob_name(digest, extension):
+    """Return the storage name of a blob, fanned out over two directory levels."""
+    return os.path.join(BLOB_PREFIX, digest[:2], digest[2:4], f"{digest}{extension}")
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage that names every file after its content."""
+
+    def get_available_name(self, name, max_length=None):
+        """Never rename: equal names mean equal content."""
+        return name
+
+    def _save(self, name, content):
+        """Stream the content to a temporary file, then move it to its blob name."""
+        extension = os.path.splitext(name)[1].lower()
+        temp_dir = self.path(os.path.join(BLOB_PREFIX, "tmp"))
+        os.makedirs(temp_dir, exist_ok=True)
+
+        digest, size = hashlib.sha256(), 0
+        fd, temp_path = tempfile.mkstemp(dir=temp_dir)
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                if hasattr(content, "seek"):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+                    size += len(chunk)
+
+            name = blob_name(digest.hexdigest(), extension)
+            full_path = self.path(name)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            # collect_blobs deletes files under the row lock, so the file is
+            # only checked once the row is locked and marked as just stored.
+            with transaction.atomic():
+                Blob.stored(name, size)
+                if not os.path.exists(full_path):
+                    file_move_safe(temp_path, full_path, allow_overwrite=True)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(full_path, self.file_permissions_mode)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        return name
+
+
+def _field_names(instance, fields):
+    return {field: getattr(instance, field).name or "" for field in fields}
+
+
+def track_blobs(model, *fields):
+    """
+    Keep the reference counts of the blobs behind a model's file fields.
+    References move in the same transaction as the row that holds them.
+    """
+    uid = f"track_blobs:{model._meta.label}"
+
+    def remember_previous(sender, instance, update_fields=None, **kwargs):
+        instance._previous_blobs = {}
+        tracked = [f for f in fields if update_fields is None or f in update_fields]
+        if instance._state.adding or not tracked:
+            return
+        previous = sender._base_manager.filter(pk=instance.pk).values(*tracked).first()
+        instance._previous_blobs = {field: name or "" for field, name in (previous or {}).items()}
+
+    def move_references(sender, instance, created, update_fields=None, **kwargs):
+        previous = instance.__dict__.pop("_previous_blobs", {})
+        current = _field_names(instance, previous if not created else fields)
+        acquired = [name for field, name in current.items() if name != previous.get(field)]
+        released = [name for field, name in previous.items() if name != current[field]]
+        Blob.release(*released)
+        Blob.acquire(*acquired)
+
+    def release_references(sender, instance, **kwargs):
+        Blob.release(*_field_names(instance, fields).values())
+
+    pre_save.connect(remember_previous, sender=model, weak=False, dispatch_uid=uid)
+    post_save.connect(move_references, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(release_references, sender=model, weak=False, dispatch_uid=uid)
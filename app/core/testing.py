@@ -0,0 +1,31 @@
+"""
+Test helpers for query budgets.
+"""
+from contextlib import contextmanager
+
+from core.queries import record_queries
+
+
+class QueryBudgetMixin:
+    """TestCase mixin asserting upper bounds on the queries a block runs."""
+
+    @contextmanager
+    def assertQueryBudget(self, max_queries, max_repeats=1):
+        """
+        Fail if the block runs more than max_queries statements, or any
+        statement shape more than max_repeats times (an N+1 pattern).
+        """
+        with record_queries() as recorder:
+            yield recorder
+
+        shapes = "\n".join(f"{n}x {sql}" for sql, n in recorder.shapes.most_common())
+        self.assertLessEqual(
+            recorder.count,
+            max_queries,
+            f"{recorder.count} queries run, budget is {max_queries}:\n{shapes}",
+        )
+        repeated = recorder.repeated(max_repeats)
+        self.assertFalse(
+            repeated,
+            f"Statements repeated more than {max_repeats} times:\n{shapes}",
+        )
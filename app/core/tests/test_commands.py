@@ -1,13 +1,26 @@
 """
 Test custom Django management commands.
 """
+import io
+import json
+import os
+import shutil
+import tempfile
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2OpError
 
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.benchmark import SCENARIOS, compare, seed
+from core.constants.mock_data import mock_user
+from user.models import UserFollow
 
 
 @patch("core.management.commands.wait_for_db.Command.check")
@@ -33,3 +46,184 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=["default"])
+
+
+class RecountFollowsCommandTests(TestCase):
+    """Test the recount_follows command."""
+
+    def test_recount_follows(self):
+        """Test drifted follow counters are recomputed."""
+        user1 = get_user_model().objects.create_user(**mock_user(salt="1"))
+        user2 = get_user_model().objects.create_user(**mock_user(salt="2"))
+        UserFollow.objects.create(follower=user1, following=user2)
+        get_user_model().objects.filter(pk=user1.pk).update(followers_count=5)
+
+        call_command("recount_follows")
+
+        user1.refresh_from_db()
+        user2.refresh_from_db()
+        self.assertEqual(user1.followers_count, 0)
+        self.assertEqual(user1.following_count, 1)
+        self.assertEqual(user2.followers_count, 1)
+        self.assertEqual(user2.following_count, 0)
+
+
+class UserTransferCommandTests(TestCase):
+    """Test the import_users and export_users commands."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write_file(self, name, lines):
+        # Helper function to write an input file.
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as stream:
+            stream.write("\n".join(lines) + "\n")
+        return path
+
+    def test_export_then_import_round_trip(self):
+        """Test exported users import with their hashes, slugs and join dates."""
+        payload = mock_user(salt="1")
+        user = get_user_model().objects.create_user(**payload)
+        path = os.path.join(self.directory, "users.csv")
+        call_command("export_users", path, with_password_hashes=True)
+        get_user_model().objects.all().delete()
+
+        call_command("import_users", path, stdout=io.StringIO())
+
+        imported = get_user_model().objects.get()
+        self.assertEqual(
+            (imported.email, imported.slug, imported.date_joined),
+            (user.email, user.slug, user.date_joined),
+        )
+        self.assertTrue(imported.check_password(payload["password"]))
+
+    def test_import_allocates_slugs_in_batch(self):
+        """Test colliding slugs are resolved without a query per row."""
+        get_user_model().objects.create_user(email="taken@example.com", username="john")
+        records = [
+            json.dumps({"email": f"john{n}@example.com", "username": f"JOHN{'!' * n}"})
+            for n in range(1, 6)
+        ]
+        path = self.write_file("users.ndjson", records)
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command("import_users", path, stdout=io.StringIO())
+
+        # Taken bases, then the highest "john" suffix.
+        slug_queries = [
+            query for query in queries if query["sql"].startswith('SELECT "user_user"."slug"')
+        ]
+        self.assertEqual(len(slug_queries), 2)
+
+        self.assertEqual(
+            set(get_user_model().objects.values_list("slug", flat=True)),
+            {"john", "john-2", "john-3", "john-4", "john-5", "john-6"},
+        )
+
+    def test_import_skips_invalid_and_existing_records(self):
+        """Test bad hashes, missing fields and taken emails are skipped."""
+        existing = get_user_model().objects.create_user(**mock_user(salt="1"))
+        records = [
+            json.dumps({"email": existing.email, "username": "someone.new"}),
+            json.dumps({"email": "raw@example.com", "username": "raw", "password": "plain"}),
+            json.dumps({"username": "no.email"}),
+            json.dumps({"email": "ok@example.com", "username": "ok"}),
+        ]
+        path = self.write_file("users.ndjson", records)
+        stdout, stderr = io.StringIO(), io.StringIO()
+
+        call_command("import_users", path, stdout=stdout, stderr=stderr)
+
+        self.assertIn("1 users created, 1 already existed, 2 invalid", stdout.getvalue())
+        self.assertIn("Record 2:", stderr.getvalue())
+        created = get_user_model().objects.get(email="ok@example.com")
+        self.assertFalse(created.has_usable_password())
+
+    def test_import_resumes_from_checkpoint(self):
+        """Test a rerun skips the batches a previous run committed."""
+        records = [
+            json.dumps({"email": f"user{n}@example.com", "username": f"user{n}"})
+            for n in range(5)
+        ]
+        path = self.write_file("users.ndjson", records)
+        checkpoint = os.path.join(self.directory, "checkpoint.json")
+        with open(checkpoint, "w") as stream:
+            json.dump({"records": 3}, stream)
+
+        call_command(
+            "import_users", path, checkpoint=checkpoint, batch_size=2, stdout=io.StringIO()
+        )
+
+        self.assertEqual(
+            set(get_user_model().objects.values_list("username", flat=True)),
+            {"user3", "user4"},
+        )
+        with open(checkpoint) as stream:
+            self.assertEqual(json.load(stream), {"records": 5})
+
+
+class BenchmarkCommandTests(TestCase):
+    """Test the benchmark command."""
+
+    def run_benchmark(self, *args, **options):
+        # Helper function to run a small benchmark and return its report.
+        stdout = io.StringIO()
+        call_command(
+            "benchmark",
+            *args,
+            users=6,
+            follows=10,
+            requests=4,
+            concurrency=1,
+            stdout=stdout,
+            stderr=io.StringIO(),
+            **options,
+        )
+        return json.loads(stdout.getvalue())
+
+    def test_seed_is_idempotent(self):
+        """Test seeding twice tops up to the requested users and follows."""
+        self.assertEqual(seed(6, 10, stdout=io.StringIO()), (6, 10))
+        self.assertEqual(seed(6, 10, stdout=io.StringIO()), (0, 0))
+        self.assertEqual(UserFollow.objects.count(), 10)
+
+    def test_benchmark_reports_every_scenario(self):
+        """Test each scenario succeeds and reports latency and query figures."""
+        report = self.run_benchmark()
+
+        self.assertEqual(set(report["scenarios"]), set(SCENARIOS))
+        for name, result in report["scenarios"].items():
+            self.assertEqual((result["requests"], result["errors"]), (4, 0), name)
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+            self.assertGreaterEqual(result["queries_per_request"], 0)
+
+    def test_benchmark_flags_regressions(self):
+        """Test a run worse than the baseline is reported and fails the command."""
+        baseline = self.run_benchmark(scenario=["followers"])
+        baseline["scenarios"]["followers"]["queries_per_request"] /= 2
+        path = os.path.join(tempfile.mkdtemp(), "baseline.json")
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        with open(path, "w") as stream:
+            json.dump(baseline, stream)
+
+        with self.assertRaisesMessage(CommandError, "followers: queries_per_request"):
+            self.run_benchmark("--no-seed", scenario=["followers"], baseline=path)
+
+    def test_compare_within_tolerance(self):
+        """Test changes within the tolerance are not regressions."""
+        result = {
+            "throughput": 100,
+            "p95_ms": 10,
+            "p99_ms": 20,
+            "queries_per_request": 3,
+        }
+        slower = {**result, "throughput": 95, "p95_ms": 10.5}
+
+        self.assertEqual(compare({"scenarios": {"me": slower}}, {"scenarios": {"me": result}}), [])
+        self.assertEqual(
+            len(compare({"scenarios": {"me": slower}}, {"scenarios": {"me": result}}, 0.01)), 2
+        )
@@ -0,0 +1,165 @@
+"""
+Tests for the synthetic data generator.
+"""
+import io
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from core.datagen import PASSWORD, REFERENCE_TIME, DataGenerator, copy_value
+from post.models import Comment, Post, PostReactionCount, Reaction, Tag, TimelineEntry
+from user.models import UserFollow
+
+
+def flatten(batches):
+    return [row for batch in batches for row in batch]
+
+
+class DataGeneratorTests(SimpleTestCase):
+    """Tests for the generated rows, without a database."""
+
+    def test_same_seed_same_rows(self):
+        """Test a seed always generates the same users and follows."""
+        first, second = DataGenerator(seed=7, batch_size=50), DataGenerator(seed=7, batch_size=50)
+
+        users = flatten(first.users(120))
+        self.assertEqual(
+            [(u.pk, u.username, u.date_joined) for u in users],
+            [(u.pk, u.username, u.date_joined) for u in flatten(second.users(120))],
+        )
+        ids = [user.pk for user in users]
+        self.assertEqual(
+            [(f.follower_id, f.following_id) for f in flatten(first.follows(ids, 5))],
+            [(f.follower_id, f.following_id) for f in flatten(second.follows(ids, 5))],
+        )
+        self.assertNotEqual([u.pk for u in flatten(DataGenerator(seed=8).users(5))], ids[:5])
+
+    def test_users_unique(self):
+        """Test ids, usernames, emails and slugs never collide."""
+        users = flatten(DataGenerator(batch_size=1000).users(5000, start=100))
+
+        for field in ("pk", "username", "email", "slug"):
+            self.assertEqual(len({getattr(user, field) for user in users}), 5000, field)
+        self.assertTrue(users[0].username.endswith(".100"))
+
+    def test_follows_power_law(self):
+        """Test follows are distinct, never self-follows, with a heavy-tailed follower count."""
+        ids = list(range(2000))
+        follows = flatten(DataGenerator(batch_size=500).follows(ids, 10))
+        pairs = [(follow.follower_id, follow.following_id) for follow in follows]
+
+        self.assertEqual(len(pairs), len(set(pairs)))
+        self.assertFalse([pair for pair in pairs if pair[0] == pair[1]])
+        self.assertAlmostEqual(len(pairs) / len(ids), 10, delta=1.5)
+        followers = Counter(following for _, following in pairs)
+        # The most followed user has far more followers than the median one.
+        counts = sorted(followers.values())
+        self.assertGreater(counts[-1], 20 * counts[len(counts) // 2])
+
+    def test_posts(self):
+        """Test posts get unique slugs and times within the generated span."""
+        posts = flatten(DataGenerator(batch_size=40).posts(list(range(10)), 100))
+
+        self.assertEqual(len({post.slug for post in posts}), 100)
+        slug_length = Post._meta.get_field("slug").max_length
+        self.assertTrue(all(len(post.slug) <= slug_length for post in posts))
+        self.assertTrue(all(post.created_at < REFERENCE_TIME for post in posts))
+
+    def test_posts_of_runs_combine(self):
+        """Test runs with disjoint starts give posts distinct slugs."""
+        generator = DataGenerator(batch_size=40)
+        first = flatten(generator.posts(list(range(10)), 50, start=0))
+        second = flatten(generator.posts(list(range(10, 20)), 50, start=10, first_id=51))
+
+        self.assertFalse({post.slug for post in first} & {post.slug for post in second})
+        self.assertEqual([post.pk for post in second], list(range(51, 101)))
+
+    def test_activity(self):
+        """Test published posts get tags, threaded comments, reactions and timeline entries."""
+        generator = DataGenerator()
+        posts = flatten(generator.posts(list(range(20)), 50))
+        published = {post.pk for post in posts if post.is_published}
+
+        rows = generator.post_tags(posts, [1, 2, 3], 2)
+        self.assertEqual(len(rows), len({(row.post_id, row.tag_id) for row in rows}))
+
+        comments = generator.comments(posts, list(range(20)), 4, first_id=10)
+        self.assertEqual([comment.pk for comment in comments], list(range(10, 10 + len(comments))))
+        self.assertTrue({comment.post_id for comment in comments} <= published)
+        by_id = {comment.pk: comment for comment in comments}
+        replies = [comment for comment in comments if comment.parent_id]
+        self.assertTrue(replies)
+        for reply in replies:
+            parent = by_id[reply.parent_id]
+            self.assertTrue(reply.path.startswith(parent.path))
+            self.assertEqual(reply.depth, parent.depth + 1)
+            self.assertGreaterEqual(reply.created_at, parent.created_at)
+
+        reactions = generator.reactions(posts, list(range(20)), [1, 2], 5)
+        self.assertEqual(len(reactions), len({(r.user_id, r.post_id) for r in reactions}))
+        self.assertTrue({reaction.post_id for reaction in reactions} <= published)
+
+        followers = {post.author_id: [100, 101] for post in posts}
+        entries = generator.timeline_entries(posts, followers, threshold=10)
+        self.assertEqual(len(entries), 3 * len(published))
+        entries = generator.timeline_entries(posts, followers, threshold=2)
+        authors = {post.author_id for post in posts if post.is_published}
+        self.assertEqual({entry.owner_id for entry in entries}, authors)
+
+    def test_copy_value(self):
+        """Test values are escaped for COPY's text format."""
+        self.assertEqual(copy_value(None), "\\N")
+        self.assertEqual(copy_value(True), "t")
+        self.assertEqual(copy_value("a\tb\nc\\"), "a\\tb\\nc\\\\")
+
+
+class GenerateDataCommandTests(TestCase):
+    """Test the generate_data command."""
+
+    def test_generate_data(self):
+        """Test the dataset is loaded with counters and generated timestamps kept."""
+        call_command(
+            "generate_data",
+            users=50,
+            follows_per_user=4,
+            posts=30,
+            batch_size=20,
+            stdout=io.StringIO(),
+        )
+
+        self.assertEqual(get_user_model().objects.count(), 50)
+        self.assertEqual(Post.objects.count(), 30)
+        follows = UserFollow.objects.count()
+        self.assertGreater(follows, 100)
+        users = get_user_model().objects.all()
+        self.assertEqual(sum(user.followers_count for user in users), follows)
+        self.assertTrue(UserFollow.objects.filter(created_at__lt=REFERENCE_TIME).exists())
+        user = users.first()
+        self.assertTrue(user.check_password(PASSWORD))
+
+    def test_generate_activity(self):
+        """Test posts are loaded with tags, comments, reactions and timelines, and counted."""
+        options = {"users": 30, "follows_per_user": 3, "posts": 40, "batch_size": 15}
+        call_command("generate_data", **options, stdout=io.StringIO())
+        call_command("generate_data", **options, start=30, stdout=io.StringIO())
+
+        self.assertEqual(Post.objects.count(), 80)
+        tags = Tag.objects.filter(usage_count__gt=0)
+        self.assertTrue(tags.exists())
+        self.assertEqual(sum(tag.usage_count for tag in tags), Post.tags.through.objects.count())
+        comment = Comment.objects.filter(parent__isnull=False).first()
+        self.assertTrue(comment.path.startswith(comment.parent.path))
+        self.assertEqual(
+            sum(PostReactionCount.objects.values_list("count", flat=True)), Reaction.objects.count()
+        )
+        published = Post.objects.filter(is_published=True).values_list("pk", flat=True)
+        self.assertEqual(
+            set(TimelineEntry.objects.values_list("post_id", flat=True)), set(published)
+        )
+        # Sequences were moved past the loaded ids.
+        post = Post.objects.create(author=comment.author, title="New post", content="Body.")
+        self.assertEqual(post.pk, 81)
+        reply = Comment.objects.create(author=comment.author, post=comment.post, parent=comment, content="Hi.")
+        self.assertEqual(reply.pk, Comment.objects.count())
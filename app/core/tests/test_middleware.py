@@ -0,0 +1,67 @@
+"""
+Tests for the query count middleware.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.constants.mock_data import mock_user
+from core.queries import fingerprint
+
+
+class FingerprintTests(TestCase):
+    """Tests for statement fingerprints."""
+
+    def test_fingerprint_normalizes_literals(self):
+        """Test statements differing only in literals share a fingerprint."""
+        first = fingerprint("SELECT * FROM t WHERE id = 1 AND name = 'a'")
+        second = fingerprint("SELECT  *  FROM t WHERE id = 22 AND name = 'b''c'")
+
+        self.assertEqual(first, second)
+
+    def test_fingerprint_collapses_in_lists(self):
+        """Test IN lists of any length share a fingerprint."""
+        first = fingerprint("SELECT * FROM t WHERE id IN (%s, %s)")
+        second = fingerprint("SELECT * FROM t WHERE id IN (%s)")
+
+        self.assertEqual(first, second)
+
+
+class QueryCountMiddlewareTests(TestCase):
+    """Tests for per-request query accounting."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(**mock_user(salt="1"))
+        self.url = reverse("user:followers", args=[self.user.slug])
+
+    @override_settings(QUERY_COUNT={"HEADERS": True})
+    def test_server_timing_header(self):
+        """Test the query count and DB time are reported in Server-Timing."""
+        res = self.client.get(self.url)
+
+        self.assertRegex(res["Server-Timing"], r'^db;dur=[\d.]+;desc="2 queries"$')
+
+    @override_settings(QUERY_COUNT={"HEADERS": False})
+    def test_no_header_when_disabled(self):
+        """Test the Server-Timing header can be turned off."""
+        res = self.client.get(self.url)
+
+        self.assertNotIn("Server-Timing", res)
+
+    @override_settings(QUERY_COUNT={"REPEAT_THRESHOLD": 0, "HEADERS": True})
+    def test_repeated_statements_are_flagged(self):
+        """Test requests repeating a statement are logged and flagged."""
+        with self.assertLogs("core.queries", level="WARNING") as logs:
+            res = self.client.get(self.url)
+
+        self.assertIn("db-repeated", res["Server-Timing"])
+        self.assertIn('"repeated"', logs.output[0])
+
+    @override_settings(QUERY_COUNT={"HEADERS": True})
+    async def test_async_requests_counted(self):
+        """Test queries of async views, run on other threads, are counted."""
+        res = await self.async_client.post(
+            reverse("user:async-create"), mock_user(salt="2"), content_type="application/json"
+        )
+
+        self.assertRegex(res["Server-Timing"], r'^db;dur=[\d.]+;desc="[1-9]\d* queries"$')
@@ -0,0 +1,85 @@
+"""
+Tests for unique slug allocation.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from core.slugs import allocate_slugs, next_slug
+from post.models import Post
+
+
+def create_user(username):
+    # Helper function to create a user.
+    return get_user_model().objects.create_user(email=f"{username}@example.com", username=username)
+
+
+class SlugTests(TestCase):
+    """Tests for slug allocation."""
+
+    def test_next_free_suffix_in_one_query(self):
+        """Test the next slug comes from the highest taken suffix, in one query."""
+        for username in ["john", "John_", "john__", "jöhn", "john-10", "johnny"]:
+            create_user(username)
+        field = get_user_model()._meta.get_field("slug")
+        user = get_user_model()(username="JOHN")
+
+        with self.assertNumQueries(1):
+            slug = next_slug(field, user)
+
+        self.assertEqual(slug, "john-11")
+
+    def test_resave_keeps_slug_without_probing(self):
+        """Test saving an existing user keeps its slug and runs no slug query."""
+        user = create_user("john")
+        user.email = "jane@example.com"
+
+        with self.assertNumQueries(1):
+            user.save(update_fields=["email", "slug"])
+
+        self.assertEqual(user.slug, "john")
+
+    def test_concurrent_slug_conflict_is_retried(self):
+        """Test an insert that lost its slug to another row gets the next one."""
+        create_user("john")
+        user = get_user_model()(email="late@example.com", username="john2")
+        user.slug = "john"  # Allocated before the other row committed.
+        user.set_password(None)
+
+        user.save()
+
+        user.refresh_from_db()
+        self.assertEqual(user.slug, "john2")
+
+    def test_allocate_slugs_for_batch(self):
+        """Test a batch gets distinct slugs past the taken ones."""
+        create_user("john")
+        create_user("john-3")
+        users = [get_user_model()(username=name) for name in ["john", "John", "mary"]]
+
+        with self.assertNumQueries(2):
+            allocate_slugs(users, "slug")
+
+        self.assertEqual([user.slug for user in users], ["john-4", "john-5", "mary"])
+
+    def test_long_bases_cut_for_suffix(self):
+        """Test bases cut short to fit their suffix are found when allocating the next one."""
+        username = "a" * 60
+        slugs = [create_user(f"{username}{n}").slug for n in range(12)]
+
+        field = get_user_model()._meta.get_field("slug")
+        self.assertEqual(len(set(slugs)), 12)
+        self.assertTrue(all(len(slug) <= field.max_length for slug in slugs))
+        self.assertEqual(slugs[1], "a" * 48 + "-2")
+        self.assertEqual(slugs[11], "a" * 47 + "-12")
+
+        users = [get_user_model()(username=username) for _ in range(2)]
+        allocate_slugs(users, "slug")
+        self.assertEqual([user.slug for user in users], ["a" * 47 + "-13", "a" * 47 + "-14"])
+
+    def test_post_slugs(self):
+        """Test posts allocate slugs from their title the same way."""
+        author = create_user("author")
+        first = Post.objects.create(author=author, title="Hello World", content="...")
+        second = Post.objects.create(author=author, title="Hello, world!", content="...")
+
+        self.assertEqual((first.slug, second.slug), ("hello-world", "hello-world-2"))
@@ -0,0 +1,96 @@
+"""
+Tests for the content-addressed media storage.
+"""
+import hashlib
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.constants.mock_data import john_doe
+from core.models import Blob
+
+
+class ContentAddressedStorageTests(TestCase):
+    """Tests for storing, referencing and collecting blobs."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_identical_content_is_stored_once(self):
+        """Test saving the same bytes twice returns one name and one blob."""
+        digest = hashlib.sha256(b"hello").hexdigest()
+
+        first = default_storage.save("uploads/avatars/a.TXT", ContentFile(b"hello"))
+        second = default_storage.save("uploads/covers/b.txt", ContentFile(b"hello"))
+
+        self.assertEqual(first, second)
+        self.assertEqual(first, f"blobs/{digest[:2]}/{digest[2:4]}/{digest}.txt")
+        with default_storage.open(first) as stored:
+            self.assertEqual(stored.read(), b"hello")
+        blob = Blob.objects.get()
+        self.assertEqual((blob.name, blob.size, blob.refs), (first, 5, 0))
+
+    def test_file_fields_hold_references(self):
+        """Test references follow the file fields of saved and deleted rows."""
+        user = get_user_model().objects.create_user(**john_doe)
+        user.avatar.save("a.png", ContentFile(b"avatar"))
+        avatar = user.avatar.name
+        self.assertEqual(Blob.objects.get(name=avatar).refs, 1)
+
+        user.cover_image = avatar
+        user.save()
+        self.assertEqual(Blob.objects.get(name=avatar).refs, 2)
+
+        user.avatar.save("b.png", ContentFile(b"other avatar"))
+        self.assertEqual(Blob.objects.get(name=avatar).refs, 1)
+        self.assertEqual(Blob.objects.get(name=user.avatar.name).refs, 1)
+
+        user.delete()
+        self.assertFalse(Blob.objects.exclude(refs=0).exists())
+
+    def test_collect_blobs_deletes_old_orphans(self):
+        """Test only unreferenced blobs past the grace period are collected."""
+        user = get_user_model().objects.create_user(**john_doe)
+        user.avatar.save("a.png", ContentFile(b"referenced"))
+        orphan = default_storage.save("x.png", ContentFile(b"orphan"))
+        fresh = default_storage.save("y.png", ContentFile(b"fresh"))
+        Blob.objects.exclude(name=fresh).update(stored_at=timezone.now() - timedelta(days=2))
+
+        call_command("collect_blobs", stdout=io.StringIO())
+
+        self.assertEqual(
+            set(Blob.objects.values_list("name", flat=True)), {user.avatar.name, fresh}
+        )
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertTrue(default_storage.exists(fresh))
+
+    def test_blob_collected_during_upload_is_rewritten(self):
+        """Test an upload rewrites a file collected before it claimed the blob."""
+        name = default_storage.save("a.txt", ContentFile(b"hello"))
+        stored = Blob.stored
+
+        def collect_first(blob_name, size):
+            # The collector deleted the file just before the upload locked the row.
+            default_storage.delete(blob_name)
+            stored(blob_name, size)
+
+        with patch.object(Blob, "stored", side_effect=collect_first):
+            self.assertEqual(default_storage.save("b.txt", ContentFile(b"hello")), name)
+
+        with default_storage.open(name) as stored_file:
+            self.assertEqual(stored_file.read(), b"hello")
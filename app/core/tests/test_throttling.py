@@ -0,0 +1,177 @@
+"""
+Tests for the token bucket throttles.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.constants.mock_data import john_doe, mock_user
+from core.throttling import LocalBucketStore, get_store, parse_rate
+
+CREATE_URL = reverse("user:create")
+ASYNC_CREATE_URL = reverse("user:async-create")
+TOKEN_URL = reverse("token_obtain_pair")
+ASYNC_TOKEN_URL = reverse("async_token_obtain_pair")
+FOLLOW_URL = reverse("user:follow")
+
+
+def rates(**scoped):
+    """Return REST_FRAMEWORK settings with the given "scope__kind" rates."""
+    return {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {
+            key.replace("__", "."): rate for key, rate in scoped.items()
+        },
+    }
+
+
+class LocalBucketStoreTests(SimpleTestCase):
+    """Tests for the in-process token buckets."""
+
+    def test_bucket_allows_capacity_then_waits(self):
+        """Test a full bucket allows a burst of its capacity, then refuses."""
+        store = LocalBucketStore()
+
+        waits = [store.consume("k", 3, 60, 1000.0) for _ in range(4)]
+
+        self.assertEqual(waits[:3], [0, 0, 0])
+        self.assertAlmostEqual(waits[3], 20.0)
+
+    def test_bucket_refills_over_time(self):
+        """Test tokens come back at capacity / period per second."""
+        store = LocalBucketStore()
+        for _ in range(3):
+            store.consume("k", 3, 60, 1000.0)
+
+        self.assertTrue(store.consume("k", 3, 60, 1010.0))
+        self.assertEqual(store.consume("k", 3, 60, 1020.0), 0)
+
+    def test_buckets_are_separate_per_key(self):
+        """Test one key running dry does not limit another."""
+        store = LocalBucketStore()
+        store.consume("a", 1, 60, 1000.0)
+
+        self.assertTrue(store.consume("a", 1, 60, 1000.0))
+        self.assertEqual(store.consume("b", 1, 60, 1000.0), 0)
+
+    @override_settings(THROTTLING={"MAX_KEYS": 2})
+    def test_least_recently_used_bucket_dropped(self):
+        """Test the store keeps at most MAX_KEYS buckets."""
+        store = LocalBucketStore()
+        for key in ("a", "b", "c"):
+            store.consume(key, 1, 60, 1000.0)
+
+        # "a" was dropped, so it starts from a full bucket again.
+        self.assertEqual(store.consume("a", 1, 60, 1000.0), 0)
+        self.assertTrue(store.consume("c", 1, 60, 1000.0))
+
+    def test_parse_rate(self):
+        """Test DRF rate strings are parsed to (capacity, seconds)."""
+        self.assertEqual(parse_rate("10/min"), (10, 60))
+        self.assertEqual(parse_rate("5/hour"), (5, 3600))
+
+
+class ThrottledViewTests(TestCase):
+    """Tests for the throttled signup and login endpoints."""
+
+    def setUp(self):
+        get_store().clear()
+        self.user = get_user_model().objects.create_user(**john_doe)
+
+    def tearDown(self):
+        get_store().clear()
+
+    @override_settings(REST_FRAMEWORK=rates(signup__ip="2/hour"))
+    def test_signup_limited_per_ip(self):
+        """Test signups from one IP are refused past the rate."""
+        for salt in ("1", "2"):
+            res = self.client.post(CREATE_URL, mock_user(salt=salt))
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.post(CREATE_URL, mock_user(salt="3"))
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res)
+
+        res = self.client.post(CREATE_URL, mock_user(salt="4"), REMOTE_ADDR="10.0.0.2")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    @override_settings(REST_FRAMEWORK=rates(login__ip="1/min"))
+    def test_forwarded_for_header_ignored(self):
+        """Test clients cannot pick their IP bucket with X-Forwarded-For."""
+        payload = {"email": john_doe["email"], "password": "wrong-password"}
+        self.client.post(TOKEN_URL, payload, HTTP_X_FORWARDED_FOR="10.0.0.1")
+
+        res = self.client.post(TOKEN_URL, payload, HTTP_X_FORWARDED_FOR="10.0.0.2")
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(REST_FRAMEWORK=rates(follow__user="1/hour"))
+    def test_follow_limited_per_user(self):
+        """Test bulk follows are limited per authenticated user, whatever the IP."""
+        other = get_user_model().objects.create_user(**mock_user(salt="1"))
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        payload = {"users": [str(other.id)]}
+        res = client.post(FOLLOW_URL, payload, format="json", REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = client.delete(FOLLOW_URL, payload, format="json", REMOTE_ADDR="10.0.0.2")
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(REST_FRAMEWORK=rates(login__credential="2/min"))
+    def test_login_limited_per_email(self):
+        """Test attempts on one email are refused past the rate from any IP."""
+        payload = {"email": john_doe["email"], "password": "wrong-password"}
+        for address in ("10.0.0.1", "10.0.0.2"):
+            res = self.client.post(TOKEN_URL, payload, REMOTE_ADDR=address)
+            self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        res = self.client.post(
+            TOKEN_URL, {**payload, "email": john_doe["email"].upper()}, REMOTE_ADDR="10.0.0.3"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(REST_FRAMEWORK=rates(login__ip="1/min"))
+    def test_scopes_without_rate_not_limited(self):
+        """Test only the configured scopes and kinds are throttled."""
+        for salt in ("1", "2", "3"):
+            res = self.client.post(CREATE_URL, mock_user(salt=salt))
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    @override_settings(REST_FRAMEWORK=rates(signup__ip="1/hour"))
+    async def test_async_signup_limited_per_ip(self):
+        """Test the async signup view shares the signup buckets."""
+        res = await self.async_client.post(
+            ASYNC_CREATE_URL, mock_user(salt="1"), content_type="application/json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = await self.async_client.post(
+            ASYNC_CREATE_URL, mock_user(salt="2"), content_type="application/json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res["Retry-After"], "3600")
+
+    @override_settings(REST_FRAMEWORK=rates(login__credential="1/min"))
+    async def test_async_login_limited_per_email(self):
+        """Test the async token view throttles attempts per email."""
+        payload = {"email": john_doe["email"], "password": "wrong-password"}
+        res = await self.async_client.post(
+            ASYNC_TOKEN_URL, payload, content_type="application/json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        res = await self.async_client.post(
+            ASYNC_TOKEN_URL, payload, content_type="application/json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
@@ -0,0 +1,187 @@
+"""
+Token bucket rate limiting for DRF views and the async views.
+
+Rates are read from ``REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]`` under
+``"<view.throttle_scope>.<kind>"`` keys, where the kind says what the
+bucket is keyed on: the client IP, the authenticated user or the
+credential (email) being tried. Scopes without a rate are not limited.
+
+Buckets live in a store. LocalBucketStore keeps exact token buckets in
+process memory, each check a single locked read-modify-write of a
+(tokens, timestamp) pair. CacheWindowStore shares limits between
+processes through the cache with sliding-window counters, because the
+cache API offers atomic add/incr but no compare-and-set.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+DEFAULTS = {
+    "STORE": "core.throttling.LocalBucketStore",
+    "CACHE_ALIAS": "default",
+    # Buckets kept by LocalBucketStore; the least recently used are dropped.
+    "MAX_KEYS": 100000,
+}
+
+
+def throttle_setting(name):
+    """Return a THROTTLING setting, falling back to the default."""
+    return getattr(settings, "THROTTLING", {}).get(name, DEFAULTS[name])
+
+
+class LocalBucketStore:
+    """Token buckets in process memory."""
+
+    blocking = False
+
+    def __init__(self):
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, period, now):
+        """Take a token from a bucket; return 0 if allowed, else seconds to wait."""
+        rate = capacity / period
+        with self._lock:
+            tokens, stamp = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - stamp) * rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / rate
+            self._buckets[key] = (tokens - 1 if not wait else tokens, now)
+            if len(self._buckets) > throttle_setting("MAX_KEYS"):
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        """Drop every bucket."""
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheWindowStore:
+    """Sliding-window counters in a shared cache."""
+
+    blocking = True
+
+    def consume(self, key, capacity, period, now):
+        """Count a request in the window; return 0 if allowed, else seconds to wait."""
+        cache = caches[throttle_setting("CACHE_ALIAS")]
+        window, offset = divmod(now, period)
+        current, previous = f"throttle:{key}:{int(window)}", f"throttle:{key}:{int(window) - 1}"
+        cache.add(current, 0, timeout=int(period * 2) + 1)
+        count = cache.incr(current)
+        # The previous window counts for the part of it still inside the sliding window.
+        carried = cache.get(previous, 0) * (1 - offset / period)
+        if carried + count <= capacity:
+            return 0
+        cache.decr(current)
+        return period - offset
+
+
+@lru_cache(maxsize=None)
+def _load_store(path):
+    return import_string(path)()
+
+
+def get_store():
+    """Return the configured bucket store."""
+    return _load_store(throttle_setting("STORE"))
+
+
+def parse_rate(rate):
+    """Turn a DRF rate such as "10/min" into (capacity, period in seconds)."""
+    num, period = rate.split("/")
+    return int(num), {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+
+
+def get_rate(scope, kind):
+    """Return (capacity, period) for a scope and kind, or None if unlimited."""
+    rate = api_settings.DEFAULT_THROTTLE_RATES.get(f"{scope}.{kind}") if scope else None
+    return None if rate is None else parse_rate(rate)
+
+
+def credential_ident(credential):
+    """Return a key for a credential that does not store it in the clear."""
+    return hashlib.sha256(credential.strip().lower().encode()).hexdigest()[:32]
+
+
+def check_rate(scope, kind, ident):
+    """Consume a token for ident under a scope; return 0 if allowed, else the wait."""
+    rate = get_rate(scope, kind)
+    if rate is None or ident is None:
+        return 0
+    capacity, period = rate
+    return get_store().consume(f"{scope}.{kind}:{ident}", capacity, period, time.time())
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Base throttle: subclasses set ``kind`` and return the bucket's ident."""
+
+    kind = None
+
+    def get_bucket_ident(self, request, view):
+        raise NotImplementedError(".get_bucket_ident() must be overridden")
+
+    def allow_request(self, request, view):
+        scope = getattr(view, "throttle_scope", None)
+        if get_rate(scope, self.kind) is None:
+            return True
+        self.wait_seconds = check_rate(scope, self.kind, self.get_bucket_ident(request, view))
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Limit requests per client IP."""
+
+    kind = "ip"
+
+    def get_bucket_ident(self, request, view):
+        return self.get_ident(request)
+
+
+class UserThrottle(TokenBucketThrottle):
+    """Limit requests per authenticated user; anonymous requests are not counted."""
+
+    kind = "user"
+
+    def get_bucket_ident(self, request, view):
+        user = getattr(request, "user", None)
+        return user.pk if user is not None and user.is_authenticated else None
+
+
+class CredentialThrottle(TokenBucketThrottle):
+    """Limit login attempts per email tried, however many IPs they come from."""
+
+    kind = "credential"
+
+    def get_bucket_ident(self, request, view):
+        credential = request.data.get("email") if hasattr(request.data, "get") else None
+        return credential_ident(credential) if isinstance(credential, str) else None
+
+
+async def acheck_rates(request, scope, credential=None):
+    """
+    Check the IP (and credential) buckets of a scope from an async view.
+    Returns 0 if allowed, else the seconds to wait.
+    """
+    checks = [("ip", BaseThrottle().get_ident(request))]
+    if isinstance(credential, str):
+        checks.append(("credential", credential_ident(credential)))
+
+    def run():
+        return max(check_rate(scope, kind, ident) for kind, ident in checks)
+
+    if get_store().blocking:
+        return await sync_to_async(run)()
+    return run()
@@ -0,0 +1,152 @@
+"""
+Comment thread loading.
+
+Comments carry a materialized path (see Comment), so the subtrees of any
+run of consecutive top-level comments are one range of the (post, path)
+index. A page of a thread is two queries however deep or large it is:
+one for the page of top-level comments and one for the replies under them,
+assembled into nested replies in a single pass over the path order.
+
+Replies are loaded MAX_DEPTH levels deep and MAX_REPLIES per page at most.
+Comments whose replies were left out carry the path to continue after, and
+continuing is one more range scan of the subtree, capped the same way.
+"""
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+
+from post.models import PATH_DIGITS, Comment
+
+
+DEFAULTS = {
+    "MAX_DEPTH": 5,
+    "MAX_REPLIES": 200,
+}
+
+
+def comment_setting(name):
+    """Return a COMMENTS setting, falling back to the default."""
+    return getattr(settings, "COMMENTS", {}).get(name, DEFAULTS[name])
+
+
+def path_successor(path):
+    """Return the smallest string sorting after every path that starts with path, or None."""
+    stripped = path.rstrip(PATH_DIGITS[-1])
+    if not stripped:
+        return None
+    return stripped[:-1] + PATH_DIGITS[PATH_DIGITS.index(stripped[-1]) + 1]
+
+
+def thread_queryset():
+    """Return comments with the columns a thread shows, their authors and whether they have replies."""
+    replies = Comment.objects.filter(parent=OuterRef("pk"))
+    return Comment.objects.select_related("author").annotate(has_replies=Exists(replies)).only(
+        "id",
+        "post",
+        "parent",
+        "path",
+        "depth",
+        "content",
+        "created_at",
+        "deleted",
+        "author__id",
+        "author__username",
+        "author__slug",
+    )
+
+
+def scan(post_id, after, end, max_depth):
+    """
+    Return the replies of a post in the path range (after, end), at most
+    max_depth deep, in path order: MAX_REPLIES of them at most, and the path
+    of the first one left out (None if none were).
+    """
+    limit = comment_setting("MAX_REPLIES")
+    replies = thread_queryset().filter(
+        post_id=post_id, path__gt=after, depth__gt=0, depth__lte=max_depth
+    ).order_by("path")
+    if end is not None:
+        replies = replies.filter(path__lt=end)
+    replies = list(replies[: limit + 1])
+    cut = replies[limit].path if len(replies) > limit else None
+    return replies[:limit], cut
+
+
+def below_depth(comments, max_depth):
+    """Return {comment id: path to continue after} for comments whose replies are too deep."""
+    return {
+        comment.id: comment.path
+        for comment in comments
+        if comment.depth == max_depth and comment.has_replies
+    }
+
+
+def load_subtrees(roots):
+    """
+    Return the roots (from thread_queryset), in path order, followed by their
+    replies in one query, and {comment id: path to continue after} for
+    comments with replies left out.
+    """
+    roots = sorted(roots, key=lambda comment: comment.path)
+    if not roots:
+        return [], {}
+    max_depth = comment_setting("MAX_DEPTH")
+    replies, cut = scan(roots[0].post_id, roots[0].path, path_successor(roots[-1].path), max_depth)
+    more = below_depth(replies, max_depth)
+    if cut is not None:
+        for root in roots:
+            if cut.startswith(root.path):
+                more[root.id] = max(replies[-1].path, root.path)
+            elif root.path > cut and root.has_replies:
+                more[root.id] = root.path
+    return sorted([*roots, *replies], key=lambda comment: comment.path), more
+
+
+def load_replies(parent, after):
+    """
+    Return the replies under a comment that come after the path after, in one
+    query, and {comment id: path to continue after} for comments with replies
+    left out; the parent's own entry continues this scan.
+    """
+    max_depth = parent.depth + comment_setting("MAX_DEPTH")
+    replies, cut = scan(parent.post_id, after, path_successor(parent.path), max_depth)
+    more = below_depth(replies, max_depth)
+    if cut is not None:
+        more[parent.id] = replies[-1].path
+    return replies, more
+
+
+def comment_node(comment):
+    """Return the JSON shape of a comment; deleted ones keep only their place."""
+    author = None
+    if not comment.deleted:
+        author = {
+            "id": str(comment.author.id),
+            "username": comment.author.username,
+            "slug": comment.author.slug,
+        }
+    return {
+        "id": comment.id,
+        "parent": comment.parent_id,
+        "depth": comment.depth,
+        "deleted": comment.deleted,
+        "author": author,
+        "content": None if comment.deleted else comment.content,
+        "created_at": comment.created_at.isoformat(),
+        "replies": [],
+        "more_replies": None,
+    }
+
+
+def build_tree(comments, more_links=None):
+    """
+    Nest path-ordered comments under their parents in a single pass, with the
+    links to the replies left out of each ({comment id: link}).
+    """
+    more_links = more_links or {}
+    nodes, roots = {}, []
+    for comment in comments:
+        node = nodes[comment.id] = comment_node(comment)
+        node["more_replies"] = more_links.get(comment.id)
+        parent = nodes.get(comment.parent_id)
+        (parent["replies"] if parent is not None else roots).append(node)
+    return roots
@@ -0,0 +1,230 @@
+"""
+Write-coalescing counters for post views and reactions.
+
+A page view or a reaction does not touch the counter row itself: the
+increment is added to an in-process buffer, and every FLUSH_SECONDS (or
+once MAX_PENDING keys are waiting) the buffer is written out with one
+UPDATE per distinct delta, ``F()`` expressions doing the arithmetic in the
+database. Flushes run on a background thread started with the server (see
+config/wsgi.py); without it (commands, tests) the add that finds a buffer
+due flushes it. Failed writes are logged and retried with the next flush,
+never raised into the request. Reaction counts go to PostReactionCount,
+and each flush picks one of SHARDS rows per (post, reaction type), so
+processes flushing the same viral post update different rows instead of
+queueing on one lock.
+
+Reactions are counted by signals once their transaction commits.
+Counts are eventually consistent: a process shows its own increments after
+its next flush, and a crashed process loses what it had not flushed yet.
+``recount_reactions`` rebuilds reaction counts from the Reaction rows.
+"""
+import atexit
+import logging
+import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Sum
+
+from post.models import Post, PostReactionCount, Reaction, ReactionType
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "FLUSH_SECONDS": 5,
+    "MAX_PENDING": 10000,
+    "SHARDS": 8,
+}
+
+
+def counter_setting(name):
+    """Return a COUNTERS setting, falling back to the default."""
+    return getattr(settings, "COUNTERS", {}).get(name, DEFAULTS[name])
+
+
+def by_delta(deltas):
+    """Group the keys of a {key: delta} mapping by their non-zero delta."""
+    grouped = defaultdict(list)
+    for key, delta in deltas.items():
+        if delta:
+            grouped[delta].append(key)
+    return grouped
+
+
+class CounterBuffer:
+    """Thread-safe in-process buffer of counter deltas, flushed by a writer function."""
+
+    def __init__(self, write):
+        self.write = write
+        self.flusher = None
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._flushed_at = time.monotonic()
+
+    def add(self, key, delta=1):
+        """Buffer a delta, flushing (or waking the flusher) if the buffer is due."""
+        with self._lock:
+            self._pending[key] += delta
+            due = (
+                len(self._pending) >= counter_setting("MAX_PENDING")
+                or time.monotonic() - self._flushed_at >= counter_setting("FLUSH_SECONDS")
+            )
+        if not due:
+            return
+        if self.flusher is not None and self.flusher.running():
+            self.flusher.wake()
+        else:
+            self.try_flush()
+
+    def pending(self):
+        """Return a copy of the deltas not flushed yet."""
+        with self._lock:
+            return dict(self._pending)
+
+    def flush(self):
+        """Write out the buffered deltas; they are kept for the next flush if writing fails."""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._flushed_at = time.monotonic()
+        if not pending:
+            return
+        try:
+            self.write(pending)
+        except Exception:
+            with self._lock:
+                self._pending.update(pending)
+            raise
+
+    def try_flush(self):
+        """Flush, logging a failed write instead of raising it."""
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Writing buffered counters failed; retrying with the next flush.")
+
+
+class Flusher:
+    """Daemon thread flushing buffers every FLUSH_SECONDS, or when one fills up."""
+
+    def __init__(self, *buffers):
+        self.buffers = buffers
+        for buffer in buffers:
+            buffer.flusher = self
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._pid = None
+
+    def running(self):
+        """Check if the thread runs in this process (it does not survive a fork)."""
+        return self._pid == os.getpid() and not self._stop.is_set()
+
+    def start(self):
+        """Start the flushing thread."""
+        self._pid = os.getpid()
+        self._stop.clear()
+        threading.Thread(target=self._run, name="counter-flusher", daemon=True).start()
+
+    def stop(self):
+        """Stop the flushing thread after a last flush."""
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self):
+        """Flush now rather than at the end of the interval."""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(counter_setting("FLUSH_SECONDS"))
+            self._wake.clear()
+            for buffer in self.buffers:
+                buffer.try_flush()
+            connections.close_all()
+
+
+def write_views(deltas):
+    """Add buffered views to Post.views, one UPDATE per distinct delta."""
+    with transaction.atomic():
+        for delta, post_ids in by_delta(deltas).items():
+            Post.objects.filter(pk__in=sorted(post_ids)).update(views=F("views") + delta)
+
+
+def write_reactions(deltas):
+    """Add buffered reaction deltas, keyed (post_id, reaction_type_id), to one shard each."""
+    shard = random.randrange(counter_setting("SHARDS"))
+    with transaction.atomic():
+        # Reactions removed by deleting their post or type have nothing left to count.
+        posts = Post.objects.filter(pk__in={post_id for post_id, _ in deltas})
+        types = ReactionType.objects.filter(pk__in={type_id for _, type_id in deltas})
+        posts, types = set(posts.values_list("pk", flat=True)), set(types.values_list("pk", flat=True))
+        deltas = {
+            (post_id, type_id): delta
+            for (post_id, type_id), delta in deltas.items()
+            if delta and post_id in posts and type_id in types
+        }
+        PostReactionCount.objects.bulk_create(
+            [
+                PostReactionCount(post_id=post_id, reaction_type_id=type_id, shard=shard)
+                for post_id, type_id in deltas
+            ],
+            ignore_conflicts=True,
+        )
+        grouped = defaultdict(list)
+        for delta, keys in by_delta(deltas).items():
+            for post_id, type_id in keys:
+                grouped[delta, type_id].append(post_id)
+        for (delta, type_id), post_ids in grouped.items():
+            PostReactionCount.objects.filter(
+                reaction_type_id=type_id, shard=shard, post_id__in=sorted(post_ids)
+            ).update(count=F("count") + delta)
+
+
+views = CounterBuffer(write_views)
+reactions = CounterBuffer(write_reactions)
+flusher = Flusher(views, reactions)
+
+
+@atexit.register
+def flush_all():
+    """Write out every buffer, e.g. on shutdown."""
+    views.try_flush()
+    reactions.try_flush()
+
+
+def record_view(post_id):
+    """Count a view of a post."""
+    views.add(post_id)
+
+
+def react(user, post, reaction_type):
+    """Add a user's reaction to a post; returns False if it was already there."""
+    _, created = Reaction.objects.get_or_create(user=user, post=post, reaction_type=reaction_type)
+    return created
+
+
+def unreact(user, post, reaction_type):
+    """Remove a user's reaction from a post; returns False if there was none."""
+    deleted, _ = Reaction.objects.filter(
+        user=user, post=post, reaction_type=reaction_type
+    ).delete()
+    return bool(deleted)
+
+
+def reaction_counts(post_ids):
+    """Return {post_id: {reaction type label: count}} for the given posts."""
+    rows = (
+        PostReactionCount.objects.filter(post_id__in=post_ids)
+        .values("post_id", "reaction_type__label")
+        .annotate(total=Sum("count"))
+        .order_by()
+    )
+    counts = {post_id: {} for post_id in post_ids}
+    for row in rows:
+        if row["total"]:
+            counts[row["post_id"]][row["reaction_type__label"]] = row["total"]
+    return counts
@@ -0,0 +1,19 @@
+# Generated by Django 4.0.10 on 2026-10-18 01:54
+
+import core.slugs
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='slug',
+            field=core.slugs.UniqueSlugField(editable=False, populate_from='title', unique=True),
+        ),
+    ]
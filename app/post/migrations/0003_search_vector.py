@@ -0,0 +1,26 @@
+# Generated by Django 4.0.10 on 2026-10-18 01:57
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+import core.db.operations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0002_post_slug_field'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        core.db.operations.CreateSearchIndex(
+            model_name='post',
+            fields=['title', 'excerpt', 'content'],
+            config='english',
+        ),
+    ]
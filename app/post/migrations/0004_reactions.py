@@ -0,0 +1,50 @@
+# Generated by Django 4.0.10 on 2026-10-18 02:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('post', '0003_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReactionType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=255, unique=True)),
+                ('emoji', models.CharField(max_length=255, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Reaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reactions', to='post.post')),
+                ('reaction_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='post.reactiontype')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'post', 'reaction_type')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PostReactionCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('count', models.BigIntegerField(default=0)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='post.post')),
+                ('reaction_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='post.reactiontype')),
+            ],
+            options={
+                'unique_together': {('post', 'reaction_type', 'shard')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.0.10 on 2026-10-18 02:23
+
+from django.db import migrations, models
+import post.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0005_comments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.SlugField(max_length=255, unique=True)),
+                ('description', models.TextField(blank=True)),
+                ('image', models.ImageField(blank=True, null=True, upload_to=post.models.tag_image_path)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('popularity_score', models.FloatField(default=0)),
+                ('usage_count', models.PositiveIntegerField(default=0)),
+                ('trending_rank', models.PositiveIntegerField(blank=True, db_index=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='posts', to='post.tag'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.0.10 on 2026-10-18 02:26
+
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+import core.db.operations
+
+
+# A copy of post.models.make_excerpt as of this migration.
+def make_excerpt(content):
+    return Truncator(strip_tags(content or "")).words(50)
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model("post", "Post")
+    blank = Post.objects.filter(Q(excerpt__isnull=True) | Q(excerpt=""))
+    batch = []
+    for post in blank.only("id", "content").iterator(chunk_size=1000):
+        post.excerpt = make_excerpt(post.content)
+        batch.append(post)
+        if len(batch) == 1000:
+            Post.objects.bulk_update(batch, ["excerpt"])
+            batch = []
+    Post.objects.bulk_update(batch, ["excerpt"])
+
+
+class Migration(migrations.Migration):
+
+    # The index is built with CREATE INDEX CONCURRENTLY on PostgreSQL, which
+    # cannot run inside a transaction; the backfill commits batch by batch.
+    atomic = False
+
+    dependencies = [
+        ('post', '0006_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+        core.db.operations.AddIndexConcurrentlyIfSupported(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-published_at', '-id'], name='post_published_idx'),
+        ),
+    ]
@@ -0,0 +1,362 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Model,
+    BigIntegerField,
+    CharField,
+    FloatField,
+    TextField,
+    BooleanField,
+    DateTimeField,
+    ImageField,
+    PositiveIntegerField,
+    PositiveSmallIntegerField,
+    Q,
+    ForeignKey,
+    Index,
+    ManyToManyField,
+    SlugField,
+    CASCADE,
+)
+from django.contrib.postgres.search import SearchVectorField
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+from core.slugs import UniqueSlugField, UniqueSlugMixin
+from user.models import image_path
+
+
+AUTH_USER_MODEL = settings.AUTH_USER_MODEL
+
+EXCERPT_WORDS = 50
+
+# Post stats, moved only by F() updates (see post.counters).
+POST_COUNTER_FIELDS = ("views",)
+
+# Tag stats, written only by post.tags.
+TAG_STAT_FIELDS = ("popularity_score", "usage_count", "trending_rank")
+
+
+def post_cover_image_path(instance, filename):
+    return image_path(filename, "post_cover_images")
+
+
+def make_excerpt(content):
+    """Return the first EXCERPT_WORDS words of a post's content, as plain text."""
+    return Truncator(strip_tags(content or "")).words(EXCERPT_WORDS)
+
+
+def tag_image_path(instance, filename):
+    return image_path(filename, "tag_images")
+
+
+class Tag(Model):
+    """
+    Tag model represents tags or categories assigned to posts.
+    Stores tag names and related metadata.
+    """
+
+    # Metadata
+    name = SlugField(max_length=255, unique=True, db_index=True)
+    description = TextField(blank=True)
+    image = ImageField(upload_to=tag_image_path, null=True, blank=True)
+
+    # Timestamps
+    created_at = DateTimeField(auto_now_add=True)
+    updated_at = DateTimeField(auto_now=True)
+
+    # Stats, maintained by post.tags
+    popularity_score = FloatField(default=0)  # Recent usage, decaying with age
+    usage_count = PositiveIntegerField(default=0)  # Number of posts using the tag
+    trending_rank = PositiveIntegerField(null=True, blank=True, db_index=True)
+
+    def __str__(self):
+        """Return the string representation of the tag."""
+        return f"{self.id} - {self.name}"
+
+    def save(self, *args, **kwargs):
+        """
+        Save the tag. Saves of an existing row without update_fields leave out
+        the stats, so stale in-memory values never overwrite those of post.tags.
+        """
+        inserting = self._state.adding or kwargs.get("force_insert")
+        if not inserting and not args and kwargs.get("update_fields") is None:
+            skipped = self.get_deferred_fields() | set(TAG_STAT_FIELDS)
+            kwargs["update_fields"] = [
+                field.attname
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
+
+
+class Post(UniqueSlugMixin, Model):
+    """
+    Post model represents individual articles or posts published on your platform.
+    Stores post content, metadata, and statistics.
+    Includes fields for title, content, author, timestamps, likes, comments, tags, etc.
+    """
+
+    # Content
+    title = CharField(max_length=255)
+    excerpt = TextField(blank=True, null=True)
+    content = TextField()
+
+    # Author
+    author = ForeignKey(AUTH_USER_MODEL, on_delete=CASCADE, related_name="posts")
+
+    # Timestamps
+    created_at = DateTimeField(auto_now_add=True)
+    updated_at = DateTimeField(auto_now=True)
+
+    # Metadata
+    slug = UniqueSlugField(populate_from="title", unique=True)
+    is_published = BooleanField(default=False)
+    published_at = DateTimeField(null=True, blank=True)
+    cover_image = ImageField(upload_to=post_cover_image_path, null=True, blank=True)
+
+    # Stats, incremented in batches by post.counters
+    views = PositiveIntegerField(default=0)
+
+    # Search, maintained by post.search (the GIN index lives in migrations).
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Tags
+    tags = ManyToManyField(Tag, related_name="posts", blank=True)
+
+    class Meta:
+        indexes = [
+            Index(fields=["author", "-published_at"]),
+            # The public list, newest first.
+            Index(
+                fields=["-published_at", "-id"],
+                condition=Q(is_published=True),
+                name="post_published_idx",
+            ),
+        ]
+
+    def __str__(self):
+        """Return the string representation of the post."""
+        return f"{self.id} - {self.title}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the stored content and state, so saves can tell when they change."""
+        post = super().from_db(db, field_names, values)
+        post._stored_content = post.__dict__.get("content")
+        post._stored_published = post.__dict__.get("is_published")
+        return post
+
+    def publication_changed(self):
+        """Check if is_published differs from the stored value, or that is unknown."""
+        stored = getattr(self, "_stored_published", None)
+        return stored is None or stored != self.is_published
+
+    def excerpt_outdated(self):
+        """Check if the excerpt is missing, or was generated from content edited since."""
+        if not self.excerpt:
+            return True
+        stored = getattr(self, "_stored_content", None)
+        return (
+            stored is not None
+            and self.content != stored
+            and self.excerpt == make_excerpt(stored)
+        )
+
+    def save(self, *args, **kwargs):
+        """
+        Override save method to stamp the publication time and fill in the excerpt.
+        Saves of an existing row without update_fields leave out the counters, so
+        stale in-memory counts never overwrite flushed F() updates.
+        """
+        inserting = self._state.adding or kwargs.get("force_insert")
+        if not inserting and not args and kwargs.get("update_fields") is None:
+            skipped = self.get_deferred_fields() | set(POST_COUNTER_FIELDS)
+            kwargs["update_fields"] = [
+                field.attname
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped
+            ]
+        if self.is_published and self.published_at is None:
+            self.published_at = timezone.now()
+        # Lists show the excerpt, so they never have to load the content.
+        # Excerpts written by the author are kept when the content changes.
+        if not {"content", "excerpt"} & self.get_deferred_fields() and self.excerpt_outdated():
+            self.excerpt = make_excerpt(self.content)
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "excerpt"}
+        super().save(*args, **kwargs)
+        deferred = self.get_deferred_fields()
+        if "content" not in deferred:
+            self._stored_content = self.content
+        if "is_published" not in deferred:
+            self._stored_published = self.is_published
+
+    def publish(self):
+        """Publish the post and push it into the followers' timelines."""
+        self.is_published = True
+        self.save(update_fields=["is_published", "published_at", "updated_at"])
+
+    def unpublish(self):
+        """Unpublish the post and remove it from every timeline."""
+        self.is_published = False
+        self.save(update_fields=["is_published", "updated_at"])
+
+
+class TimelineEntry(Model):
+    """
+    TimelineEntry model represents a post materialized into a user's home timeline.
+    Rows are written on publish (fan-out-on-write) and read with a range scan.
+    """
+
+    owner = ForeignKey(AUTH_USER_MODEL, on_delete=CASCADE, related_name="timeline")
+    post = ForeignKey(Post, on_delete=CASCADE, related_name="+")
+    author = ForeignKey(AUTH_USER_MODEL, on_delete=CASCADE, related_name="+")
+    published_at = DateTimeField()
+
+    class Meta:
+        unique_together = ["owner", "post"]
+        indexes = [Index(fields=["owner", "-published_at", "-post"])]
+
+    def __str__(self):
+        """Return the string representation of the timeline entry."""
+        return f"Owner: {self.owner_id} - Post: {self.post_id}"
+
+
+# Comment paths are made of each ancestor's id in fixed-width base 36.
+PATH_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+PATH_SEGMENT = 7
+PATH_LENGTH = 255
+MAX_COMMENT_DEPTH = PATH_LENGTH // PATH_SEGMENT - 1
+
+
+def path_segment(number):
+    """Encode a number as one fixed-width path segment."""
+    digits = []
+    for _ in range(PATH_SEGMENT):
+        number, digit = divmod(number, len(PATH_DIGITS))
+        digits.append(PATH_DIGITS[digit])
+    if number:
+        raise ValueError("Comment id too large for a path segment.")
+    return "".join(reversed(digits))
+
+
+class Comment(Model):
+    """
+    Comment model represents comments made on posts.
+    Threads are materialized paths: a comment's path is its parent's path plus
+    its own id, so sorting by path lists a thread depth first and a subtree is
+    one range of the (post, path) index. Deleted comments stay as placeholders.
+    """
+
+    # Content
+    content = TextField()
+
+    # Author
+    author = ForeignKey(AUTH_USER_MODEL, on_delete=CASCADE, related_name="comments")
+
+    # Timestamps
+    created_at = DateTimeField(auto_now_add=True)
+    updated_at = DateTimeField(auto_now=True)
+
+    # Relationships
+    post = ForeignKey(Post, on_delete=CASCADE, related_name="comments")
+    parent = ForeignKey("self", on_delete=CASCADE, null=True, blank=True, related_name="replies")
+
+    # Thread position, set on insert
+    path = CharField(max_length=PATH_LENGTH, editable=False)
+    depth = PositiveSmallIntegerField(default=0, editable=False)
+
+    # Metadata
+    deleted = BooleanField(default=False)
+    deleted_at = DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            Index(fields=["post", "path"]),
+            # Top-level comments, paginated before their subtrees are loaded.
+            Index(fields=["post", "depth", "path"]),
+        ]
+
+    def __str__(self):
+        """Return the string representation of the comment."""
+        return f"{self.id} - {self.content}"
+
+    def save(self, *args, **kwargs):
+        """Override save method to place new comments in their thread."""
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        prefix = ""
+        if self.parent_id is not None:
+            parent = self.parent
+            if parent.post_id != self.post_id:
+                raise ValueError("Replies must be on the post of their parent.")
+            if parent.depth >= MAX_COMMENT_DEPTH:
+                raise ValueError(f"Threads are limited to {MAX_COMMENT_DEPTH + 1} levels.")
+            prefix, self.depth = parent.path, parent.depth + 1
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+            # The id is only known after the insert.
+            self.path = prefix + path_segment(self.pk)
+            Comment.objects.filter(pk=self.pk).update(path=self.path)
+
+    def soft_delete(self):
+        """Delete the comment, keeping it as a placeholder for its replies."""
+        self.deleted = True
+        self.deleted_at = timezone.now()
+        self.save(update_fields=["deleted", "deleted_at", "updated_at"])
+
+
+class ReactionType(Model):
+    """
+    ReactionType model represents reaction types.
+    Stores information about the reaction type (e.g., like, emoji).
+    """
+
+    label = CharField(max_length=255, unique=True)
+    emoji = CharField(max_length=255, unique=True)  # Unicode emoji
+
+    def __str__(self):
+        """Return the string representation of the reaction type."""
+        return f"{self.id} - {self.label}"
+
+
+class Reaction(Model):
+    """
+    Reaction model represents a user's reaction to a post.
+    Stores the user, the post and the type of reaction; counts live in PostReactionCount.
+    """
+
+    user = ForeignKey(AUTH_USER_MODEL, on_delete=CASCADE, related_name="reactions")
+    post = ForeignKey(Post, on_delete=CASCADE, related_name="reactions")
+    reaction_type = ForeignKey(ReactionType, on_delete=CASCADE, related_name="+")
+    created_at = DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ["user", "post", "reaction_type"]
+
+    def __str__(self):
+        """Return the string representation of the reaction."""
+        return f"{self.id} - {self.user_id} - {self.post_id} - {self.reaction_type_id}"
+
+
+class PostReactionCount(Model):
+    """
+    PostReactionCount model holds one shard of a post's count for a reaction type.
+    Increments are coalesced in memory and each flush adds to a random shard, so
+    writers to a viral post spread over several rows; a count is the sum of its shards.
+    """
+
+    post = ForeignKey(Post, on_delete=CASCADE, related_name="+")
+    reaction_type = ForeignKey(ReactionType, on_delete=CASCADE, related_name="+")
+    shard = PositiveSmallIntegerField()
+    # Signed: a reaction added on one shard may be removed on another.
+    count = BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ["post", "reaction_type", "shard"]
+
+    def __str__(self):
+        """Return the string representation of the counter shard."""
+        return f"Post: {self.post_id} - {self.reaction_type_id}#{self.shard}: {self.count}"
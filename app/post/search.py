@@ -0,0 +1,12 @@
+"""
+Full-text search index of posts.
+"""
+from core.search import SearchIndex
+from post.models import Post
+
+
+post_index = SearchIndex(
+    Post,
+    {"title": "A", "excerpt": "B", "content": "C"},
+    config="english",
+)
@@ -0,0 +1,101 @@
+"""
+Serializers for the post API View.
+"""
+from django.utils.translation import gettext as _
+
+from django.contrib.auth import get_user_model
+from rest_framework.serializers import (
+    ModelSerializer,
+    SerializerMethodField,
+    SlugRelatedField,
+    ValidationError,
+)
+
+from post.counters import reaction_counts
+from post.models import MAX_COMMENT_DEPTH, Comment, Post, Tag
+
+# Columns a list row needs; content is left out so its (TOASTed) body is never read.
+POST_LIST_FIELDS = [
+    "id",
+    "slug",
+    "title",
+    "excerpt",
+    "cover_image",
+    "published_at",
+    "views",
+    "author__id",
+    "author__username",
+    "author__slug",
+]
+
+
+class PostAuthorSerializer(ModelSerializer):
+    """Serializer for the author shown with a post."""
+
+    class Meta:
+        model = get_user_model()
+        fields = ["id", "username", "slug"]
+        read_only_fields = fields
+
+
+class PostListSerializer(ModelSerializer):
+    """Lightweight serializer for posts in lists: the excerpt instead of the content."""
+
+    author = PostAuthorSerializer(read_only=True)
+    tags = SlugRelatedField(many=True, read_only=True, slug_field="name")
+
+    class Meta:
+        model = Post
+        fields = [
+            "id",
+            "slug",
+            "title",
+            "excerpt",
+            "cover_image",
+            "author",
+            "tags",
+            "published_at",
+            "views",
+        ]
+        read_only_fields = fields
+
+
+class PostDetailSerializer(PostListSerializer):
+    """Serializer for a single post, with its full content and reaction counts."""
+
+    reactions = SerializerMethodField()
+
+    class Meta(PostListSerializer.Meta):
+        fields = PostListSerializer.Meta.fields + ["content", "updated_at", "reactions"]
+        read_only_fields = fields
+
+    def get_reactions(self, post):
+        return reaction_counts([post.pk])[post.pk]
+
+
+class CommentSerializer(ModelSerializer):
+    """Serializer for writing a comment or a reply on the post in the context."""
+
+    class Meta:
+        model = Comment
+        fields = ["id", "content", "parent", "depth", "created_at"]
+        read_only_fields = ["id", "depth", "created_at"]
+
+    def validate_parent(self, parent):
+        """Replies go to live comments of the same post, within the depth limit."""
+        if parent is None:
+            return parent
+        if parent.post_id != self.context["post"].pk or parent.deleted:
+            raise ValidationError(_("Reply to a comment on this post."))
+        if parent.depth >= MAX_COMMENT_DEPTH:
+            raise ValidationError(_("This thread cannot be nested any deeper."))
+        return parent
+
+
+class TagSerializer(ModelSerializer):
+    """Serializer for a tag in the trending list."""
+
+    class Meta:
+        model = Tag
+        fields = ["name", "usage_count", "popularity_score", "trending_rank"]
+        read_only_fields = fields
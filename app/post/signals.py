@@ -0,0 +1,83 @@
+"""
+Signal handlers keeping timelines, blobs, the search index, reaction counts and
+tag usage counts in sync with posts.
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from core.storage import track_blobs
+from post import counters
+from post.models import Post, Reaction, Tag
+from post.tags import add_usage
+from post.search import post_index
+from post.timeline import fan_out, get_store
+
+
+track_blobs(Post, "cover_image")
+track_blobs(Tag, "image")
+post_index.track()
+
+
+@receiver(post_save, sender=Post)
+def update_timelines(sender, instance, created, update_fields, **kwargs):
+    """Fan out newly published posts and pull unpublished ones from timelines."""
+    if not created and (
+        (update_fields is not None and "is_published" not in update_fields)
+        or not instance.publication_changed()
+    ):
+        return
+    if instance.is_published:
+        transaction.on_commit(lambda: fan_out(instance))
+    elif not created:
+        transaction.on_commit(lambda: get_store().remove_post(instance.pk))
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_timelines(sender, instance, **kwargs):
+    """Remove deleted posts from every timeline."""
+    get_store().remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Reaction)
+def count_reaction(sender, instance, created, **kwargs):
+    """Buffer an increment of the post's count once the reaction is committed."""
+    if created:
+        key = (instance.post_id, instance.reaction_type_id)
+        transaction.on_commit(lambda: counters.reactions.add(key, 1))
+
+
+@receiver(post_delete, sender=Reaction)
+def uncount_reaction(sender, instance, **kwargs):
+    """Buffer a decrement of the post's count once the removal is committed."""
+    key = (instance.post_id, instance.reaction_type_id)
+    transaction.on_commit(lambda: counters.reactions.add(key, -1))
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def count_tag_usage(sender, instance, action, reverse, pk_set, **kwargs):
+    """Move tag usage counts by the posts tagged or untagged, from either side."""
+    if action in ("pre_clear", "pre_remove"):
+        # Only rows that exist are deleted, and they are gone by post_*; note which ones.
+        related = instance.posts if reverse else instance.tags
+        if pk_set is not None:
+            related = related.filter(pk__in=pk_set)
+        instance._untagged = list(related.values_list("pk", flat=True))
+        return
+    if action in ("post_clear", "post_remove"):
+        pk_set = instance.__dict__.pop("_untagged", [])
+        delta = -1
+    elif action == "post_add":
+        delta = 1
+    else:
+        return
+    if reverse:
+        add_usage({instance.pk: delta * len(pk_set)})
+    else:
+        add_usage({tag_id: delta for tag_id in pk_set})
+
+
+@receiver(pre_delete, sender=Post)
+def release_tags(sender, instance, **kwargs):
+    """Drop a deleted post from the usage counts of its tags."""
+    add_usage({tag_id: -1 for tag_id in instance.tags.values_list("pk", flat=True)})
@@ -0,0 +1,95 @@
+"""
+Tag usage counts, decaying popularity and the trending ranking.
+
+``usage_count`` moves by deltas as posts gain and lose tags (see
+post/signals.py), one UPDATE per distinct delta instead of recounting the
+Post-Tag table. ``popularity_score`` is recomputed periodically by
+``rank_tags`` from a windowed aggregate: tag uses of the last WINDOW_DAYS
+counted per hour of publication, each hour weighing half as much every
+HALF_LIFE_HOURS. The top TRENDING tags get a ``trending_rank``, so the
+trending list is a short range scan of that index.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest, TruncHour
+from django.utils import timezone
+
+from post.models import Post, Tag
+
+
+DEFAULTS = {
+    "WINDOW_DAYS": 7,
+    "HALF_LIFE_HOURS": 24,
+    "TRENDING": 50,
+    "BATCH_SIZE": 1000,
+}
+
+
+def tag_setting(name):
+    """Return a TAGS setting, falling back to the default."""
+    return getattr(settings, "TAGS", {}).get(name, DEFAULTS[name])
+
+
+def add_usage(deltas):
+    """Apply {tag_id: delta} to the usage counts, one UPDATE per distinct delta."""
+    grouped = defaultdict(list)
+    for tag_id, delta in deltas.items():
+        if delta:
+            grouped[delta].append(tag_id)
+    for delta, tag_ids in grouped.items():
+        Tag.objects.filter(pk__in=sorted(tag_ids)).update(
+            usage_count=Greatest(F("usage_count") + delta, 0)
+        )
+
+
+def decay(age, half_life):
+    """Return the weight of a use age old, halving every half_life."""
+    return 0.5 ** (age / half_life)
+
+
+def compute_popularity(now=None):
+    """Recompute popularity scores and the trending ranking; returns the ranked tag ids."""
+    now = now or timezone.now()
+    half_life = timedelta(hours=tag_setting("HALF_LIFE_HOURS"))
+    uses = (
+        Post.tags.through.objects.filter(
+            post__is_published=True,
+            post__published_at__gt=now - timedelta(days=tag_setting("WINDOW_DAYS")),
+            post__published_at__lte=now,
+        )
+        .annotate(hour=TruncHour("post__published_at"))
+        .values("tag_id", "hour")
+        .annotate(uses=Count("*"))
+        .order_by()
+    )
+    scores = defaultdict(float)
+    for row in uses.iterator():
+        scores[row["tag_id"]] += row["uses"] * decay(now - row["hour"], half_life)
+
+    ranked = sorted(scores, key=lambda tag_id: (-scores[tag_id], tag_id))
+    ranked = ranked[: tag_setting("TRENDING")]
+    with transaction.atomic():
+        Tag.objects.exclude(pk__in=list(scores)).exclude(popularity_score=0).update(
+            popularity_score=0
+        )
+        Tag.objects.filter(trending_rank__isnull=False).update(trending_rank=None)
+        rank = {tag_id: position for position, tag_id in enumerate(ranked, start=1)}
+        Tag.objects.bulk_update(
+            [
+                Tag(pk=tag_id, popularity_score=score, trending_rank=rank.get(tag_id))
+                for tag_id, score in scores.items()
+            ],
+            ["popularity_score", "trending_rank"],
+            batch_size=tag_setting("BATCH_SIZE"),
+        )
+    return ranked
+
+
+def trending(limit=None):
+    """Return the trending tags, best first, from the precomputed ranking."""
+    limit = min(limit or tag_setting("TRENDING"), tag_setting("TRENDING"))
+    return Tag.objects.filter(trending_rank__lte=limit).order_by("trending_rank")
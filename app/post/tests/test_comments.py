@@ -0,0 +1,214 @@
+"""
+Tests for threaded comments.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.constants.mock_data import mock_user
+from post.comments import build_tree, load_replies, load_subtrees, path_successor, thread_queryset
+from post.models import MAX_COMMENT_DEPTH, Comment, Post, path_segment
+
+
+def comments_url(post):
+    return reverse("post:comments", args=[post.slug])
+
+
+class CommentPathTests(TestCase):
+    """Tests for materialized comment paths."""
+
+    def setUp(self):
+        self.author = get_user_model().objects.create_user(**mock_user(salt="1"))
+        self.post = Post.objects.create(
+            author=self.author, title="Thread", content="Body", is_published=True
+        )
+
+    def comment(self, parent=None, **params):
+        # Helper function to add a comment or a reply.
+        return Comment.objects.create(
+            post=self.post, author=self.author, parent=parent, content="Text", **params
+        )
+
+    def test_path_extends_parent(self):
+        """Test a reply's path is its parent's path plus its own id."""
+        root = self.comment()
+        reply = self.comment(parent=root)
+
+        self.assertEqual(root.path, path_segment(root.pk))
+        self.assertEqual(reply.path, root.path + path_segment(reply.pk))
+        self.assertEqual(reply.depth, 1)
+        self.assertEqual(Comment.objects.get(pk=reply.pk).path, reply.path)
+
+    def test_path_successor(self):
+        """Test the successor of a path sorts after its whole subtree only."""
+        self.assertEqual(path_successor("000000a"), "000000b")
+        self.assertEqual(path_successor("00000az"), "00000b")
+        self.assertIsNone(path_successor("zzzzzzz"))
+        self.assertLess("00000azzzzzzzz", path_successor("00000az"))
+
+    def test_depth_limited(self):
+        """Test replies cannot nest past the maximum depth."""
+        parent = self.comment()
+        for _ in range(MAX_COMMENT_DEPTH):
+            parent = self.comment(parent=parent)
+
+        with self.assertRaises(ValueError):
+            self.comment(parent=parent)
+
+    def test_subtrees_loaded_in_one_query(self):
+        """Test the subtrees of a run of roots load in one query, nested in order."""
+        first, second, third = self.comment(), self.comment(), self.comment()
+        reply = self.comment(parent=first)
+        nested = self.comment(parent=reply)
+        self.comment(parent=second)
+        self.comment(parent=third)
+        late = self.comment(parent=first)
+        nested.soft_delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            comments, more = load_subtrees([second, first])
+            tree = build_tree(comments)
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(more, {})
+        self.assertEqual([node["id"] for node in tree], [first.pk, second.pk])
+        self.assertEqual([node["id"] for node in tree[0]["replies"]], [reply.pk, late.pk])
+        placeholder = tree[0]["replies"][0]["replies"][0]
+        self.assertEqual(
+            (placeholder["id"], placeholder["deleted"], placeholder["content"]),
+            (nested.pk, True, None),
+        )
+        self.assertEqual(len(tree[1]["replies"]), 1)
+
+    @override_settings(COMMENTS={"MAX_DEPTH": 2, "MAX_REPLIES": 2})
+    def test_subtrees_capped(self):
+        """Test deep and numerous replies are left out, with where to continue."""
+        first, second, third = self.comment(), self.comment(), self.comment()
+        chain = [first]
+        for _ in range(3):
+            chain.append(self.comment(parent=chain[-1]))
+        sibling = self.comment(parent=first)
+        self.comment(parent=third)
+        roots = thread_queryset().filter(post=self.post, depth=0)
+
+        comments, more = load_subtrees(roots)
+
+        # Two levels under first, then the count cap stops before sibling.
+        self.assertEqual([c.pk for c in comments], [first.pk, *[c.pk for c in chain[1:3]], second.pk, third.pk])
+        self.assertEqual(more, {chain[2].pk: chain[2].path, first.pk: chain[2].path, third.pk: third.path})
+
+        replies, more = load_replies(first, chain[2].path)
+        self.assertEqual([c.pk for c in replies], [sibling.pk])
+        self.assertEqual(more, {})
+        replies, more = load_replies(chain[2], chain[2].path)
+        self.assertEqual([c.pk for c in replies], [chain[3].pk])
+
+
+class CommentApiTests(TestCase):
+    """Tests for the comment thread endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(**mock_user(salt="1"))
+        self.post = Post.objects.create(
+            author=self.user, title="Thread", content="Body", is_published=True
+        )
+
+    def test_reply_and_read_thread(self):
+        """Test comments and replies posted through the API come back nested."""
+        self.client.force_authenticate(user=self.user)
+        root = self.client.post(comments_url(self.post), {"content": "First"}).data
+        res = self.client.post(
+            comments_url(self.post), {"content": "Reply", "parent": root["id"]}
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["depth"], 1)
+
+        res = self.client.get(comments_url(self.post))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        [thread] = res.data["results"]
+        self.assertEqual(thread["content"], "First")
+        self.assertEqual(thread["author"]["username"], self.user.username)
+        self.assertEqual(thread["replies"][0]["content"], "Reply")
+
+    def test_reply_to_other_post_rejected(self):
+        """Test replies must stay on the post of their parent."""
+        other = Post.objects.create(
+            author=self.user, title="Other", content="Body", is_published=True
+        )
+        parent = Comment.objects.create(post=other, author=self.user, content="Elsewhere")
+        self.client.force_authenticate(user=self.user)
+
+        res = self.client.post(comments_url(self.post), {"content": "Reply", "parent": parent.pk})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_anonymous_cannot_comment(self):
+        """Test authentication is required to comment."""
+        res = self.client.post(comments_url(self.post), {"content": "First"})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_pages_in_constant_queries(self):
+        """Test each page of threads costs the same queries however large the threads."""
+        roots = [
+            Comment.objects.create(post=self.post, author=self.user, content=str(n))
+            for n in range(4)
+        ]
+        for root in roots:
+            parent = root
+            for _ in range(5):
+                parent = Comment.objects.create(
+                    post=self.post, author=self.user, parent=parent, content="Reply"
+                )
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(comments_url(self.post), {"page_size": 3})
+        first_page = len(queries)
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(res.data["next"])
+
+        # The post, the top-level comments and their subtrees.
+        self.assertEqual((first_page, len(queries)), (3, 3))
+        self.assertEqual([thread["content"] for thread in res.data["results"]], ["3"])
+
+    @override_settings(COMMENTS={"MAX_DEPTH": 1, "MAX_REPLIES": 2})
+    def test_more_replies_links(self):
+        """Test replies left out of a page are listed by following their links."""
+        root = Comment.objects.create(post=self.post, author=self.user, content="Root")
+        replies = [
+            Comment.objects.create(post=self.post, author=self.user, parent=root, content=str(n))
+            for n in range(3)
+        ]
+        nested = Comment.objects.create(
+            post=self.post, author=self.user, parent=replies[0], content="Nested"
+        )
+
+        [thread] = self.client.get(comments_url(self.post)).data["results"]
+        self.assertEqual([node["content"] for node in thread["replies"]], ["0", "1"])
+        self.assertIsNone(thread["replies"][1]["more_replies"])
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(thread["more_replies"])
+        # The post, the parent comment and its replies.
+        self.assertEqual(len(queries), 3)
+        self.assertEqual([node["content"] for node in res.data["results"]], ["2"])
+        self.assertIsNone(res.data["next"])
+
+        res = self.client.get(thread["replies"][0]["more_replies"])
+        self.assertEqual([node["id"] for node in res.data["results"]], [nested.pk])
+
+    def test_more_replies_invalid(self):
+        """Test links to replies of other posts or outside the subtree are not found."""
+        root = Comment.objects.create(post=self.post, author=self.user, content="Root")
+        other = Comment.objects.create(post=self.post, author=self.user, content="Other")
+
+        for params in ({"replies": "x"}, {"replies": root.pk, "after": other.path}):
+            res = self.client.get(comments_url(self.post), params)
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,177 @@
+"""
+Tests for the write-coalescing view and reaction counters.
+"""
+import io
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+
+from core.constants.mock_data import mock_user
+from post import counters
+from post.models import Post, PostReactionCount, Reaction, ReactionType
+
+
+def create_post(author, **params):
+    # Helper function to create a post.
+    defaults = {"title": "Sample post", "content": "Sample content."}
+    defaults.update(params)
+    return Post.objects.create(author=author, **defaults)
+
+
+@override_settings(COUNTERS={"FLUSH_SECONDS": 3600, "SHARDS": 4})
+class CounterTests(TestCase):
+    """Tests for buffered counters."""
+
+    def setUp(self):
+        self.users = [
+            get_user_model().objects.create_user(**mock_user(salt=str(n))) for n in range(3)
+        ]
+        self.post = create_post(self.users[0])
+        self.other = create_post(self.users[0], title="Other post")
+        self.like = ReactionType.objects.create(label="like", emoji="👍")
+        self.love = ReactionType.objects.create(label="love", emoji="❤️")
+
+    def tearDown(self):
+        counters.flush_all()
+
+    def react(self, user, post, reaction_type):
+        # Helper function to react and run the commit hooks.
+        with self.captureOnCommitCallbacks(execute=True):
+            return counters.react(user, post, reaction_type)
+
+    def test_views_coalesced(self):
+        """Test views are buffered and written with one UPDATE per distinct delta."""
+        for _ in range(5):
+            counters.record_view(self.post.pk)
+        for _ in range(5):
+            counters.record_view(self.other.pk)
+        counters.record_view(self.other.pk)
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 0)
+        with CaptureQueriesContext(connection) as queries:
+            counters.views.flush()
+
+        updates = [q for q in queries.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(
+            dict(Post.objects.values_list("pk", "views")), {self.post.pk: 5, self.other.pk: 6}
+        )
+
+    def test_save_keeps_flushed_views(self):
+        """Test saving a post loaded before a flush keeps the flushed views."""
+        post = Post.objects.get(pk=self.post.pk)
+        counters.record_view(self.post.pk)
+        counters.views.flush()
+
+        post.title = "Edited"
+        post.save()
+
+        post.refresh_from_db()
+        self.assertEqual((post.title, post.views), ("Edited", 1))
+
+    def test_reaction_counts(self):
+        """Test reactions are counted per post and type after a flush."""
+        for user in self.users:
+            self.react(user, self.post, self.like)
+        self.react(self.users[0], self.post, self.love)
+        self.assertFalse(self.react(self.users[0], self.post, self.love))
+        with self.captureOnCommitCallbacks(execute=True):
+            counters.unreact(self.users[1], self.post, self.like)
+
+        counters.reactions.flush()
+
+        self.assertEqual(
+            counters.reaction_counts([self.post.pk, self.other.pk]),
+            {self.post.pk: {"like": 2, "love": 1}, self.other.pk: {}},
+        )
+
+    def test_shards_summed(self):
+        """Test counts spread over shards add up."""
+        for shard, count in enumerate([3, -1, 2]):
+            PostReactionCount.objects.create(
+                post=self.post, reaction_type=self.like, shard=shard, count=count
+            )
+
+        self.assertEqual(counters.reaction_counts([self.post.pk])[self.post.pk], {"like": 4})
+
+    @override_settings(COUNTERS={"FLUSH_SECONDS": 3600, "MAX_PENDING": 2})
+    def test_flush_when_buffer_full(self):
+        """Test the buffer flushes itself once MAX_PENDING keys are waiting."""
+        self.react(self.users[0], self.post, self.like)
+        self.assertEqual(counters.reactions.pending(), {(self.post.pk, self.like.pk): 1})
+
+        self.react(self.users[0], self.other, self.like)
+
+        self.assertEqual(counters.reactions.pending(), {})
+        self.assertEqual(PostReactionCount.objects.count(), 2)
+
+    def test_deleted_post_dropped_on_flush(self):
+        """Test decrements for a post deleted with its reactions are discarded."""
+        self.react(self.users[0], self.other, self.like)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.delete()
+
+        counters.reactions.flush()
+
+        self.assertEqual(counters.reactions.pending(), {})
+        self.assertFalse(PostReactionCount.objects.exists())
+
+    def test_failed_flush_keeps_deltas(self):
+        """Test deltas survive a flush that fails."""
+
+        def fail(deltas):
+            raise RuntimeError
+
+        buffer = counters.CounterBuffer(fail)
+        buffer.add("key", 2)
+
+        with self.assertRaises(RuntimeError):
+            buffer.flush()
+
+        self.assertEqual(buffer.pending(), {"key": 2})
+
+    @override_settings(COUNTERS={"MAX_PENDING": 1})
+    def test_failed_flush_logged_in_request_path(self):
+        """Test a buffer flushed by add logs a failed write instead of raising it."""
+
+        def fail(deltas):
+            raise RuntimeError
+
+        buffer = counters.CounterBuffer(fail)
+
+        with self.assertLogs("post.counters", level="ERROR"):
+            buffer.add("key", 2)
+
+        self.assertEqual(buffer.pending(), {"key": 2})
+
+    @override_settings(COUNTERS={"FLUSH_SECONDS": 0.01})
+    def test_flusher_writes_quiet_buffers(self):
+        """Test the flusher thread writes deltas out without further adds."""
+        written = threading.Event()
+        buffer = counters.CounterBuffer(lambda deltas: written.set())
+        flusher = counters.Flusher(buffer)
+        flusher.start()
+        buffer.add("key")
+        try:
+            self.assertTrue(written.wait(5))
+        finally:
+            flusher.stop()
+
+        self.assertEqual(buffer.pending(), {})
+
+    def test_recount_reactions(self):
+        """Test counts are rebuilt from the reaction rows."""
+        Reaction.objects.create(user=self.users[0], post=self.post, reaction_type=self.like)
+        Reaction.objects.create(user=self.users[1], post=self.post, reaction_type=self.like)
+        PostReactionCount.objects.create(
+            post=self.post, reaction_type=self.like, shard=2, count=7
+        )
+
+        call_command("recount_reactions", stdout=io.StringIO())
+
+        self.assertEqual(counters.reaction_counts([self.post.pk])[self.post.pk], {"like": 2})
@@ -0,0 +1,131 @@
+"""
+Tests for the post list and detail endpoints.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.constants.mock_data import mock_user
+from post import counters
+from post.models import EXCERPT_WORDS, Post, Tag
+
+LIST_URL = reverse("post:list")
+
+
+def detail_url(post):
+    return reverse("post:detail", args=[post.slug])
+
+
+class PostApiTests(TestCase):
+    """Tests for listing and reading posts."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author = get_user_model().objects.create_user(**mock_user(salt="1"))
+        self.tags = [Tag.objects.create(name=name) for name in ("python", "django")]
+
+    def tearDown(self):
+        counters.flush_all()
+
+    def create_post(self, title="Sample post", content="Sample content.", **params):
+        # Helper function to create a published, tagged post.
+        params.setdefault("is_published", True)
+        post = Post.objects.create(author=self.author, title=title, content=content, **params)
+        post.tags.add(*self.tags)
+        return post
+
+    def test_excerpt_generated_on_save(self):
+        """Test a post without an excerpt gets one from its content, once."""
+        post = self.create_post(content="<p>" + "word " * 80 + "</p>")
+
+        self.assertEqual(len(post.excerpt.split()), EXCERPT_WORDS)
+        self.assertNotIn("<p>", post.excerpt)
+
+        custom = self.create_post(excerpt="Hand written.")
+        self.assertEqual(custom.excerpt, "Hand written.")
+
+        post.excerpt = ""
+        post.content = "Rewritten body."
+        post.save(update_fields=["content"])
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, "Rewritten body.")
+
+    def test_excerpt_follows_content_edits(self):
+        """Test generated excerpts are regenerated on edits and written ones are kept."""
+        post = self.create_post(content="First draft.")
+        custom = self.create_post(content="First draft.", excerpt="Hand written.")
+
+        for edited in (Post.objects.get(pk=post.pk), Post.objects.get(pk=custom.pk)):
+            edited.content = "Second draft."
+            edited.save()
+
+        post.refresh_from_db()
+        custom.refresh_from_db()
+        self.assertEqual(post.excerpt, "Second draft.")
+        self.assertEqual(custom.excerpt, "Hand written.")
+
+    def test_list_skips_content(self):
+        """Test lists serialize excerpts and never select the content column."""
+        self.create_post(content="Long body " * 100)
+        self.create_post(is_published=False)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        [post] = res.data["results"]
+        self.assertNotIn("content", post)
+        self.assertEqual(post["tags"], ["python", "django"])
+        self.assertEqual(post["author"]["username"], self.author.username)
+        column = connection.ops.quote_name("content")
+        self.assertFalse([q for q in queries.captured_queries if column in q["sql"]])
+
+    def test_list_queries_constant(self):
+        """Test authors and tags are loaded in batches, not per post."""
+        self.create_post()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(LIST_URL)
+        one = len(queries)
+        for n in range(5):
+            self.create_post(title=f"Post {n}")
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(LIST_URL)
+
+        self.assertEqual(len(res.data["results"]), 6)
+        self.assertEqual(len(queries), one)
+
+    def test_list_search(self):
+        """Test the q parameter returns the matching posts."""
+        match = self.create_post(title="Scaling databases")
+        self.create_post(title="Gardening tips")
+
+        res = self.client.get(LIST_URL, {"q": "databases"})
+
+        self.assertEqual([post["id"] for post in res.data["results"]], [match.id])
+
+    def test_detail_has_content_and_counts_view(self):
+        """Test the detail endpoint returns the full content and records the view."""
+        post = self.create_post(content="Full body.")
+
+        res = self.client.get(detail_url(post))
+        counters.views.flush()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["content"], "Full body.")
+        self.assertEqual(res.data["reactions"], {})
+        post.refresh_from_db()
+        self.assertEqual(post.views, 1)
+
+    def test_detail_of_draft_not_found(self):
+        """Test unpublished posts are not served."""
+        post = self.create_post(is_published=False)
+
+        res = self.client.get(detail_url(post))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,22 @@
+"""
+Tests for the post search index.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from post.models import Post
+from post.search import post_index
+
+
+class PostSearchTests(TestCase):
+    """Tests for searching posts."""
+
+    def test_search_posts_with_stemming(self):
+        """Test posts match on stemmed words, title matches first."""
+        author = get_user_model().objects.create_user(email="a@example.com", username="a")
+        body = Post.objects.create(author=author, title="Notes", content="Running a database")
+        title = Post.objects.create(author=author, title="Databases", content="...")
+
+        results = list(post_index.search("database").order_by("-rank", "-id"))
+
+        self.assertEqual(results, [title, body])
@@ -0,0 +1,138 @@
+"""
+Tests for tag usage counts, popularity and the trending ranking.
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.constants.mock_data import mock_user
+from post.models import Post, Tag
+from post.tags import compute_popularity
+
+TRENDING_URL = reverse("post:trending-tags")
+
+
+class TagTests(TestCase):
+    """Tests for tag counters and rankings."""
+
+    def setUp(self):
+        self.author = get_user_model().objects.create_user(**mock_user(salt="1"))
+        self.python, self.django, self.git = (
+            Tag.objects.create(name=name) for name in ("python", "django", "git")
+        )
+
+    def create_post(self, *tags, published_at=None):
+        # Helper function to create a published post with tags.
+        post = Post.objects.create(
+            author=self.author,
+            title="Sample post",
+            content="Sample content.",
+            is_published=True,
+            published_at=published_at,
+        )
+        post.tags.add(*tags)
+        return post
+
+    def usage(self):
+        # Helper function to read the usage count of every tag.
+        return dict(Tag.objects.values_list("name", "usage_count"))
+
+    def test_usage_counted_incrementally(self):
+        """Test adding, removing and clearing tags moves the usage counts."""
+        post = self.create_post(self.python, self.django)
+        self.create_post(self.python)
+        post.tags.add(self.python)  # Already there: no change.
+        self.assertEqual(self.usage(), {"python": 2, "django": 1, "git": 0})
+
+        post.tags.remove(self.django)
+        post.tags.set([self.git])
+        self.assertEqual(self.usage(), {"python": 1, "django": 0, "git": 1})
+
+        post.tags.clear()
+        self.assertEqual(self.usage(), {"python": 1, "django": 0, "git": 0})
+
+    def test_removing_absent_tag_keeps_usage(self):
+        """Test removing tags a post does not have leaves the counts alone."""
+        self.create_post(self.git)
+        post = self.create_post(self.python)
+
+        post.tags.remove(self.git)
+        self.git.posts.remove(post)
+
+        self.assertEqual(self.usage(), {"python": 1, "django": 0, "git": 1})
+
+    def test_save_keeps_stats(self):
+        """Test saving a tag loaded before its posts were tagged keeps its stats."""
+        self.create_post(self.python)
+        compute_popularity()
+
+        self.python.description = "The language."
+        self.python.save()
+
+        self.python.refresh_from_db()
+        self.assertEqual(self.python.description, "The language.")
+        self.assertEqual(self.python.usage_count, 1)
+        self.assertEqual(self.python.trending_rank, 1)
+
+    def test_usage_counted_from_tag_side(self):
+        """Test tagging posts through the reverse relation moves the counts."""
+        first, second = self.create_post(), self.create_post()
+
+        self.git.posts.add(first, second)
+        self.assertEqual(self.usage()["git"], 2)
+
+        self.git.posts.clear()
+        self.assertEqual(self.usage()["git"], 0)
+
+    def test_deleting_post_releases_tags(self):
+        """Test a deleted post no longer counts toward its tags."""
+        post = self.create_post(self.python, self.git)
+
+        post.delete()
+
+        self.assertEqual(self.usage(), {"python": 0, "django": 0, "git": 0})
+
+    def test_popularity_decays(self):
+        """Test recent uses outweigh older ones and the window drops stale ones."""
+        now = timezone.now()
+        self.create_post(self.python, published_at=now - timedelta(hours=1))
+        self.create_post(self.django, published_at=now - timedelta(days=2))
+        self.create_post(self.django, published_at=now - timedelta(days=2))
+        self.create_post(self.git, published_at=now - timedelta(days=30))
+
+        ranked = compute_popularity(now)
+
+        self.assertEqual(ranked, [self.python.pk, self.django.pk])
+        scores = dict(Tag.objects.values_list("name", "popularity_score"))
+        self.assertGreater(scores["python"], scores["django"])
+        self.assertAlmostEqual(scores["django"], 0.5, delta=0.05)
+        self.assertEqual(scores["git"], 0)
+
+    def test_trending_endpoint(self):
+        """Test the trending endpoint lists the ranked tags in order."""
+        now = timezone.now()
+        self.create_post(self.git, self.django, published_at=now)
+        self.create_post(self.git, published_at=now)
+        compute_popularity(now)
+
+        res = APIClient().get(TRENDING_URL, {"limit": 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([tag["name"] for tag in res.data], ["git"])
+        self.assertEqual(res.data[0]["trending_rank"], 1)
+
+    def test_ranking_replaced(self):
+        """Test tags that stop trending lose their rank."""
+        now = timezone.now()
+        self.create_post(self.git, published_at=now)
+        compute_popularity(now)
+
+        compute_popularity(now + timedelta(days=8))
+
+        self.assertFalse(Tag.objects.filter(trending_rank__isnull=False).exists())
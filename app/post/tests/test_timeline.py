@@ -0,0 +1,127 @@
+"""
+Tests for the home timeline engine.
+"""
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+
+from post.models import Post, TimelineEntry
+from post.timeline import get_store, read_timeline
+from user.models import UserFollow
+from core.constants.mock_data import mock_user
+
+
+def create_user(**params):
+    # Helper function to create a user.
+    return get_user_model().objects.create_user(**params)
+
+
+def create_post(author, **params):
+    # Helper function to create a post.
+    defaults = {"title": "Sample post", "content": "Sample content."}
+    defaults.update(params)
+    return Post.objects.create(author=author, **defaults)
+
+
+class TimelineTests(TestCase):
+    """Tests for fan-out-on-write timelines."""
+
+    def setUp(self):
+        """Set up an author with two followers."""
+        self.author = create_user(**mock_user(salt="1"))
+        self.reader = create_user(**mock_user(salt="2"))
+        self.other = create_user(**mock_user(salt="3"))
+        UserFollow.add_follower(self.reader, self.author)
+        UserFollow.add_follower(self.other, self.author)
+        self.author.refresh_from_db()
+
+    def publish(self, post):
+        # Helper function to publish a post and run the fan-out.
+        with self.captureOnCommitCallbacks(execute=True):
+            post.publish()
+
+    def test_publish_fans_out_to_followers(self):
+        """Test publishing a post pushes it into every follower's timeline."""
+        post = create_post(self.author)
+        self.assertFalse(TimelineEntry.objects.exists())
+
+        self.publish(post)
+
+        owners = set(TimelineEntry.objects.values_list("owner_id", flat=True))
+        self.assertEqual(owners, {self.author.id, self.reader.id, self.other.id})
+
+    def test_read_timeline_pages(self):
+        """Test reading a timeline newest first with a cursor."""
+        posts = [create_post(self.author, title=f"Post {i}") for i in range(3)]
+        for post in posts:
+            self.publish(post)
+
+        with self.assertNumQueries(2):
+            page, cursor = read_timeline(self.reader, limit=2)
+
+        self.assertEqual(page, [posts[2].id, posts[1].id])
+        page, cursor = read_timeline(self.reader, cursor, limit=2)
+        self.assertEqual(page, [posts[0].id])
+        self.assertIsNone(cursor)
+
+    def test_unpublish_removes_from_timelines(self):
+        """Test unpublishing a post removes it from timelines."""
+        post = create_post(self.author)
+        self.publish(post)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.unpublish()
+
+        self.assertEqual(read_timeline(self.reader), ([], None))
+
+    def test_edit_leaves_timelines(self):
+        """Test saving a published post without changing its state does not fan it out again."""
+        post = create_post(self.author)
+        self.publish(post)
+        post = Post.objects.get(pk=post.pk)
+        post.title = "Edited"
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            post.save()
+
+        self.assertEqual(callbacks, [])
+
+    @override_settings(TIMELINE={"CELEBRITY_THRESHOLD": 2})
+    def test_celebrity_posts_fan_out_on_read(self):
+        """Test posts by authors above the threshold are merged on read."""
+        regular = create_user(**mock_user(salt="4"))
+        UserFollow.add_follower(self.reader, regular)
+        celebrity_post = create_post(self.author, title="Celebrity")
+        regular_post = create_post(regular, title="Regular")
+        self.publish(celebrity_post)
+        self.publish(regular_post)
+
+        self.assertFalse(
+            TimelineEntry.objects.filter(owner=self.reader, post=celebrity_post).exists()
+        )
+        page, _ = read_timeline(self.reader)
+        self.assertEqual(page, [regular_post.id, celebrity_post.id])
+
+
+@override_settings(TIMELINE={"STORE": "post.timeline.InMemoryTimelineStore", "MAX_LENGTH": 2})
+class InMemoryTimelineTests(TestCase):
+    """Tests for the in-process timeline store."""
+
+    def setUp(self):
+        self.author = create_user(**mock_user(salt="1"))
+        self.reader = create_user(**mock_user(salt="2"))
+        UserFollow.add_follower(self.reader, self.author)
+        self.author.refresh_from_db()
+
+    def tearDown(self):
+        get_store().clear()
+
+    def test_timeline_is_capped(self):
+        """Test the in-memory timeline keeps only the newest entries."""
+        posts = [create_post(self.author, title=f"Post {i}") for i in range(3)]
+        for post in posts:
+            with self.captureOnCommitCallbacks(execute=True):
+                post.publish()
+
+        self.assertFalse(TimelineEntry.objects.exists())
+        page, _ = read_timeline(self.reader, limit=5)
+        self.assertEqual(page, [posts[2].id, posts[1].id])
@@ -0,0 +1,189 @@
+"""
+Home timeline engine.
+
+Published posts are pushed into the materialized timeline of every follower
+of their author (fan-out-on-write). Authors with more followers than
+CELEBRITY_THRESHOLD are skipped on write and merged in when a timeline is
+read (fan-out-on-read), so one post never turns into millions of writes.
+"""
+import bisect
+import heapq
+import threading
+from functools import lru_cache
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from post.models import Post, TimelineEntry
+from user.models import UserFollow
+
+
+DEFAULTS = {
+    "STORE": "post.timeline.DatabaseTimelineStore",
+    "CELEBRITY_THRESHOLD": 10000,
+    "BATCH_SIZE": 1000,
+    "PAGE_SIZE": 50,
+    "MAX_LENGTH": 800,
+}
+
+
+def timeline_setting(name):
+    """Return a TIMELINE setting, falling back to the default."""
+    return getattr(settings, "TIMELINE", {}).get(name, DEFAULTS[name])
+
+
+def chunked(iterable, size):
+    """Yield lists of at most size items from iterable."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class DatabaseTimelineStore:
+    """Store timelines as TimelineEntry rows, read with an index range scan."""
+
+    def push(self, owner_ids, entry):
+        """Add an entry of (published_at, post_id, author_id) to each timeline."""
+        published_at, post_id, author_id = entry
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(
+                    owner_id=owner_id,
+                    post_id=post_id,
+                    author_id=author_id,
+                    published_at=published_at,
+                )
+                for owner_id in owner_ids
+            ],
+            batch_size=timeline_setting("BATCH_SIZE"),
+            ignore_conflicts=True,
+        )
+
+    def remove_post(self, post_id):
+        """Remove a post from every timeline."""
+        TimelineEntry.objects.filter(post_id=post_id).delete()
+
+    def read(self, owner_id, before=None, limit=None):
+        """Return the newest entries of a timeline older than the before cursor."""
+        rows = TimelineEntry.objects.filter(owner_id=owner_id)
+        if before is not None:
+            published_at, post_id = before
+            rows = rows.filter(
+                Q(published_at__lt=published_at)
+                | Q(published_at=published_at, post_id__lt=post_id)
+            )
+        rows = rows.order_by("-published_at", "-post_id")
+        return list(rows.values_list("published_at", "post_id", "author_id")[:limit])
+
+
+class InMemoryTimelineStore:
+    """
+    Store timelines in process memory, capped at MAX_LENGTH entries each.
+    Meant for local development and tests, not for multi-process deployments.
+    """
+
+    def __init__(self):
+        self._timelines = {}
+        self._lock = threading.Lock()
+
+    def push(self, owner_ids, entry):
+        """Add an entry of (published_at, post_id, author_id) to each timeline."""
+        max_length = timeline_setting("MAX_LENGTH")
+        with self._lock:
+            for owner_id in owner_ids:
+                timeline = self._timelines.setdefault(owner_id, [])
+                index = bisect.bisect_left(timeline, entry)
+                if index < len(timeline) and timeline[index][1] == entry[1]:
+                    continue
+                timeline.insert(index, entry)
+                del timeline[:-max_length]
+
+    def remove_post(self, post_id):
+        """Remove a post from every timeline."""
+        with self._lock:
+            for timeline in self._timelines.values():
+                timeline[:] = [entry for entry in timeline if entry[1] != post_id]
+
+    def read(self, owner_id, before=None, limit=None):
+        """Return the newest entries of a timeline older than the before cursor."""
+        with self._lock:
+            timeline = self._timelines.get(owner_id, [])
+            end = len(timeline)
+            if before is not None:
+                end = bisect.bisect_left(timeline, tuple(before))
+            start = 0 if limit is None else max(end - limit, 0)
+            return timeline[start:end][::-1]
+
+    def clear(self):
+        """Drop every timeline."""
+        with self._lock:
+            self._timelines.clear()
+
+
+@lru_cache(maxsize=None)
+def _load_store(path):
+    return import_string(path)()
+
+
+def get_store():
+    """Return the configured timeline store."""
+    return _load_store(timeline_setting("STORE"))
+
+
+def is_celebrity(user):
+    """Check if a user has too many followers to fan out on write."""
+    return user.followers_count >= timeline_setting("CELEBRITY_THRESHOLD")
+
+
+def fan_out(post):
+    """Push a published post into the author's and their followers' timelines."""
+    store = get_store()
+    entry = (post.published_at, post.pk, post.author_id)
+    store.push([post.author_id], entry)
+    if is_celebrity(post.author):
+        return
+
+    batch_size = timeline_setting("BATCH_SIZE")
+    follower_ids = (
+        UserFollow.objects.filter(following_id=post.author_id)
+        .values_list("follower_id", flat=True)
+        .iterator(chunk_size=batch_size)
+    )
+    for owner_ids in chunked(follower_ids, batch_size):
+        store.push(owner_ids, entry)
+
+
+def read_timeline(user, before=None, limit=None):
+    """
+    Read a page of a user's home timeline, newest first.
+    Returns the post ids and the cursor of the next page (None on the last page).
+    """
+    limit = limit or timeline_setting("PAGE_SIZE")
+    pushed = get_store().read(user.pk, before, limit)
+
+    celebrities = UserFollow.get_following(user).filter(
+        followers_count__gte=timeline_setting("CELEBRITY_THRESHOLD")
+    )
+    pulled = Post.objects.filter(author__in=celebrities, is_published=True)
+    if before is not None:
+        published_at, post_id = before
+        pulled = pulled.filter(
+            Q(published_at__lt=published_at) | Q(published_at=published_at, id__lt=post_id)
+        )
+    pulled = pulled.order_by("-published_at", "-id").values_list(
+        "published_at", "id", "author_id"
+    )[:limit]
+
+    entries, seen = [], set()
+    for entry in heapq.merge(pushed, pulled, reverse=True):
+        if entry[1] in seen:
+            continue
+        seen.add(entry[1])
+        entries.append(entry)
+        if len(entries) == limit:
+            break
+
+    next_cursor = (entries[-1][0], entries[-1][1]) if len(entries) == limit else None
+    return [entry[1] for entry in entries], next_cursor
@@ -0,0 +1,16 @@
+"""
+URL mappings for the post API.
+"""
+from django.urls import path
+
+from post.views import CommentThreadView, PostDetailView, PostListView, TrendingTagsView
+
+
+app_name = "post"
+
+urlpatterns = [
+    path("", PostListView.as_view(), name="list"),
+    path("tags/trending/", TrendingTagsView.as_view(), name="trending-tags"),
+    path("<slug:slug>/", PostDetailView.as_view(), name="detail"),
+    path("<slug:slug>/comments/", CommentThreadView.as_view(), name="comments"),
+]
@@ -0,0 +1,154 @@
+"""
+Views for the post API.
+"""
+from collections import OrderedDict
+
+from django.db.models import Prefetch
+from django.shortcuts import get_object_or_404
+from rest_framework.exceptions import NotFound
+from rest_framework.generics import ListAPIView, ListCreateAPIView, RetrieveAPIView
+from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from post.comments import build_tree, load_replies, load_subtrees, thread_queryset
+from post.counters import record_view
+from post.models import Comment, Post, Tag
+from post.search import post_index
+from post.serializers import (
+    POST_LIST_FIELDS,
+    CommentSerializer,
+    PostDetailSerializer,
+    PostListSerializer,
+    TagSerializer,
+)
+from post.tags import tag_setting, trending
+
+
+def published_posts():
+    """Return published posts with their authors joined and tags prefetched in one batch."""
+    return (
+        Post.objects.filter(is_published=True)
+        .select_related("author")
+        .prefetch_related(Prefetch("tags", queryset=Tag.objects.only("id", "name")))
+    )
+
+
+class PostListView(ListAPIView):
+    """List published posts, newest first, or the best matches of the q query parameter."""
+
+    serializer_class = PostListSerializer
+
+    @property
+    def ordering(self):
+        return ("-rank", "-id") if self.request.query_params.get("q") else ("-published_at", "-id")
+
+    def get_queryset(self):
+        """Return the published posts, without their content."""
+        posts = published_posts().only(*POST_LIST_FIELDS)
+        query = self.request.query_params.get("q")
+        return post_index.search(query, posts) if query else posts
+
+
+class PostDetailView(RetrieveAPIView):
+    """Return a published post with its full content, counting the view."""
+
+    serializer_class = PostDetailSerializer
+    lookup_field = "slug"
+
+    def get_queryset(self):
+        return published_posts()
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        record_view(response.data["id"])
+        return response
+
+
+class CommentThreadView(ListCreateAPIView):
+    """
+    List the comment threads of a post (GET) or add a comment (POST).
+    Pages hold top-level comments with their replies nested, in two queries.
+    Comments with replies left out link to them with the replies and after
+    query parameters: the comment and the path to continue after.
+    """
+
+    serializer_class = CommentSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    ordering = ("path",)
+
+    def get_post(self):
+        if not hasattr(self, "_post"):
+            self._post = get_object_or_404(
+                Post.objects.only("id"), slug=self.kwargs["slug"], is_published=True
+            )
+        return self._post
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), "post": self.get_post()}
+
+    def get_queryset(self):
+        """Return the top-level comments of the post in the URL."""
+        return thread_queryset().filter(post=self.get_post(), depth=0)
+
+    def list(self, request, *args, **kwargs):
+        """Return a page of top-level comments, or of the replies under one, nested."""
+        if "replies" in request.query_params:
+            return self.list_replies(request)
+        roots = self.paginate_queryset(self.get_queryset())
+        comments, more = load_subtrees(roots)
+        return self.get_paginated_response(build_tree(comments, self.more_links(more)))
+
+    def list_replies(self, request):
+        """Return the next replies under the comment in the replies query parameter."""
+        try:
+            parent = get_object_or_404(
+                Comment.objects.only("id", "post", "path", "depth"),
+                pk=int(request.query_params["replies"]),
+                post=self.get_post(),
+            )
+        except ValueError:
+            raise NotFound(self.paginator.invalid_cursor_message)
+        after = request.query_params.get("after", parent.path)
+        if not after.startswith(parent.path):
+            raise NotFound(self.paginator.invalid_cursor_message)
+        replies, more = load_replies(parent, after)
+        after = more.pop(parent.id, None)
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.replies_link(parent.id, after) if after else None),
+                    ("previous", None),
+                    ("results", build_tree(replies, self.more_links(more))),
+                ]
+            )
+        )
+
+    def replies_link(self, comment_id, after):
+        """Return the URL of the replies under a comment after a path."""
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.paginator.cursor_query_param
+        )
+        return replace_query_param(replace_query_param(url, "replies", comment_id), "after", after)
+
+    def more_links(self, more):
+        """Turn {comment id: path to continue after} into {comment id: URL}."""
+        return {comment_id: self.replies_link(comment_id, after) for comment_id, after in more.items()}
+
+    def perform_create(self, serializer):
+        serializer.save(author_id=self.request.user.pk, post=self.get_post())
+
+
+class TrendingTagsView(ListAPIView):
+    """List the trending tags from the ranking rank_tags precomputes."""
+
+    serializer_class = TagSerializer
+    pagination_class = None
+
+    def get_queryset(self):
+        """Return the top tags, up to the limit query parameter."""
+        try:
+            limit = int(self.request.query_params.get("limit", tag_setting("TRENDING")))
+        except ValueError:
+            limit = tag_setting("TRENDING")
+        return trending(max(limit, 1))
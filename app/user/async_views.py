@@ -0,0 +1,79 @@
+"""
+Async-native views for the user API.
+
+These mirror CreateUserView and ManageUserView for ASGI deployments: the
+event loop only leaves for the ORM calls, cache reads and writes and
+password hashing, so slow clients do not each hold a worker thread.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.http import JsonResponse
+from django.utils.translation import gettext as _
+from rest_framework.exceptions import AuthenticationFailed
+
+from auth.authentication import StatelessJWTAuthentication
+from auth.hashing import HashingPoolFull, amake_password
+from core.aio import (
+    aget,
+    asave,
+    async_api_view,
+    error_response,
+    parse_json,
+    throttled_response,
+)
+from core.throttling import acheck_rates
+from user.cache import acached_profile, aget_profile
+from user.serializers import UserSerializer
+
+
+@async_api_view("POST")
+async def create_user(request):
+    """Create a new user in the system."""
+    wait = await acheck_rates(request, "signup")
+    if wait:
+        return throttled_response(wait)
+    data = parse_json(request)
+    if data is None:
+        return error_response(_("Malformed request body."), 400)
+    serializer = UserSerializer(data=data)
+    if not await sync_to_async(serializer.is_valid)():
+        return JsonResponse(serializer.errors, status=400)
+
+    UserModel = get_user_model()
+    fields = dict(serializer.validated_data)
+    password = fields.pop("password")
+    email = UserModel.objects.normalize_email(fields.pop("email"))
+    user = UserModel(email=email, **fields)
+    try:
+        user.password = await amake_password(password)
+        await asave(user)
+    except HashingPoolFull as exc:
+        return error_response(exc.detail, exc.status_code, headers={"Retry-After": "1"})
+    except IntegrityError:
+        return error_response(_("A user with that username or email already exists."), 400)
+
+    return JsonResponse(UserSerializer(user).data, status=201)
+
+
+@async_api_view("GET")
+async def manage_user(request):
+    """Return the profile of the authenticated user."""
+    authentication = StatelessJWTAuthentication()
+    challenge = {"WWW-Authenticate": authentication.authenticate_header(request)}
+    try:
+        result = await authentication.aauthenticate(request)
+    except AuthenticationFailed as exc:
+        detail = exc.detail if isinstance(exc.detail, dict) else {"detail": exc.detail}
+        return JsonResponse(detail, status=exc.status_code, headers=challenge)
+    if result is None:
+        return error_response(
+            _("Authentication credentials were not provided."), 401, headers=challenge
+        )
+
+    token_user, _token = result
+    data = await acached_profile(token_user.pk)
+    if data is None:
+        user = await aget(get_user_model().objects, pk=token_user.pk)
+        data = await aget_profile(user, lambda user: UserSerializer(user).data)
+    return JsonResponse(data)
@@ -0,0 +1,268 @@
+"""
+In-process prefix index for username and email autocomplete.
+
+Each process keeps a sorted array of lowercased keys next to the entries
+they point at. A prefix is a bisect range of that array, so a lookup is
+two binary searches plus a top-k over the range; top-k lists of short,
+crowded prefixes are cached until the next change. The index holds the
+MAX_ENTRIES most followed users and is kept current by signals. A
+background thread, started with the server (see config/wsgi.py), builds
+it from a streaming query at startup and again every REFRESH_SECONDS to
+pick up follower counts changed by bulk updates; each build is swapped in
+whole, so lookups never wait for one. Without the thread (tests, shells)
+the first lookup builds the index.
+"""
+import heapq
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+
+
+DEFAULTS = {
+    "MAX_ENTRIES": 200000,
+    "LIMIT": 10,
+    "MAX_LIMIT": 50,
+    "REFRESH_SECONDS": 600,
+    # Prefix ranges wider than this are answered from the top-k cache.
+    "SCAN_LIMIT": 256,
+}
+
+# Saving any of these fields updates the user's entries.
+AUTOCOMPLETE_FIELDS = {"username", "email", "slug", "is_active", "followers_count"}
+
+# Sorts after any character a key can contain, to close a prefix range.
+HIGHEST = "\U0010ffff"
+
+
+logger = logging.getLogger(__name__)
+
+
+def autocomplete_setting(name):
+    """Return an AUTOCOMPLETE setting, falling back to the default."""
+    return getattr(settings, "AUTOCOMPLETE", {}).get(name, DEFAULTS[name])
+
+
+class PrefixIndex:
+    """
+    Sorted keys with their entries, for top-k prefix lookups.
+    Entries are (-weight, username, slug, id) tuples, so the smallest sort first.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._entries = []
+        # Every entry in weight order, for last().
+        self._ranked = []
+        self._key_of = {}
+        self._top = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, entry_id):
+        return entry_id in self._key_of
+
+    def load(self, items):
+        """Replace the contents with (key, entry) pairs."""
+        items = sorted(items)
+        with self._lock:
+            self._keys = [key for key, _ in items]
+            self._entries = [entry for _, entry in items]
+            self._ranked = sorted(self._entries)
+            self._key_of = {entry[3]: key for key, entry in items}
+            self._top = {}
+
+    def add(self, key, entry):
+        """Insert or replace the entry of an id."""
+        with self._lock:
+            self._discard(entry[3])
+            lo = bisect_left(self._keys, key)
+            hi = bisect_left(self._keys, key + HIGHEST, lo)
+            index = bisect_left(self._entries, entry, lo, hi)
+            self._keys.insert(index, key)
+            self._entries.insert(index, entry)
+            insort(self._ranked, entry)
+            self._key_of[entry[3]] = key
+            self._top = {}
+
+    def remove(self, entry_id):
+        """Drop the entry of an id, if present."""
+        with self._lock:
+            if self._discard(entry_id):
+                self._top = {}
+
+    def _discard(self, entry_id):
+        key = self._key_of.pop(entry_id, None)
+        if key is None:
+            return False
+        lo, hi = bisect_left(self._keys, key), bisect_left(self._keys, key + HIGHEST)
+        for index in range(lo, hi):
+            if self._keys[index] == key and self._entries[index][3] == entry_id:
+                del self._keys[index]
+                entry = self._entries.pop(index)
+                del self._ranked[bisect_left(self._ranked, entry)]
+                return True
+        return False
+
+    def last(self):
+        """Return the entry that sorts last (the least followed), or None."""
+        with self._lock:
+            return self._ranked[-1] if self._ranked else None
+
+    def top(self, prefix, limit):
+        """Return the limit heaviest entries whose key starts with prefix."""
+        with self._lock:
+            lo = bisect_left(self._keys, prefix)
+            hi = bisect_left(self._keys, prefix + HIGHEST, lo)
+            if hi - lo <= autocomplete_setting("SCAN_LIMIT"):
+                return heapq.nsmallest(limit, self._entries[lo:hi])
+            cached = self._top.get(prefix)
+            if cached is None or len(cached) < limit:
+                size = max(limit, autocomplete_setting("LIMIT"))
+                cached = self._top[prefix] = heapq.nsmallest(size, self._entries[lo:hi])
+            return cached[:limit]
+
+
+class UserAutocomplete:
+    """Username and email prefix indexes over the most followed active users."""
+
+    def __init__(self):
+        self.usernames = PrefixIndex()
+        self.emails = PrefixIndex()
+        self.built_at = None
+        self._build_lock = threading.RLock()
+        # Guards swapping in a build against signal updates; see build().
+        self._lock = threading.RLock()
+        self._changes = None
+        self._refresher_pid = None
+
+    @staticmethod
+    def entry(user):
+        return (-user.followers_count, user.username, user.slug, str(user.pk))
+
+    def build(self):
+        """
+        Load the most followed active users with one streaming query into new
+        indexes, and swap them in. Updates that arrive while loading are
+        replayed on the new indexes first, so none are lost.
+        """
+        with self._build_lock:
+            with self._lock:
+                self._changes = []
+            users = (
+                get_user_model()
+                .objects.filter(is_active=True)
+                .order_by("-followers_count", "username")
+                .only("id", "username", "slug", "email", "followers_count")
+            )[: autocomplete_setting("MAX_ENTRIES")]
+            usernames, emails = PrefixIndex(), PrefixIndex()
+            username_items, email_items = [], []
+            try:
+                for user in users.iterator(chunk_size=5000):
+                    entry = self.entry(user)
+                    username_items.append((user.username.lower(), entry))
+                    email_items.append((user.email.lower(), entry))
+                usernames.load(username_items)
+                emails.load(email_items)
+            except BaseException:
+                with self._lock:
+                    self._changes = None
+                raise
+            with self._lock:
+                changes, self._changes = self._changes, None
+                for change, arg in changes:
+                    change(usernames, emails, arg)
+                self.usernames, self.emails = usernames, emails
+                self.built_at = time.monotonic()
+
+    def ensure_built(self):
+        """Build the index on first use, unless the refresher has built it already."""
+        if self._refresher_pid is not None and self._refresher_pid != os.getpid():
+            # Forked after the refresher started: it did not come along.
+            self.start()
+        if self.built_at is None:
+            with self._build_lock:
+                if self.built_at is None:
+                    self.build()
+
+    def start(self):
+        """Start a daemon thread that builds the index now and every REFRESH_SECONDS."""
+        self._refresher_pid = os.getpid()
+        threading.Thread(
+            target=self._refresh, name="user-autocomplete", daemon=True
+        ).start()
+
+    def _refresh(self):
+        while True:
+            try:
+                self.build()
+            except Exception:
+                logger.exception("Building the autocomplete index failed.")
+            finally:
+                connections.close_all()
+            time.sleep(autocomplete_setting("REFRESH_SECONDS"))
+
+    def update(self, user):
+        """Index a saved user, keeping the index within MAX_ENTRIES."""
+        with self._lock:
+            if self._changes is not None:
+                self._changes.append((self._update, user))
+            if self.built_at is not None:
+                self._update(self.usernames, self.emails, user)
+
+    @staticmethod
+    def _update(usernames, emails, user):
+        if not user.is_active:
+            UserAutocomplete._remove(usernames, emails, user.pk)
+            return
+        entry = UserAutocomplete.entry(user)
+        full = len(usernames) >= autocomplete_setting("MAX_ENTRIES")
+        if full and str(user.pk) not in usernames:
+            last = usernames.last()
+            if entry >= last:
+                return
+            UserAutocomplete._remove(usernames, emails, last[3])
+        usernames.add(user.username.lower(), entry)
+        emails.add(user.email.lower(), entry)
+
+    def reset(self):
+        """Forget the index; the next lookup builds it again."""
+        self.built_at = None
+
+    def remove(self, user_id):
+        """Drop a user from the index."""
+        with self._lock:
+            if self._changes is not None:
+                self._changes.append((self._remove, user_id))
+            self._remove(self.usernames, self.emails, user_id)
+
+    @staticmethod
+    def _remove(usernames, emails, user_id):
+        usernames.remove(str(user_id))
+        emails.remove(str(user_id))
+
+    def suggest(self, query, limit, include_emails=False):
+        """Return up to limit users whose username (or email) starts with query."""
+        self.ensure_built()
+        prefix = query.strip().lower()
+        if not prefix:
+            return []
+        entries = self.usernames.top(prefix, limit)
+        if include_emails:
+            seen = {entry[3] for entry in entries}
+            extra = [e for e in self.emails.top(prefix, limit) if e[3] not in seen]
+            entries = heapq.nsmallest(limit, entries + extra)
+        return [
+            {"id": user_id, "username": username, "slug": slug, "followers_count": -weight}
+            for weight, username, slug, user_id in entries
+        ]
+
+
+user_autocomplete = UserAutocomplete()
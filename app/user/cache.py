@@ -0,0 +1,111 @@
+"""
+Read-through cache for serialized user profiles.
+
+Entries are keyed by user id plus a per-user version stamp. Invalidating a
+profile swaps the stamp instead of deleting the entry, so a request racing
+an update can never write a stale profile back under the current key. The
+swap waits for the writing transaction to commit; before that, a request
+could still read and cache the old row under the new stamp.
+
+Stamps live in a cache every worker process reads (STAMP_ALIAS), so an
+edit in one process makes the profile stale in all of them, while the
+entries themselves may stay in each process's memory.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+def profile_cache():
+    """Return the cache backend configured for profiles."""
+    return caches[settings.PROFILE_CACHE["ALIAS"]]
+
+
+def stamp_cache():
+    """Return the cache backend holding the version stamps."""
+    return caches[settings.PROFILE_CACHE["STAMP_ALIAS"]]
+
+
+def version_key(user_id):
+    return f"user:profile-version:{user_id}"
+
+
+def profile_key(user_id, stamp):
+    return f"user:profile:{user_id}:{stamp}"
+
+
+def current_stamp(user_id, version):
+    """Return the version stamp of a user's profile, creating one if missing."""
+    cache = stamp_cache()
+    stamp = cache.get(version_key(user_id), version=version)
+    if stamp is None:
+        stamp = uuid.uuid4().hex
+        if not cache.add(version_key(user_id), stamp, version=version):
+            stamp = cache.get(version_key(user_id), stamp, version=version)
+    return stamp
+
+
+async def acurrent_stamp(user_id, version):
+    """Async variant of current_stamp."""
+    cache = stamp_cache()
+    stamp = await cache.aget(version_key(user_id), version=version)
+    if stamp is None:
+        stamp = uuid.uuid4().hex
+        if not await cache.aadd(version_key(user_id), stamp, version=version):
+            stamp = await cache.aget(version_key(user_id), stamp, version=version)
+    return stamp
+
+
+def cached_profile(user_id):
+    """Return the cached profile of a user, or None on a miss."""
+    cache = profile_cache()
+    version = settings.PROFILE_CACHE["VERSION"]
+    stamp = current_stamp(user_id, version)
+    return cache.get(profile_key(user_id, stamp), version=version)
+
+
+def get_profile(user, serialize):
+    """Return the cached profile of a user, serializing and storing it on a miss."""
+    cache = profile_cache()
+    version = settings.PROFILE_CACHE["VERSION"]
+    stamp = current_stamp(user.pk, version)
+
+    data = cache.get(profile_key(user.pk, stamp), version=version)
+    if data is None:
+        data = dict(serialize(user))
+        cache.set(profile_key(user.pk, stamp), data, version=version)
+    return data
+
+
+async def acached_profile(user_id):
+    """Async variant of cached_profile."""
+    version = settings.PROFILE_CACHE["VERSION"]
+    stamp = await acurrent_stamp(user_id, version)
+    return await profile_cache().aget(profile_key(user_id, stamp), version=version)
+
+
+async def aget_profile(user, serialize):
+    """Async variant of get_profile; serialize is called in the event loop."""
+    cache = profile_cache()
+    version = settings.PROFILE_CACHE["VERSION"]
+    stamp = await acurrent_stamp(user.pk, version)
+
+    data = await cache.aget(profile_key(user.pk, stamp), version=version)
+    if data is None:
+        data = dict(serialize(user))
+        await cache.aset(profile_key(user.pk, stamp), data, version=version)
+    return data
+
+
+def invalidate_profiles(*user_ids):
+    """Make the cached profiles of the given users stale once the transaction commits."""
+    if not user_ids:
+        return
+    transaction.on_commit(
+        lambda: stamp_cache().set_many(
+            {version_key(user_id): uuid.uuid4().hex for user_id in user_ids},
+            version=settings.PROFILE_CACHE["VERSION"],
+        )
+    )
@@ -0,0 +1,183 @@
+"""
+Avatar and cover image renditions.
+
+Uploads are decoded and resized on a worker pool, never on the request
+thread. Each rendition is re-encoded without metadata and stored under a
+path derived from its content hash, so CDNs can cache it forever. Worker
+processes are spawned rather than forked, so they do not inherit the
+server's background threads.
+"""
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps, features
+
+
+logger = logging.getLogger(__name__)
+
+RENDITIONS = {
+    "avatar": {"small": (64, 64), "medium": (256, 256)},
+    "cover_image": {"medium": (750, 250), "large": (1500, 500)},
+}
+
+DEFAULTS = {
+    # "process" renders on a process pool, "thread" on a thread pool and
+    # "inline" synchronously in the caller (for tests and scripts).
+    "EXECUTOR": "process",
+    "WORKERS": 2,
+    "FORMAT": "WEBP",
+    "QUALITY": 80,
+}
+
+EXTENSIONS = {"WEBP": "webp", "JPEG": "jpg"}
+
+
+def pipeline_setting(name):
+    """Return an IMAGE_PIPELINE setting, falling back to the default."""
+    return getattr(settings, "IMAGE_PIPELINE", {}).get(name, DEFAULTS[name])
+
+
+def output_format():
+    """Return the rendition format, falling back to JPEG if Pillow lacks WebP."""
+    image_format = pipeline_setting("FORMAT")
+    if image_format == "WEBP" and not features.check("webp"):
+        return "JPEG"
+    return image_format
+
+
+def render(data, sizes, image_format, quality):
+    """
+    Decode an image and return the encoded bytes of each named size.
+    Runs in worker processes, so it must not touch Django.
+    """
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        mode = "RGBA" if image_format == "WEBP" and "A" in image.getbands() else "RGB"
+        image = image.convert(mode)
+        encoded = {}
+        for name, size in sizes.items():
+            rendition = ImageOps.fit(image, size, Image.LANCZOS)
+            buffer = io.BytesIO()
+            # Nothing from the original (EXIF, ICC, XMP) is passed on to the encoder.
+            rendition.save(buffer, format=image_format, quality=quality)
+            encoded[name] = buffer.getvalue()
+    return encoded
+
+
+def store_rendition(data, extension):
+    """Store a rendition and return its name; the storage names it after its content."""
+    return default_storage.save(f"rendition.{extension}", ContentFile(data))
+
+
+def process_image(user_id, field, source, render_fn=render):
+    """Render and store the renditions of a user's image, then record them."""
+    from core.models import Blob
+    from user.cache import invalidate_profiles
+    from user.models import User
+
+    with default_storage.open(source, "rb") as original:
+        data = original.read()
+    image_format = output_format()
+    encoded = render_fn(data, RENDITIONS[field], image_format, pipeline_setting("QUALITY"))
+    paths = {"source": source}
+    for name, rendition in encoded.items():
+        paths[name] = store_rendition(rendition, EXTENSIONS[image_format])
+
+    with transaction.atomic():
+        # Locked, so jobs for the user's other image cannot overwrite this one's result.
+        user = (
+            User.objects.select_for_update()
+            .filter(pk=user_id)
+            .only("image_renditions", field)
+            .first()
+        )
+        if user is None or getattr(user, field).name != source:
+            # The image was replaced or removed while this one was rendering.
+            return
+        previous = user.image_renditions.get(field, {})
+        renditions = {**user.image_renditions, field: paths}
+        User.objects.filter(pk=user_id).update(image_renditions=renditions)
+        Blob.release(*rendition_names({field: previous}))
+        Blob.acquire(*rendition_names({field: paths}))
+    invalidate_profiles(user_id)
+
+
+class ImagePipeline:
+    """
+    Queue of image jobs. One dispatcher thread per worker reads the original
+    and stores the results of a job; the CPU-bound rendering runs on the
+    worker pool, so up to WORKERS images render at once.
+    """
+
+    def __init__(self, executor, workers):
+        self._dispatcher = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="image-pipeline"
+        )
+        if executor == "process":
+            self._workers = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            self._workers = ThreadPoolExecutor(max_workers=workers)
+
+    def submit(self, user_id, field, source):
+        """Queue the renditions of a user's image."""
+        return self._dispatcher.submit(self._process, user_id, field, source)
+
+    def _render(self, *args):
+        return self._workers.submit(render, *args).result()
+
+    def _process(self, user_id, field, source):
+        try:
+            process_image(user_id, field, source, render_fn=self._render)
+        except Exception:
+            logger.exception("Rendering the %s of user %s failed.", field, user_id)
+        finally:
+            connections.close_all()
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def schedule_renditions(user_id, field, source):
+    """Render a user's image off the request thread, or inline if so configured."""
+    global _pipeline
+    executor = pipeline_setting("EXECUTOR")
+    if executor == "inline":
+        return process_image(user_id, field, source)
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = ImagePipeline(executor, pipeline_setting("WORKERS"))
+    return _pipeline.submit(user_id, field, source)
+
+
+def rendition_urls(user):
+    """Return the URLs of a user's renditions, by image field and size."""
+    urls = {}
+    for field, paths in user.image_renditions.items():
+        if getattr(user, field).name != paths.get("source"):
+            continue
+        urls[field] = {
+            name: default_storage.url(path)
+            for name, path in paths.items()
+            if name != "source"
+        }
+    return urls
+
+
+def rendition_names(renditions):
+    """Return the stored names in a mapping of renditions by image field."""
+    return [
+        name
+        for paths in renditions.values()
+        for size, name in paths.items()
+        if size != "source"
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.0.10 on 2026-10-18 01:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_user_follow_counts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-date_joined', '-id'], name='user_user_date_jo_feb775_idx'),
+        ),
+    ]
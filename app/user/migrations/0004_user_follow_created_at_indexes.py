@@ -0,0 +1,46 @@
+# Generated by Django 4.0.10 on 2026-10-18 02:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+import core.db.operations
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built with CREATE INDEX CONCURRENTLY on PostgreSQL, which
+    # cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('user', '0003_user_date_joined_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userfollow',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        core.db.operations.AddIndexConcurrentlyIfSupported(
+            model_name='userfollow',
+            index=models.Index(fields=['following', '-created_at', '-id'], name='user_userfo_followi_f7572b_idx'),
+        ),
+        core.db.operations.AddIndexConcurrentlyIfSupported(
+            model_name='userfollow',
+            index=models.Index(fields=['follower', '-created_at', '-id'], name='user_userfo_followe_a3254d_idx'),
+        ),
+        migrations.AlterField(
+            model_name='userfollow',
+            name='follower',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='following', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='userfollow',
+            name='following',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='followers', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
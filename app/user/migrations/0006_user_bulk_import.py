@@ -0,0 +1,25 @@
+# Generated by Django 4.0.10 on 2026-10-18 01:51
+
+import core.slugs
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0005_user_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='date_joined',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='slug',
+            field=core.slugs.UniqueSlugField(editable=False, populate_from='username', unique=True),
+        ),
+    ]
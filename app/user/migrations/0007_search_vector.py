@@ -0,0 +1,30 @@
+# Generated by Django 4.0.10 on 2026-10-18 01:57
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+import core.db.operations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0006_user_bulk_import'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        core.db.operations.CreateSearchIndex(
+            model_name='user',
+            fields=['username', 'first_name', 'last_name', 'location', 'bio'],
+            config='simple',
+        ),
+        core.db.operations.CreateTrigramIndexIfSupported(
+            model_name='user',
+            field='username',
+        ),
+    ]
@@ -2,7 +2,9 @@ import uuid
 import os
 
 from django.conf import settings
+from django.db import connections, router, transaction
 from django.db.models import (
+    F,
     Model,
     UUIDField,
     CharField,
@@ -11,23 +13,42 @@ from django.db.models import (
     BooleanField,
     DateTimeField,
     ImageField,
+    JSONField,
+    PositiveIntegerField,
     ForeignKey,
+    OneToOneField,
+    Index,
+    Q,
+    QuerySet,
     CASCADE,
 )
+from django.db.models.functions import Greatest
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin,
 )
 from django.core.validators import validate_email
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.validators import UnicodeUsernameValidator
 
-from autoslug import AutoSlugField
+from core.slugs import UniqueSlugField, UniqueSlugMixin
+from user.cache import invalidate_profiles
 
 
 AUTH_USER_MODEL = settings.AUTH_USER_MODEL
 
+# Follow counters, moved only by F() updates (see UserFollow._update_counts).
+COUNTER_FIELDS = ("followers_count", "following_count")
+
+# User fields issued as token claims (see auth.serializers).
+TOKEN_CLAIM_FIELDS = ("is_active", "is_staff", "is_superuser")
+
+FOLLOW_PAGE_SIZE = 50
+FOLLOW_BATCH_SIZE = 1000
+
 
 def image_path(filename, folder):
     """Generate file path for new image."""
@@ -100,7 +121,7 @@ class UserManager(BaseUserManager):
         return user
 
 
-class User(AbstractBaseUser, PermissionsMixin):
+class User(UniqueSlugMixin, AbstractBaseUser, PermissionsMixin):
     """
     User model represents registered users of your platform.
     Stores user profile information, authentication data, and preferences.
@@ -121,7 +142,7 @@ class User(AbstractBaseUser, PermissionsMixin):
             "unique": _("A user with that username already exists."),
         },
     )
-    slug = AutoSlugField(populate_from="username", unique=True)
+    slug = UniqueSlugField(populate_from="username", unique=True)
     email = EmailField(
         max_length=255,
         unique=True,
@@ -133,11 +154,14 @@ class User(AbstractBaseUser, PermissionsMixin):
     last_name = CharField(max_length=100, blank=True)
     bio = TextField(blank=True)
     location = CharField(max_length=255, blank=True)
-    date_joined = DateTimeField(auto_now_add=True)
+    # Not auto_now_add, so bulk imports can keep the original join dates.
+    date_joined = DateTimeField(default=timezone.now, editable=False)
 
     # Profile
     avatar = ImageField(upload_to=user_avatar_path, null=True, blank=True)
     cover_image = ImageField(upload_to=user_cover_image_path, null=True, blank=True)
+    # Resized copies of avatar and cover_image, filled in by user.images.
+    image_renditions = JSONField(default=dict, blank=True, editable=False)
 
     # Social
     website = CharField(max_length=255, blank=True)
@@ -148,16 +172,59 @@ class User(AbstractBaseUser, PermissionsMixin):
     # Stats
     is_staff = BooleanField(default=False)
     is_active = BooleanField(default=True)
+    followers_count = PositiveIntegerField(default=0)
+    following_count = PositiveIntegerField(default=0)
+
+    # Search, maintained by user.search (GIN and trigram indexes live in migrations).
+    search_vector = SearchVectorField(null=True, editable=False)
 
     objects = UserManager()
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username"]
 
+    class Meta:
+        indexes = [Index(fields=["-date_joined", "-id"])]
+
     def __str__(self):
         """Return the string representation of the user."""
         return self.email
 
+    def save(self, *args, **kwargs):
+        """
+        Save the user. Saves of an existing row without update_fields leave out
+        the follow counters, so stale in-memory counts never overwrite F() updates.
+        """
+        inserting = self._state.adding or kwargs.get("force_insert")
+        if not inserting and not args and kwargs.get("update_fields") is None:
+            skipped = self.get_deferred_fields() | set(COUNTER_FIELDS)
+            kwargs["update_fields"] = [
+                field.attname
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the stored token claims, so saves can tell when they change."""
+        instance = super().from_db(db, field_names, values)
+        instance.remember_claims()
+        return instance
+
+    def token_claims(self):
+        """Return the loaded values of the fields issued as token claims."""
+        return {name: self.__dict__.get(name) for name in TOKEN_CLAIM_FIELDS}
+
+    def remember_claims(self):
+        """Mark the current token claims as the stored ones."""
+        self._stored_claims = self.token_claims()
+
+    def claims_changed(self):
+        """Check if the token claims differ from the stored ones."""
+        stored = getattr(self, "_stored_claims", None)
+        return stored is not None and stored != self.token_claims()
+
 
 class UserFollow(Model):
     """
@@ -165,11 +232,21 @@ class UserFollow(Model):
     Stores information about the follower and the user being followed.
     """
 
-    follower = ForeignKey(AUTH_USER_MODEL, on_delete=CASCADE, related_name="following")
-    following = ForeignKey(AUTH_USER_MODEL, on_delete=CASCADE, related_name="followers")
+    # Lookups by either side are served by the composite indexes below.
+    follower = ForeignKey(
+        AUTH_USER_MODEL, on_delete=CASCADE, related_name="following", db_index=False
+    )
+    following = ForeignKey(
+        AUTH_USER_MODEL, on_delete=CASCADE, related_name="followers", db_index=False
+    )
+    created_at = DateTimeField(auto_now_add=True)
 
     class Meta:
         unique_together = ["follower", "following"]
+        indexes = [
+            Index(fields=["following", "-created_at", "-id"]),
+            Index(fields=["follower", "-created_at", "-id"]),
+        ]
 
     def __str__(self):
         """Return the string representation of the user-follow relationship."""
@@ -184,8 +261,10 @@ class UserFollow(Model):
     def add_follower(cls, follower, following):
         """Add a follower to the following."""
         validate_user(follower, following)
-        user_follow = cls(follower=follower, following=following)
-        user_follow.save()
+        with transaction.atomic():
+            user_follow = cls(follower=follower, following=following)
+            user_follow.save()
+            cls._update_counts(follower, [following.pk], 1)
 
     @classmethod
     def remove_follower(cls, follower, following):
@@ -193,24 +272,175 @@ class UserFollow(Model):
         validate_user(follower, following)
         if follower == following:
             raise ValueError("Users cannot unfollow themselves.")
-        cls.objects.filter(follower=follower, following=following).delete()
+        with transaction.atomic():
+            deleted, _ = cls.objects.filter(
+                follower=follower, following=following
+            ).delete()
+            if deleted:
+                cls._update_counts(follower, [following.pk], -1)
+
+    @classmethod
+    def bulk_follow(cls, follower, following_ids):
+        """
+        Follow many users at once and return the number of new follows.
+        Unknown users and edges that already exist are skipped.
+        """
+        validate_user(follower)
+        following_ids = set(following_ids)
+        if follower.pk in following_ids:
+            raise ValueError("Users cannot follow themselves.")
+        with transaction.atomic():
+            candidate_ids = list(
+                User.objects.filter(pk__in=following_ids)
+                .exclude(followers__follower=follower)
+                .values_list("pk", flat=True)
+            )
+            new_ids = cls._insert_follows(follower, candidate_ids)
+            cls._update_counts(follower, new_ids, 1)
+        return len(new_ids)
+
+    @classmethod
+    def _insert_follows(cls, follower, following_ids):
+        """
+        Insert follow edges, skipping those that exist, and return the ids followed.
+        Only the rows this insert created are returned, so a concurrent follow of
+        the same user is never counted twice.
+        """
+        connection = connections[router.db_for_write(cls)]
+        qn = connection.ops.quote_name
+        fields = [cls._meta.get_field(name) for name in ("follower", "following", "created_at")]
+        following_field = fields[1]
+        created_at = timezone.now()
+        followed = []
+        with connection.cursor() as cursor:
+            for start in range(0, len(following_ids), FOLLOW_BATCH_SIZE):
+                batch = following_ids[start:start + FOLLOW_BATCH_SIZE]
+                params = []
+                for following_id in batch:
+                    for field, value in zip(fields, (follower.pk, following_id, created_at)):
+                        params.append(field.get_db_prep_save(value, connection))
+                rows = ", ".join(["(%s, %s, %s)"] * len(batch))
+                cursor.execute(
+                    f"INSERT INTO {qn(cls._meta.db_table)} "
+                    f"({', '.join(qn(field.column) for field in fields)}) VALUES {rows} "
+                    f"ON CONFLICT DO NOTHING RETURNING {qn(following_field.column)}",
+                    params,
+                )
+                followed.extend(
+                    following_field.target_field.to_python(row[0]) for row in cursor.fetchall()
+                )
+        return followed
+
+    @classmethod
+    def bulk_unfollow(cls, follower, following_ids):
+        """Unfollow many users at once and return the number of removed follows."""
+        validate_user(follower)
+        following_ids = set(following_ids)
+        if follower.pk in following_ids:
+            raise ValueError("Users cannot unfollow themselves.")
+        with transaction.atomic():
+            rows = cls.objects.filter(follower=follower, following__in=following_ids)
+            removed_ids = list(
+                rows.select_for_update().values_list("following_id", flat=True)
+            )
+            rows.delete()
+            cls._update_counts(follower, removed_ids, -1)
+        return len(removed_ids)
+
+    @staticmethod
+    def _update_counts(follower, following_ids, delta):
+        """Shift the denormalized follow counters by delta for each follow edge."""
+        if not following_ids:
+            return
+        User.objects.filter(pk=follower.pk).update(
+            following_count=Greatest(F("following_count") + delta * len(following_ids), 0)
+        )
+        User.objects.filter(pk__in=following_ids).update(
+            followers_count=Greatest(F("followers_count") + delta, 0)
+        )
+        invalidate_profiles(follower.pk, *following_ids)
 
     @classmethod
     def get_followers(cls, following):
-        """Get a list of followers for a following."""
+        """Get the followers of a user as a single joined query."""
         validate_user(following)
-        followers = cls.objects.filter(following=following)
-        return [follower.follower for follower in followers]
+        return User.objects.filter(following__following=following)
 
     @classmethod
     def get_following(cls, follower):
-        """Get a list of followings for a follower."""
+        """Get the users a follower follows as a single joined query."""
+        validate_user(follower)
+        return User.objects.filter(followers__follower=follower)
+
+    @classmethod
+    def get_followers_page(cls, following, cursor=None, limit=FOLLOW_PAGE_SIZE):
+        """
+        Get a page of followers, most recent follow first.
+        Returns the users and the cursor of the next page (None on the last page).
+        """
+        validate_user(following)
+        rows = cls.objects.filter(following=following).select_related("follower")
+        return cls._paginate(rows, "follower", cursor, limit)
+
+    @classmethod
+    def get_following_page(cls, follower, cursor=None, limit=FOLLOW_PAGE_SIZE):
+        """
+        Get a page of followings, most recent follow first.
+        Returns the users and the cursor of the next page (None on the last page).
+        """
         validate_user(follower)
-        followings = cls.objects.filter(follower=follower)
-        return [following.following for following in followings]
+        rows = cls.objects.filter(follower=follower).select_related("following")
+        return cls._paginate(rows, "following", cursor, limit)
+
+    @classmethod
+    def _paginate(cls, rows, field, cursor, limit):
+        """Slice follow rows by keyset on (created_at, id) and pick the users."""
+        if cursor is not None:
+            created_at, pk = cursor
+            rows = rows.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+        rows = list(rows.order_by("-created_at", "-id")[: limit + 1])
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = (rows[limit - 1].created_at, rows[limit - 1].id)
+        return [getattr(row, field) for row in rows[:limit]], next_cursor
 
     @classmethod
     def is_following(cls, follower, following):
-        """Check if a follower is following a following."""
+        """
+        Check if a follower is following a following.
+        When given a collection of users, return the set of ids the follower follows.
+        """
+        if isinstance(following, (list, tuple, set, frozenset, QuerySet)):
+            users = list(following)
+            validate_user(follower, *users)
+            return set(
+                cls.objects.filter(follower=follower, following__in=users).values_list(
+                    "following_id", flat=True
+                )
+            )
+
         validate_user(follower, following)
         return cls.objects.filter(follower=follower, following=following).exists()
+
+
+class FollowRecommendation(Model):
+    """
+    FollowRecommendation model stores the precomputed "who to follow" list of a user.
+    Rows are rewritten by user.recommendations and read with a primary key lookup.
+    """
+
+    user = OneToOneField(
+        AUTH_USER_MODEL,
+        on_delete=CASCADE,
+        primary_key=True,
+        related_name="follow_recommendation",
+    )
+    # [[user_id, score], ...], best first.
+    suggestions = JSONField(default=list)
+    computed_at = DateTimeField()
+
+    def __str__(self):
+        """Return the string representation of the recommendation."""
+        return f"User: {self.user_id} - {len(self.suggestions)} suggestions"
@@ -0,0 +1,158 @@
+"""
+"Who to follow" recommendations over the follow graph.
+
+A periodic job snapshots the graph into CSR arrays (one int32 offset per
+user, one int32 target per follow) and scores the friends-of-friends of
+every user with NumPy: each path u -> v -> w adds 1 / log(2 + out-degree of
+v) to w, so people who follow everyone count for less (Adamic-Adar). The
+top-N per user is stored in FollowRecommendation and served with a single
+primary key lookup.
+"""
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from user.models import FollowRecommendation, UserFollow
+
+
+DEFAULTS = {
+    "TOP_N": 50,
+    # Followings of a user sampled when expanding the second hop.
+    "MAX_NEIGHBORS": 500,
+    "BATCH_SIZE": 1000,
+}
+
+
+def recommendation_setting(name):
+    """Return a RECOMMENDATIONS setting, falling back to the default."""
+    return getattr(settings, "RECOMMENDATIONS", {}).get(name, DEFAULTS[name])
+
+
+class FollowGraph:
+    """Compressed sparse row snapshot of who follows whom among active users."""
+
+    def __init__(self, user_ids, sources, targets):
+        self.user_ids = user_ids
+        order = np.argsort(sources, kind="stable")
+        self.targets = targets[order]
+        counts = np.bincount(sources, minlength=len(user_ids))
+        self.offsets = np.zeros(len(user_ids) + 1, dtype=np.int32)
+        np.cumsum(counts, out=self.offsets[1:])
+        self.path_weights = 1.0 / np.log(2.0 + counts)
+
+    @classmethod
+    def load(cls, chunk_size=10000):
+        """Stream the active users and their follows into arrays."""
+        user_ids = list(
+            get_user_model()
+            .objects.filter(is_active=True)
+            .order_by()
+            .values_list("id", flat=True)
+            .iterator(chunk_size=chunk_size)
+        )
+        position = {user_id: index for index, user_id in enumerate(user_ids)}
+        edges = (
+            UserFollow.objects.order_by()
+            .values_list("follower_id", "following_id")
+            .iterator(chunk_size=chunk_size)
+        )
+        chunks = [np.empty((0, 2), dtype=np.int32)]
+        while chunk := list(islice(edges, chunk_size)):
+            # Follows of users that are not active map to -1 and are dropped.
+            pairs = np.fromiter(
+                (position.get(user_id, -1) for edge in chunk for user_id in edge),
+                dtype=np.int32,
+                count=2 * len(chunk),
+            ).reshape(-1, 2)
+            chunks.append(pairs[(pairs >= 0).all(axis=1)])
+        pairs = np.concatenate(chunks)
+        return cls(user_ids, pairs[:, 0], pairs[:, 1])
+
+    def following(self, user):
+        """Return the positions of the users a user follows."""
+        return self.targets[self.offsets[user]:self.offsets[user + 1]]
+
+    def recommend(self, user, top_n, max_neighbors):
+        """Return (positions, scores) of the best friends-of-friends of a user."""
+        neighbors = self.following(user)
+        if not len(neighbors):
+            return np.empty(0, dtype=np.int32), np.empty(0)
+        if len(neighbors) > max_neighbors:
+            # Keep the most selective followings: they carry the heaviest paths.
+            heaviest = np.argpartition(-self.path_weights[neighbors], max_neighbors)
+            neighbors = neighbors[heaviest[:max_neighbors]]
+
+        starts, ends = self.offsets[neighbors], self.offsets[neighbors + 1]
+        lengths = ends - starts
+        if not lengths.sum():
+            return np.empty(0, dtype=np.int32), np.empty(0)
+        # Gather every second hop at once: offsets within each neighbor's slice.
+        hop_index = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(
+            lengths.sum()
+        )
+        candidates = self.targets[hop_index]
+        weights = np.repeat(self.path_weights[neighbors], lengths)
+
+        unique, inverse = np.unique(candidates, return_inverse=True)
+        scores = np.bincount(inverse.ravel(), weights=weights)
+        keep = ~np.isin(unique, neighbors, assume_unique=False) & (unique != user)
+        unique, scores = unique[keep], scores[keep]
+        if len(unique) > top_n:
+            best = np.argpartition(-scores, top_n)[:top_n]
+            unique, scores = unique[best], scores[best]
+        order = np.lexsort((unique, -scores))
+        return unique[order], scores[order]
+
+
+def compute_recommendations(graph=None, top_n=None, max_neighbors=None, batch_size=None):
+    """Recompute and store the recommendations of every active user; returns the count."""
+    graph = graph or FollowGraph.load()
+    top_n = top_n or recommendation_setting("TOP_N")
+    max_neighbors = max_neighbors or recommendation_setting("MAX_NEIGHBORS")
+    batch_size = batch_size or recommendation_setting("BATCH_SIZE")
+    computed_at = timezone.now()
+
+    rows = []
+    for user in range(len(graph.user_ids)):
+        positions, scores = graph.recommend(user, top_n, max_neighbors)
+        rows.append(
+            FollowRecommendation(
+                user_id=graph.user_ids[user],
+                suggestions=[
+                    [str(graph.user_ids[position]), round(float(score), 4)]
+                    for position, score in zip(positions, scores)
+                ],
+                computed_at=computed_at,
+            )
+        )
+        if len(rows) == batch_size:
+            store(rows)
+            rows = []
+    store(rows)
+    # Users deactivated since the last run keep no stale rows.
+    FollowRecommendation.objects.filter(computed_at__lt=computed_at).delete()
+    return len(graph.user_ids)
+
+
+def store(rows):
+    """Replace the stored recommendations of a batch of users."""
+    with transaction.atomic():
+        FollowRecommendation.objects.filter(user_id__in=[row.user_id for row in rows]).delete()
+        FollowRecommendation.objects.bulk_create(rows)
+
+
+def get_recommendations(user, limit=None):
+    """Return the recommended users for a user, best first, skipping ones now followed."""
+    row = FollowRecommendation.objects.filter(user_id=user.pk).first()
+    if row is None:
+        return []
+    ids = [user_id for user_id, _ in row.suggestions[:limit]]
+    users = get_user_model().objects.filter(pk__in=ids, is_active=True).exclude(
+        followers__follower_id=user.pk
+    )
+    by_id = {str(candidate.pk): candidate for candidate in users}
+    return [by_id[user_id] for user_id in ids if user_id in by_id]
@@ -0,0 +1,14 @@
+"""
+Full-text search index of users.
+"""
+from django.contrib.auth import get_user_model
+
+from core.search import SearchIndex
+
+
+user_index = SearchIndex(
+    get_user_model(),
+    {"username": "A", "first_name": "A", "last_name": "A", "location": "C", "bio": "D"},
+    config="simple",
+    trigram_field="username",
+)
@@ -9,19 +9,50 @@ from rest_framework.serializers import (
     Serializer,
     CharField,
     EmailField,
+    ListField,
+    SerializerMethodField,
+    UUIDField,
     ValidationError,
 )
 
+from user.cache import invalidate_profiles
+from user.images import rendition_urls
+
+BULK_FOLLOW_LIMIT = 5000
+
 
 class UserSerializer(ModelSerializer):
     """
     Serializer for the User model.
+    Uploaded images are write-only; reads get their resized renditions.
     """
 
+    images = SerializerMethodField()
+
     class Meta:
         model = get_user_model()
-        fields = ["email", "password", "username", "first_name", "last_name"]
-        extra_kwargs = {"password": {"write_only": True, "min_length": 8}}
+        fields = [
+            "email",
+            "password",
+            "username",
+            "first_name",
+            "last_name",
+            "avatar",
+            "cover_image",
+            "images",
+            "followers_count",
+            "following_count",
+        ]
+        read_only_fields = ["followers_count", "following_count"]
+        extra_kwargs = {
+            "password": {"write_only": True, "min_length": 8},
+            "avatar": {"write_only": True},
+            "cover_image": {"write_only": True},
+        }
+
+    def get_images(self, user):
+        """Return the rendition URLs of the user's images."""
+        return rendition_urls(user)
 
     def create(self, validated_data):
         """Create a new user with encrypted password and return it."""
@@ -36,9 +67,27 @@ class UserSerializer(ModelSerializer):
             user.set_password(password)
             user.save()
 
+        invalidate_profiles(user.pk)
         return user
 
 
+class PublicUserSerializer(ModelSerializer):
+    """Serializer for the public profile of a user in lists."""
+
+    class Meta:
+        model = get_user_model()
+        fields = [
+            "id",
+            "username",
+            "slug",
+            "first_name",
+            "last_name",
+            "followers_count",
+            "following_count",
+        ]
+        read_only_fields = fields
+
+
 class AuthTokenSerializer(Serializer):
     """Serializer for the user authentication object."""
 
@@ -60,3 +109,15 @@ class AuthTokenSerializer(Serializer):
 
         attrs["user"] = user
         return attrs
+
+
+class BulkFollowSerializer(Serializer):
+    """Serializer for following or unfollowing many users at once."""
+
+    users = ListField(child=UUIDField(), allow_empty=False, max_length=BULK_FOLLOW_LIMIT)
+
+    def validate_users(self, value):
+        """Reject requests that include the authenticated user."""
+        if self.context["request"].user.pk in value:
+            raise ValidationError(_("Users cannot follow themselves."))
+        return value
@@ -0,0 +1,72 @@
+"""
+Signal handlers for the user app.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from auth.blocklist import revoke_user_tokens
+from core.models import Blob
+from core.storage import track_blobs
+from user.autocomplete import AUTOCOMPLETE_FIELDS, user_autocomplete
+from user.cache import invalidate_profiles
+from user.images import RENDITIONS, rendition_names, schedule_renditions
+from user.search import user_index
+
+track_blobs(get_user_model(), *RENDITIONS)
+user_index.track()
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_cached_profile(sender, instance, **kwargs):
+    """Drop the cached profile of a saved user."""
+    invalidate_profiles(instance.pk)
+
+
+@receiver(post_save, sender=get_user_model())
+def revoke_outdated_user_tokens(sender, instance, **kwargs):
+    """Stop accepting the tokens of deactivated users and tokens with outdated claims."""
+    if not instance.is_active or instance.claims_changed():
+        revoke_user_tokens(instance.pk)
+    instance.remember_claims()
+
+
+@receiver(post_delete, sender=get_user_model())
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    """Stop accepting the tokens of deleted users."""
+    revoke_user_tokens(instance.pk)
+
+
+@receiver(post_save, sender=get_user_model())
+def render_uploaded_images(sender, instance, **kwargs):
+    """Queue renditions for avatars and cover images that have none yet."""
+    for field in RENDITIONS:
+        source = getattr(instance, field).name
+        rendered = instance.image_renditions.get(field, {}).get("source")
+        if source and source != rendered:
+            transaction.on_commit(
+                lambda field=field, source=source: schedule_renditions(
+                    instance.pk, field, source
+                )
+            )
+
+
+@receiver(post_delete, sender=get_user_model())
+def release_deleted_user_renditions(sender, instance, **kwargs):
+    """Drop the references a deleted user held on their renditions."""
+    Blob.release(*rendition_names(instance.image_renditions))
+
+
+@receiver(post_save, sender=get_user_model())
+def update_autocomplete(sender, instance, update_fields=None, **kwargs):
+    """Keep this process's autocomplete index in step with saved users."""
+    if update_fields is None or set(update_fields) & AUTOCOMPLETE_FIELDS:
+        transaction.on_commit(lambda: user_autocomplete.update(instance))
+
+
+@receiver(post_delete, sender=get_user_model())
+def remove_from_autocomplete(sender, instance, **kwargs):
+    """Drop deleted users from this process's autocomplete index."""
+    user_id = instance.pk
+    transaction.on_commit(lambda: user_autocomplete.remove(user_id))
@@ -0,0 +1,143 @@
+"""
+Tests for the async-native user API views.
+"""
+import asyncio
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.urls import reverse
+
+from rest_framework import status
+
+from auth.hashing import HashingPool
+from core.constants.mock_data import john_doe, mock_user
+from core.throttling import get_store
+
+CREATE_URL = reverse("user:async-create")
+ME_URL = reverse("user:async-me")
+TOKEN_URL = reverse("async_token_obtain_pair")
+
+
+def on_event_loop():
+    # Helper function to tell if the caller runs on an event loop.
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class AsyncUserApiTests(TestCase):
+    """Tests for the async user endpoints."""
+
+    def setUp(self):
+        get_store().clear()
+        self.user = get_user_model().objects.create_user(**john_doe)
+
+    async def obtain_access_token(self):
+        # Helper function to log in through the async token endpoint.
+        payload = {"email": john_doe["email"], "password": john_doe["password"]}
+        res = await self.async_client.post(
+            TOKEN_URL, payload, content_type="application/json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.json()["access"]
+
+    async def test_create_user(self):
+        """Test creating a user through the async endpoint."""
+        payload = mock_user(salt="42")
+
+        res = await self.async_client.post(
+            CREATE_URL, payload, content_type="application/json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("password", res.json())
+        user = await sync_to_async(get_user_model().objects.get)(email=payload["email"])
+        self.assertTrue(user.check_password(payload["password"]))
+
+    async def test_create_user_duplicate_email(self):
+        """Test creating a user with a taken email fails."""
+        payload = {**mock_user(salt="42"), "email": john_doe["email"]}
+
+        res = await self.async_client.post(
+            CREATE_URL, payload, content_type="application/json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("email", res.json())
+
+    async def test_obtain_token_wrong_password(self):
+        """Test the async token endpoint rejects wrong credentials."""
+        payload = {"email": john_doe["email"], "password": "wrong-password"}
+
+        res = await self.async_client.post(
+            TOKEN_URL, payload, content_type="application/json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_obtain_token_unknown_user_saturated_pool(self):
+        """Test unknown emails get a 429, not an error, when the hashing pool is full."""
+        pool = HashingPool(workers=1, queue_size=0)
+        pool._slots.acquire()
+        payload = {"email": "nobody@example.com", "password": "wrong-password"}
+
+        with patch("auth.hashing.hashing_pool", return_value=pool):
+            res = await self.async_client.post(
+                TOKEN_URL, payload, content_type="application/json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res["Retry-After"], "1")
+
+    async def test_retrieve_profile(self):
+        """Test retrieving the profile with a token from the async endpoint."""
+        access = await self.obtain_access_token()
+
+        res = await self.async_client.get(ME_URL, AUTHORIZATION=f"Bearer {access}")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["email"], john_doe["email"])
+
+    async def test_cache_io_off_event_loop(self):
+        """Test logging in and reading the profile never do cache I/O on the event loop."""
+        blocking = []
+
+        def watch(method):
+            def wrapper(cache, *args, **kwargs):
+                if on_event_loop():
+                    blocking.append(method.__qualname__)
+                return method(cache, *args, **kwargs)
+
+            return wrapper
+
+        with ExitStack() as stack:
+            for backend in (LocMemCache, FileBasedCache):
+                for name in ("get", "set", "add"):
+                    method = getattr(backend, name)
+                    stack.enter_context(patch.object(backend, name, watch(method)))
+            access = await self.obtain_access_token()
+            for _ in range(2):
+                res = await self.async_client.get(ME_URL, AUTHORIZATION=f"Bearer {access}")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(blocking, [])
+
+    async def test_retrieve_profile_requires_auth(self):
+        """Test the async profile endpoint requires a token."""
+        res = await self.async_client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("WWW-Authenticate", res)
+
+    async def test_method_not_allowed(self):
+        """Test the async endpoints reject other methods."""
+        res = await self.async_client.get(CREATE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
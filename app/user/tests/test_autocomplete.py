@@ -0,0 +1,138 @@
+"""
+Tests for the user autocomplete endpoint.
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.autocomplete import PrefixIndex, user_autocomplete
+
+AUTOCOMPLETE_URL = reverse("user:autocomplete")
+
+
+def create_user(username, followers_count=0, **params):
+    # Helper function to create a user with a follower count.
+    return get_user_model().objects.create_user(
+        email=f"{username}@example.com",
+        username=username,
+        followers_count=followers_count,
+        **params,
+    )
+
+
+class PrefixIndexTests(TestCase):
+    """Tests for the prefix index."""
+
+    def test_top_orders_by_weight_then_name(self):
+        """Test matches come heaviest first, ties by name."""
+        index = PrefixIndex()
+        index.load(
+            [
+                ("ann", (-5, "ann", "ann", "1")),
+                ("anna", (-9, "anna", "anna", "2")),
+                ("anne", (-5, "anne", "anne", "3")),
+                ("bob", (-99, "bob", "bob", "4")),
+            ]
+        )
+
+        self.assertEqual([e[1] for e in index.top("an", 10)], ["anna", "ann", "anne"])
+        self.assertEqual([e[1] for e in index.top("an", 1)], ["anna"])
+
+    def test_add_replaces_and_remove_drops(self):
+        """Test entries are replaced by id and removed by id."""
+        index = PrefixIndex()
+        index.add("ann", (-1, "ann", "ann", "1"))
+        index.add("zed", (-1, "zed", "ann", "1"))
+        index.remove("2")
+
+        self.assertEqual(index.top("a", 10), [])
+        self.assertEqual(len(index.top("z", 10)), 1)
+
+    @override_settings(AUTOCOMPLETE={"SCAN_LIMIT": 1})
+    def test_crowded_prefixes_are_cached_until_changed(self):
+        """Test top-k of wide ranges is cached and invalidated by writes."""
+        index = PrefixIndex()
+        index.load([("aa", (-1, "aa", "aa", "1")), ("ab", (-2, "ab", "ab", "2"))])
+        self.assertEqual(index.top("a", 5)[0][1], "ab")
+
+        index.add("ac", (-3, "ac", "ac", "3"))
+
+        self.assertEqual(index.top("a", 5)[0][1], "ac")
+
+    def test_last_tracks_lightest_entry(self):
+        """Test the least followed entry is kept current through writes."""
+        index = PrefixIndex()
+        index.load([("aa", (-5, "aa", "aa", "1")), ("zz", (-1, "zz", "zz", "2"))])
+        self.assertEqual(index.last()[3], "2")
+
+        index.remove("2")
+        index.add("mm", (-3, "mm", "mm", "3"))
+
+        self.assertEqual(index.last()[3], "3")
+
+
+class UserAutocompleteApiTests(TestCase):
+    """Tests for the autocomplete endpoint."""
+
+    def setUp(self):
+        user_autocomplete.reset()
+        self.client = APIClient()
+        create_user("maria", followers_count=3)
+        create_user("mario", followers_count=30)
+        create_user("martin.admin", followers_count=0, is_active=False)
+        create_user("zoe")
+
+    def tearDown(self):
+        user_autocomplete.reset()
+
+    def suggest(self, query, **params):
+        # Helper function to fetch suggestions.
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": query, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [user["username"] for user in res.data["results"]]
+
+    def test_suggests_active_users_by_popularity(self):
+        """Test prefix matches are active users, most followed first."""
+        self.assertEqual(self.suggest("MAR"), ["mario", "maria"])
+        self.assertEqual(self.suggest("mar", limit=1), ["mario"])
+
+    def test_index_follows_saved_and_deleted_users(self):
+        """Test new, renamed and deleted users are picked up without a rebuild."""
+        self.suggest("m")
+        with self.captureOnCommitCallbacks(execute=True):
+            create_user("marek", followers_count=100)
+        with self.captureOnCommitCallbacks(execute=True):
+            get_user_model().objects.get(username="maria").delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.suggest("mar"), ["marek", "mario"])
+
+    def test_updates_during_build_are_kept(self):
+        """Test users saved while a build is loading survive the swap."""
+        saved = get_user_model()(
+            username="marcel", email="marcel@example.com", slug="marcel", followers_count=50
+        )
+        load = PrefixIndex.load
+
+        def load_and_save(index, items):
+            load(index, items)
+            user_autocomplete.update(saved)
+
+        with patch.object(PrefixIndex, "load", load_and_save):
+            user_autocomplete.build()
+
+        self.assertEqual(self.suggest("mar"), ["marcel", "mario", "maria"])
+
+    def test_emails_match_for_staff_only(self):
+        """Test email prefixes only match for staff users."""
+        staff = create_user("staff", is_staff=True)
+        self.assertEqual(self.suggest("zoe@"), [])
+
+        self.client.force_authenticate(user=staff)
+
+        self.assertEqual(self.suggest("zoe@"), ["zoe"])
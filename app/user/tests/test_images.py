@@ -0,0 +1,137 @@
+"""
+Tests for the avatar and cover image pipeline.
+"""
+import io
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from PIL import Image
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.constants.mock_data import john_doe
+from user.images import EXTENSIONS, ImagePipeline, output_format, render
+
+ME_URL = reverse("user:me")
+
+
+def image_file(size=(400, 300), exif=None):
+    # Helper function to build an uploaded JPEG.
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "red").save(buffer, format="JPEG", exif=exif or b"")
+    buffer.seek(0)
+    buffer.name = "photo.jpg"
+    return buffer
+
+
+class RenderTests(TestCase):
+    """Tests for the rendering worker function."""
+
+    def test_render_sizes_and_strips_metadata(self):
+        """Test renditions have the requested sizes and no EXIF."""
+        exif = Image.Exif()
+        exif[0x010F] = "Camera Maker"
+        data = image_file(exif=exif.tobytes()).read()
+
+        image_format = output_format()
+        encoded = render(data, {"small": (64, 64), "wide": (120, 40)}, image_format, 80)
+
+        with Image.open(io.BytesIO(encoded["small"])) as small:
+            self.assertEqual(small.size, (64, 64))
+            self.assertEqual(small.format, image_format)
+            self.assertFalse(small.getexif())
+        with Image.open(io.BytesIO(encoded["wide"])) as wide:
+            self.assertEqual(wide.size, (120, 40))
+
+
+class PipelineTests(TestCase):
+    """Tests for the job queue, with the jobs replaced."""
+
+    def render_job(self, user_id, field, source, render_fn):
+        # Stand-in for process_image that only renders.
+        render_fn(b"", {}, "JPEG", 80)
+
+    def test_jobs_render_in_parallel(self):
+        """Test as many images render at once as there are workers."""
+        barrier = threading.Barrier(2, timeout=5)
+        rendered = []
+
+        def render(*args):
+            barrier.wait()
+            rendered.append(args)
+
+        pipeline = ImagePipeline("thread", 2)
+        with mock.patch("user.images.render", render), mock.patch(
+            "user.images.process_image", self.render_job
+        ):
+            jobs = [pipeline.submit(n, "avatar", "source") for n in range(2)]
+            for job in jobs:
+                job.result(timeout=10)
+
+        self.assertEqual(len(rendered), 2)
+
+    def test_failed_job_logged(self):
+        """Test a job that fails is logged instead of vanishing with its future."""
+        pipeline = ImagePipeline("thread", 1)
+        with mock.patch("user.images.process_image", side_effect=OSError("Storage down")):
+            with self.assertLogs("user.images", "ERROR") as logs:
+                pipeline.submit(1, "avatar", "source").result(timeout=10)
+
+        self.assertIn("Storage down", logs.output[0])
+
+
+class ImagePipelineTests(TestCase):
+    """Tests for renditions produced after an upload."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root, IMAGE_PIPELINE={"EXECUTOR": "inline"}
+        )
+        self.settings_override.enable()
+        self.user = get_user_model().objects.create_user(**john_doe)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_upload_avatar_creates_renditions(self):
+        """Test uploading an avatar stores content-addressed renditions."""
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.patch(ME_URL, {"avatar": image_file()}, format="multipart")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        paths = self.user.image_renditions["avatar"]
+        self.assertEqual(paths["source"], self.user.avatar.name)
+        extension = EXTENSIONS[output_format()]
+        self.assertRegex(paths["small"], rf"/([0-9a-f]{{2}})/[0-9a-f]{{2}}/\1[0-9a-f]{{62}}\.{extension}$")
+        with default_storage.open(paths["medium"]) as medium:
+            self.assertEqual(Image.open(medium).size, (256, 256))
+
+        res = self.client.get(ME_URL)
+        self.assertNotIn("avatar", res.data)
+        self.assertEqual(set(res.data["images"]["avatar"]), {"small", "medium"})
+
+    def test_identical_uploads_share_renditions(self):
+        """Test the same picture uploaded twice is stored and rendered once."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(ME_URL, {"avatar": image_file()}, format="multipart")
+        self.user.refresh_from_db()
+        first = self.user.image_renditions["avatar"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(ME_URL, {"avatar": image_file()}, format="multipart")
+        self.user.refresh_from_db()
+        second = self.user.image_renditions["avatar"]
+
+        self.assertEqual(first, second)
@@ -1,3 +1,6 @@
+from unittest.mock import patch
+
+from django.db.models import QuerySet
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 
@@ -171,3 +174,141 @@ class UserFollowModelTests(TestCase):
             UserFollow.get_following(None)
         with self.assertRaises(ValueError):
             UserFollow.get_following("user1")
+
+    def test_get_followers_single_query(self):
+        """Test that listing followers runs a single query."""
+        UserFollow.add_follower(self.user2, self.user1)
+        UserFollow.add_follower(self.user3, self.user1)
+        UserFollow.add_follower(self.user4, self.user1)
+
+        with self.assertNumQueries(1):
+            followers = list(UserFollow.get_followers(self.user1))
+
+        self.assertEqual(len(followers), 3)
+        with self.assertNumQueries(1):
+            following = list(UserFollow.get_following(self.user2))
+
+        self.assertEqual(following, [self.user1])
+
+    def test_get_followers_page(self):
+        """Test paginating followers with a keyset cursor."""
+        UserFollow.add_follower(self.user2, self.user1)
+        UserFollow.add_follower(self.user3, self.user1)
+        UserFollow.add_follower(self.user4, self.user1)
+
+        with self.assertNumQueries(1):
+            page, cursor = UserFollow.get_followers_page(self.user1, limit=2)
+
+        self.assertEqual(page, [self.user4, self.user3])
+        self.assertIsNotNone(cursor)
+
+        page, cursor = UserFollow.get_followers_page(self.user1, cursor, limit=2)
+
+        self.assertEqual(page, [self.user2])
+        self.assertIsNone(cursor)
+
+    def test_get_following_page(self):
+        """Test paginating followings with a keyset cursor."""
+        UserFollow.add_follower(self.user1, self.user2)
+        UserFollow.add_follower(self.user1, self.user3)
+
+        page, cursor = UserFollow.get_following_page(self.user1, limit=2)
+
+        self.assertEqual(page, [self.user3, self.user2])
+        self.assertIsNone(cursor)
+
+    def test_is_following_many(self):
+        """Test checking many followings at once."""
+        UserFollow.add_follower(self.user1, self.user2)
+        UserFollow.add_follower(self.user1, self.user4)
+
+        with self.assertNumQueries(1):
+            followed = UserFollow.is_following(
+                self.user1, [self.user2, self.user3, self.user4]
+            )
+
+        self.assertEqual(followed, {self.user2.id, self.user4.id})
+        with self.assertRaises(ValueError):
+            UserFollow.is_following(self.user1, [self.user2, "user3"])
+
+    def test_follow_counters(self):
+        """Test follow counters are kept in sync on follow and unfollow."""
+        UserFollow.add_follower(self.user2, self.user1)
+        UserFollow.add_follower(self.user3, self.user1)
+        UserFollow.remove_follower(self.user3, self.user1)
+        UserFollow.remove_follower(self.user4, self.user1)
+
+        self.user1.refresh_from_db()
+        self.user2.refresh_from_db()
+        self.user3.refresh_from_db()
+        self.assertEqual(self.user1.followers_count, 1)
+        self.assertEqual(self.user1.following_count, 0)
+        self.assertEqual(self.user2.following_count, 1)
+        self.assertEqual(self.user3.following_count, 0)
+
+    def test_bulk_follow(self):
+        """Test following many users at once."""
+        UserFollow.add_follower(self.user1, self.user2)
+
+        followed = UserFollow.bulk_follow(
+            self.user1, [self.user2.id, self.user3.id, self.user4.id]
+        )
+
+        self.assertEqual(followed, 2)
+        self.assertEqual(
+            UserFollow.is_following(self.user1, [self.user2, self.user3, self.user4]),
+            {self.user2.id, self.user3.id, self.user4.id},
+        )
+        self.user1.refresh_from_db()
+        self.user3.refresh_from_db()
+        self.assertEqual(self.user1.following_count, 3)
+        self.assertEqual(self.user3.followers_count, 1)
+
+    def test_save_keeps_follow_counters(self):
+        """Test saving a user with stale counters does not overwrite the stored ones."""
+        stale = get_user_model().objects.get(pk=self.user2.pk)
+        UserFollow.add_follower(self.user1, self.user2)
+
+        stale.bio = "Updated"
+        stale.save()
+
+        self.user2.refresh_from_db()
+        self.assertEqual(self.user2.bio, "Updated")
+        self.assertEqual(self.user2.followers_count, 1)
+
+    def test_bulk_follow_counts_inserted_rows_only(self):
+        """Test an edge created after the existing ones were read is not counted again."""
+        UserFollow.add_follower(self.user1, self.user2)
+        # A concurrent follow of user2 landed after bulk_follow read the existing edges.
+        with patch.object(QuerySet, "exclude", lambda queryset, *args, **kwargs: queryset):
+            followed = UserFollow.bulk_follow(self.user1, [self.user2.id, self.user3.id])
+
+        self.assertEqual(followed, 1)
+        self.user1.refresh_from_db()
+        self.user2.refresh_from_db()
+        self.assertEqual(self.user1.following_count, 2)
+        self.assertEqual(self.user2.followers_count, 1)
+
+    def test_bulk_follow_with_invalid_credentials(self):
+        """Test bulk following rejects self-follows."""
+        with self.assertRaises(ValueError):
+            UserFollow.bulk_follow(self.user1, [self.user2.id, self.user1.id])
+        with self.assertRaises(ValueError):
+            UserFollow.bulk_follow(None, [self.user2.id])
+
+        self.assertFalse(UserFollow.is_following(self.user1, self.user2))
+
+    def test_bulk_unfollow(self):
+        """Test unfollowing many users at once."""
+        UserFollow.bulk_follow(self.user1, [self.user2.id, self.user3.id])
+
+        unfollowed = UserFollow.bulk_unfollow(
+            self.user1, [self.user2.id, self.user3.id, self.user4.id]
+        )
+
+        self.assertEqual(unfollowed, 2)
+        self.assertFalse(UserFollow.objects.filter(follower=self.user1).exists())
+        self.user1.refresh_from_db()
+        self.user2.refresh_from_db()
+        self.assertEqual(self.user1.following_count, 0)
+        self.assertEqual(self.user2.followers_count, 0)
@@ -0,0 +1,94 @@
+"""
+Tests for follow recommendations.
+"""
+import io
+
+import numpy as np
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.models import FollowRecommendation, UserFollow
+from user.recommendations import FollowGraph
+
+RECOMMENDATIONS_URL = reverse("user:recommendations")
+
+
+def create_user(username, **params):
+    # Helper function to create a user.
+    return get_user_model().objects.create_user(
+        email=f"{username}@example.com", username=username, **params
+    )
+
+
+class FollowRecommendationTests(TestCase):
+    """Tests for computing and serving recommendations."""
+
+    def setUp(self):
+        self.me, self.a, self.b, self.c, self.d, self.e = [
+            create_user(name) for name in ["me", "a", "b", "c", "d", "e"]
+        ]
+        edges = [
+            (self.me, self.a),
+            (self.me, self.b),
+            (self.a, self.c),
+            (self.a, self.d),
+            (self.a, self.me),
+            (self.b, self.c),
+            (self.b, self.a),
+            (self.c, self.e),
+        ]
+        for follower, following in edges:
+            UserFollow.objects.create(follower=follower, following=following)
+
+    def test_graph_is_compressed_by_follower(self):
+        """Test the CSR snapshot lists each user's followings."""
+        graph = FollowGraph.load()
+        position = {user_id: index for index, user_id in enumerate(graph.user_ids)}
+
+        following = {graph.user_ids[i] for i in graph.following(position[self.a.pk])}
+
+        self.assertEqual(following, {self.c.pk, self.d.pk, self.me.pk})
+        self.assertEqual(len(graph.targets), 8)
+
+    def test_graph_loads_in_chunks_without_inactive_users(self):
+        """Test follows are read chunk by chunk into int32 arrays, skipping inactive users."""
+        get_user_model().objects.filter(pk=self.e.pk).update(is_active=False)
+
+        graph = FollowGraph.load(chunk_size=3)
+
+        self.assertEqual(len(graph.targets), 7)
+        self.assertEqual(graph.targets.dtype, np.int32)
+        self.assertEqual(graph.offsets.dtype, np.int32)
+        self.assertEqual(graph.offsets[-1], 7)
+
+    def test_friends_of_friends_ranked_by_weighted_paths(self):
+        """Test candidates reached by more, and more selective, paths rank first."""
+        call_command("recommend_follows", stdout=io.StringIO())
+
+        suggestions = FollowRecommendation.objects.get(user=self.me).suggestions
+        self.assertEqual([user_id for user_id, _ in suggestions], [str(self.c.pk), str(self.d.pk)])
+
+    def test_endpoint_serves_stored_suggestions(self):
+        """Test the endpoint reads the stored list and skips users followed since."""
+        call_command("recommend_follows", stdout=io.StringIO())
+        UserFollow.objects.create(follower=self.me, following=self.c)
+        client = APIClient()
+        client.force_authenticate(user=self.me)
+
+        with self.assertNumQueries(2):
+            res = client.get(RECOMMENDATIONS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([user["username"] for user in res.data["results"]], ["d"])
+
+    def test_endpoint_requires_authentication(self):
+        """Test anonymous users get no recommendations."""
+        res = APIClient().get(RECOMMENDATIONS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,82 @@
+"""
+Tests for the user search endpoint.
+"""
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+SEARCH_URL = reverse("user:search")
+
+
+def create_user(username, **params):
+    # Helper function to create a user.
+    return get_user_model().objects.create_user(
+        email=f"{username}@example.com", username=username, **params
+    )
+
+
+class UserSearchTests(TestCase):
+    """Tests for searching users."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.ada = create_user("ada", first_name="Ada", last_name="Lovelace")
+        self.grace = create_user("grace.hopper", first_name="Grace", bio="Admirer of Ada")
+        self.alan = create_user("alan", first_name="Alan", last_name="Turing")
+
+    def search(self, query, **params):
+        # Helper function to run a search and return the usernames found.
+        res = self.client.get(SEARCH_URL, {"q": query, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [user["username"] for user in res.data["results"]]
+
+    def test_search_ranks_name_matches_first(self):
+        """Test a name match outranks a bio match."""
+        usernames = self.search("ada")
+
+        self.assertEqual(usernames, ["ada", "grace.hopper"])
+
+    def test_search_matches_prefixes(self):
+        """Test partial words match."""
+        usernames = self.search("Lovel")
+
+        self.assertEqual(usernames, ["ada"])
+
+    def test_search_follows_updates_and_deletes(self):
+        """Test the index is maintained on save and delete."""
+        self.alan.bio = "Codebreaker"
+        self.alan.save()
+        self.ada.delete()
+
+        self.assertEqual(self.search("codebreaker"), ["alan"])
+        self.assertEqual(self.search("lovelace"), [])
+
+    def test_search_paginates_by_rank(self):
+        """Test results are paginated with a cursor in rank order."""
+        res = self.client.get(SEARCH_URL, {"q": "ada", "page_size": 1})
+        pages = [res.data["results"]]
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            pages.append(res.data["results"])
+
+        usernames = [[user["username"] for user in page] for page in pages]
+        self.assertEqual(usernames, [["ada"], ["grace.hopper"]])
+
+    def test_empty_query_returns_nothing(self):
+        """Test a blank query matches no users."""
+        self.assertEqual(self.search(" "), [])
+
+    def test_rebuild_search_index(self):
+        """Test the rebuild command reindexes rows changed behind the signals."""
+        get_user_model().objects.filter(pk=self.alan.pk).update(location="Manchester")
+        self.assertEqual(self.search("manchester"), [])
+
+        call_command("rebuild_search_index", "user.User", stdout=io.StringIO())
+
+        self.assertEqual(self.search("manchester"), ["alan"])
@@ -0,0 +1,196 @@
+"""
+Tests for the user API.
+"""
+import base64
+import json
+
+from django.conf import settings
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.cache import stamp_cache, version_key
+from user.models import UserFollow
+from core.constants.mock_data import john_doe, mock_user
+from core.testing import QueryBudgetMixin
+
+FOLLOW_URL = reverse("user:follow")
+ME_URL = reverse("user:me")
+
+
+def followers_url(user):
+    # Helper function to build the followers URL of a user.
+    return reverse("user:followers", args=[user.slug])
+
+
+def create_user(**params):
+    # Helper function to create a user.
+    return get_user_model().objects.create_user(**params)
+
+
+class PrivateUserApiTests(QueryBudgetMixin, TestCase):
+    """Test API requests that require authentication."""
+
+    def setUp(self):
+        """Set up an authenticated client."""
+        self.user = create_user(**john_doe)
+        self.others = [create_user(**mock_user(salt=str(i))) for i in range(3)]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_retrieve_profile_cached(self):
+        """Test the profile of the authenticated user is served from cache."""
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["username"], self.user.username)
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.data["username"], self.user.username)
+
+    def test_update_profile_invalidates_cache(self):
+        """Test updating the profile refreshes the cached profile."""
+        self.client.get(ME_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.patch(ME_URL, {"first_name": "Updated"})
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            # Not invalidated before the update commits.
+            self.assertEqual(self.client.get(ME_URL).data["first_name"], john_doe["first_name"])
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["first_name"], "Updated")
+
+    def test_invalidation_from_other_process(self):
+        """Test a profile invalidated by another worker process is not served stale."""
+        self.client.get(ME_URL)
+        self.user.first_name = "Elsewhere"
+        self.user.save()
+
+        self.assertEqual(self.client.get(ME_URL).data["first_name"], john_doe["first_name"])
+
+        # What invalidate_profiles writes from another process.
+        self.assertNotIsInstance(stamp_cache(), LocMemCache)
+        other_process = caches.create_connection(settings.PROFILE_CACHE["STAMP_ALIAS"])
+        other_process.set(
+            version_key(self.user.pk), "new-stamp", version=settings.PROFILE_CACHE["VERSION"]
+        )
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["first_name"], "Elsewhere")
+
+    def test_follow_invalidates_cached_counts(self):
+        """Test following users refreshes the cached following count."""
+        self.client.get(ME_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(FOLLOW_URL, {"users": [str(self.others[0].id)]}, format="json")
+        self.user.refresh_from_db()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["following_count"], 1)
+
+    def test_bulk_follow(self):
+        """Test following many users in one request."""
+        payload = {"users": [str(user.id) for user in self.others]}
+
+        res = self.client.post(FOLLOW_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["followed"], 3)
+        self.assertEqual(len(UserFollow.get_following(self.user)), 3)
+
+    def test_bulk_follow_query_budget(self):
+        """Test bulk following runs a fixed number of queries."""
+        payload = {"users": [str(user.id) for user in self.others]}
+
+        with self.assertQueryBudget(6):
+            self.client.post(FOLLOW_URL, payload, format="json")
+
+    def test_bulk_follow_self(self):
+        """Test following yourself in a bulk request fails."""
+        payload = {"users": [str(self.others[0].id), str(self.user.id)]}
+
+        res = self.client.post(FOLLOW_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(UserFollow.objects.exists())
+
+    def test_bulk_unfollow(self):
+        """Test unfollowing many users in one request."""
+        UserFollow.bulk_follow(self.user, [user.id for user in self.others])
+        payload = {"users": [str(user.id) for user in self.others[:2]]}
+
+        res = self.client.delete(FOLLOW_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["unfollowed"], 2)
+        self.assertEqual(list(UserFollow.get_following(self.user)), [self.others[2]])
+
+
+class PublicUserApiTests(QueryBudgetMixin, TestCase):
+    """Test unauthenticated API requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_list_followers_paginates_with_cursor(self):
+        """Test listing followers page by page with keyset cursors."""
+        user = create_user(**john_doe)
+        followers = [create_user(**mock_user(salt=str(i))) for i in range(5)]
+        for follower in followers:
+            UserFollow.add_follower(follower, user)
+
+        res = self.client.get(followers_url(user), {"page_size": 2})
+        pages = [res.data["results"]]
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            pages.append(res.data["results"])
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        usernames = [item["username"] for page in pages for item in page]
+        self.assertEqual(usernames, [f.username for f in reversed(followers)])
+        self.assertNotIn("email", pages[0][0])
+
+        res = self.client.get(res.data["previous"])
+        self.assertEqual(res.data["results"], pages[1])
+
+    def test_list_followers_query_budget(self):
+        """Test listing followers does not grow with the number of followers."""
+        user = create_user(**john_doe)
+        for i in range(10):
+            UserFollow.add_follower(create_user(**mock_user(salt=str(i))), user)
+
+        with self.assertQueryBudget(2):
+            res = self.client.get(followers_url(user))
+
+        self.assertEqual(len(res.data["results"]), 10)
+
+    def test_list_followers_invalid_cursor(self):
+        """Test a malformed cursor is rejected."""
+        user = create_user(**john_doe)
+
+        res = self.client.get(followers_url(user), {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_followers_mistyped_cursor(self):
+        """Test well-formed cursors holding values of the wrong types are rejected."""
+        user = create_user(**john_doe)
+
+        for position in (["garbage", "x"], [{"a": 1}, 1], [None, None]):
+            cursor = base64.urlsafe_b64encode(json.dumps({"p": position}).encode()).decode()
+            res = self.client.get(followers_url(user), {"cursor": cursor})
+
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND, position)
+
+    def test_bulk_follow_requires_auth(self):
+        """Test authentication is required to follow users."""
+        res = self.client.post(FOLLOW_URL, {"users": []}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
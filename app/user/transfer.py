@@ -0,0 +1,219 @@
+"""
+Streaming bulk import and export of users.
+
+Records are read and written one at a time (NDJSON or CSV), so memory stays
+flat however large the file. Imports are inserted in batches with
+bulk_create: slugs are allocated per batch, passwords are taken as already
+encoded hashes (or hashed on a thread pool with --hash-passwords), and a
+checkpoint after every committed batch lets a failed run resume.
+"""
+import csv
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.slugs import SLUG_RETRIES, allocate_slugs
+from user.search import user_index
+
+
+FORMATS = ("ndjson", "csv")
+
+# Profile fields carried by imports and exports, besides the password hash.
+USER_FIELDS = (
+    "email",
+    "username",
+    "first_name",
+    "last_name",
+    "bio",
+    "location",
+    "website",
+    "twitter",
+    "github",
+    "linkedin",
+    "is_active",
+    "date_joined",
+)
+
+
+def detect_format(path, requested=None):
+    """Return the record format, from the option or the file extension."""
+    if requested:
+        return requested
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+
+def read_records(stream, file_format):
+    """Yield the records of an NDJSON or CSV stream one at a time."""
+    if file_format == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def write_records(stream, file_format, records, fields):
+    """Write records to a stream as NDJSON or CSV, one at a time."""
+    if file_format == "csv":
+        writer = csv.DictWriter(stream, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(records)
+        return
+    for record in records:
+        stream.write(f"{json.dumps(record, default=str)}\n")
+
+
+def export_users(stream, file_format, with_passwords=False, chunk_size=2000):
+    """Stream every user to a file without holding more than a chunk in memory."""
+    fields = USER_FIELDS + (("password",) if with_passwords else ())
+    rows = (
+        get_user_model()
+        .objects.order_by()
+        .values(*fields)
+        .iterator(chunk_size=chunk_size)
+    )
+    write_records(stream, file_format, rows, fields)
+
+
+def parse_bool(value):
+    """Read a boolean from JSON or a CSV cell."""
+    if isinstance(value, str):
+        return value.strip().lower() not in ("", "0", "false", "no")
+    return bool(value)
+
+
+def build_user(record):
+    """Return an unsaved user for a record, or raise ValueError."""
+    User = get_user_model()
+    email, username = record.get("email"), record.get("username")
+    if not email:
+        raise ValueError("Users must have an email address.")
+    if not username:
+        raise ValueError("Users must have a username.")
+
+    values = {
+        field: record[field]
+        for field in USER_FIELDS
+        if record.get(field) not in (None, "")
+    }
+    values["email"] = User.objects.normalize_email(email)
+    values["is_active"] = parse_bool(record.get("is_active", True))
+    joined = values.get("date_joined")
+    values["date_joined"] = (joined and parse_datetime(str(joined))) or timezone.now()
+    user = User(**values)
+    user.password = record.get("password") or ""
+    return user
+
+
+def check_hash(encoded):
+    """Raise ValueError unless a password is empty, unusable or an encoded hash."""
+    if encoded and not encoded.startswith("!"):
+        identify_hasher(encoded)
+
+
+def encode_password(password):
+    """Hash a raw password; no password makes an unusable one."""
+    return make_password(password or None)
+
+
+class UserImporter:
+    """Insert users from a stream of records in batches, with a resumable checkpoint."""
+
+    def __init__(self, batch_size=1000, hash_passwords=False, workers=None, checkpoint=None):
+        self.batch_size = batch_size
+        self.hash_passwords = hash_passwords
+        self.workers = workers or os.cpu_count() or 1
+        self.checkpoint = checkpoint
+        self.created = self.skipped = 0
+        self.errors = []
+
+    def read_checkpoint(self):
+        """Return the number of records a previous run already committed."""
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return 0
+        with open(self.checkpoint) as checkpoint:
+            return json.load(checkpoint)["records"]
+
+    def write_checkpoint(self, records):
+        """Record the number of committed records, atomically."""
+        if not self.checkpoint:
+            return
+        temp = f"{self.checkpoint}.tmp"
+        with open(temp, "w") as checkpoint:
+            json.dump({"records": records}, checkpoint)
+        os.replace(temp, self.checkpoint)
+
+    def run(self, records):
+        """Import records, skipping those a previous run committed."""
+        done = self.read_checkpoint()
+        records = islice(records, done, None)
+        with ThreadPoolExecutor(max_workers=self.workers) as hasher:
+            while batch := list(islice(records, self.batch_size)):
+                self.import_batch(batch, done, hasher)
+                done += len(batch)
+                self.write_checkpoint(done)
+        return done
+
+    def import_batch(self, batch, offset, hasher):
+        """Insert one batch of records in a single transaction."""
+        users = []
+        for number, record in enumerate(batch, start=offset + 1):
+            try:
+                user = build_user(record)
+                if not self.hash_passwords:
+                    check_hash(user.password)
+            except ValueError as error:
+                self.errors.append((number, str(error)))
+                continue
+            users.append(user)
+
+        User = get_user_model()
+        users = self.drop_existing(User, users)
+        passwords = [user.password for user in users]
+        if self.hash_passwords:
+            passwords = hasher.map(encode_password, passwords)
+        for user, encoded in zip(users, passwords):
+            user.password = encoded or encode_password(None)
+
+        for attempt in range(SLUG_RETRIES):
+            try:
+                with transaction.atomic():
+                    allocate_slugs(users, "slug")
+                    User.objects.bulk_create(users, batch_size=self.batch_size)
+                    user_index.update([user.pk for user in users])
+                break
+            except IntegrityError:
+                # Rows committed concurrently took an email, username or slug: look again.
+                if attempt == SLUG_RETRIES - 1:
+                    raise
+                users = self.drop_existing(User, users, count_skipped=False)
+        self.created += len(users)
+
+    def drop_existing(self, User, users, count_skipped=True):
+        """Skip users whose email or username is taken, in the table or earlier in the batch."""
+        existing = list(
+            User.objects.filter(
+                Q(email__in=[user.email for user in users])
+                | Q(username__in=[user.username for user in users])
+            ).values_list("email", "username")
+        )
+        emails = {email for email, _ in existing}
+        usernames = {username for _, username in existing}
+
+        kept = []
+        for user in users:
+            if user.email in emails or user.username in usernames:
+                self.skipped += count_skipped
+                continue
+            emails.add(user.email)
+            usernames.add(user.username)
+            kept.append(user)
+        return kept
@@ -3,7 +3,17 @@ URL mappings for the user API.
 """
 from django.urls import path
 
-from user.views import CreateUserView, ManageUserView
+from user import async_views
+from user.views import (
+    CreateUserView,
+    ManageUserView,
+    BulkFollowView,
+    UserFollowersView,
+    UserFollowingView,
+    UserSearchView,
+    UserAutocompleteView,
+    FollowRecommendationsView,
+)
 
 
 app_name = "user"
@@ -11,4 +21,12 @@ app_name = "user"
 urlpatterns = [
     path("create/", CreateUserView.as_view(), name="create"),
     path("me/", ManageUserView.as_view(), name="me"),
+    path("follow/", BulkFollowView.as_view(), name="follow"),
+    path("search/", UserSearchView.as_view(), name="search"),
+    path("autocomplete/", UserAutocompleteView.as_view(), name="autocomplete"),
+    path("recommendations/", FollowRecommendationsView.as_view(), name="recommendations"),
+    path("async/create/", async_views.create_user, name="async-create"),
+    path("async/me/", async_views.manage_user, name="async-me"),
+    path("<slug:slug>/followers/", UserFollowersView.as_view(), name="followers"),
+    path("<slug:slug>/following/", UserFollowingView.as_view(), name="following"),
 ]
@@ -1,26 +1,51 @@
 """
 Views for the user API.
 """
-from rest_framework.generics import CreateAPIView, RetrieveUpdateAPIView
+from django.contrib.auth import get_user_model
+from django.shortcuts import get_object_or_404
+from rest_framework.generics import (
+    CreateAPIView,
+    GenericAPIView,
+    ListAPIView,
+    RetrieveUpdateAPIView,
+)
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.settings import api_settings
 
 # Create your views here.
-from user.serializers import UserSerializer, AuthTokenSerializer
+from auth.authentication import resolve_user
+from core.throttling import CredentialThrottle, IPThrottle, UserThrottle
+from user.autocomplete import autocomplete_setting, user_autocomplete
+from user.cache import get_profile
+from user.models import UserFollow
+from user.recommendations import get_recommendations
+from user.search import user_index
+from user.serializers import (
+    UserSerializer,
+    AuthTokenSerializer,
+    BulkFollowSerializer,
+    PublicUserSerializer,
+)
 
 
 class CreateUserView(CreateAPIView):
     """Create a new user in the system."""
 
     serializer_class = UserSerializer
+    throttle_classes = [IPThrottle]
+    throttle_scope = "signup"
 
 
 class CreateTokenView(ObtainAuthToken):
     """Create a new auth token for the user."""
 
     serializer_class = AuthTokenSerializer
+    throttle_classes = [IPThrottle, CredentialThrottle]
+    throttle_scope = "login"
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
 
 
@@ -28,9 +53,125 @@ class ManageUserView(RetrieveUpdateAPIView):
     """Manage the authenticated user."""
 
     serializer_class = UserSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES + [
+        TokenAuthentication
+    ]
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
         """Retrieve and return the authenticated user."""
-        return self.request.user
+        return resolve_user(self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Return the profile of the authenticated user from the profile cache."""
+        data = get_profile(
+            request.user, lambda user: self.get_serializer(self.get_object()).data
+        )
+        return Response(data)
+
+
+class BulkFollowView(GenericAPIView):
+    """Follow (POST) or unfollow (DELETE) many users at once."""
+
+    serializer_class = BulkFollowSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [UserThrottle]
+    throttle_scope = "follow"
+
+    def post(self, request):
+        """Follow the given users."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        followed = UserFollow.bulk_follow(
+            resolve_user(request.user), serializer.validated_data["users"]
+        )
+        return Response({"followed": followed})
+
+    def delete(self, request):
+        """Unfollow the given users."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        unfollowed = UserFollow.bulk_unfollow(
+            resolve_user(request.user), serializer.validated_data["users"]
+        )
+        return Response({"unfollowed": unfollowed})
+
+
+class FollowListView(ListAPIView):
+    """
+    List one side of a user's follow edges, most recent follow first.
+    Pages are keyset slices of UserFollow on its (user, -created_at, -id) indexes.
+    """
+
+    serializer_class = PublicUserSerializer
+    ordering = ("-created_at", "-id")
+    # The UserFollow field holding the user in the URL, and the one holding the listed users.
+    user_field = None
+    listed_field = None
+
+    def get_queryset(self):
+        """Return the follow edges of the user in the URL, with the listed users."""
+        user = get_object_or_404(get_user_model(), slug=self.kwargs["slug"])
+        return UserFollow.objects.filter(**{self.user_field: user}).select_related(
+            self.listed_field
+        )
+
+    def paginate_queryset(self, queryset):
+        """Return the listed users of one page of follow edges."""
+        rows = super().paginate_queryset(queryset)
+        return [getattr(row, self.listed_field) for row in rows]
+
+
+class UserFollowersView(FollowListView):
+    """List the followers of a user."""
+
+    user_field = "following"
+    listed_field = "follower"
+
+
+class UserFollowingView(FollowListView):
+    """List the users a user follows."""
+
+    user_field = "follower"
+    listed_field = "following"
+
+
+class UserSearchView(ListAPIView):
+    """Search users by name, username, location and bio, best matches first."""
+
+    serializer_class = PublicUserSerializer
+    ordering = ("-rank", "-id")
+
+    def get_queryset(self):
+        """Return the users matching the q query parameter."""
+        return user_index.search(self.request.query_params.get("q", ""))
+
+
+class UserAutocompleteView(APIView):
+    """Suggest users whose username starts with the typed prefix, most followed first."""
+
+    def get(self, request):
+        """Return the top matches for the q query parameter."""
+        try:
+            limit = int(request.query_params.get("limit", autocomplete_setting("LIMIT")))
+        except ValueError:
+            limit = autocomplete_setting("LIMIT")
+        limit = min(max(limit, 1), autocomplete_setting("MAX_LIMIT"))
+        results = user_autocomplete.suggest(
+            request.query_params.get("q", ""),
+            limit,
+            # Matching on emails would reveal who owns an address; staff only.
+            include_emails=bool(getattr(request.user, "is_staff", False)),
+        )
+        return Response({"results": results})
+
+
+class FollowRecommendationsView(APIView):
+    """List the precomputed "who to follow" suggestions of the authenticated user."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Return the suggestions, best first."""
+        users = get_recommendations(request.user)
+        return Response({"results": PublicUserSerializer(users, many=True).data})